@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import blueprint_analyser, book  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the analysis time of a blueprint book
+# with different numbers of processes
+# The wall time should decrease with the number of processes,
+# up to the number of cores
+#
+# Usage: python benchmarks/bench_book.py [blueprints] [belt length]
+# -----------------------------------------------------------
+
+
+if __name__ == "__main__":
+    nb_blueprints = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    blueprint_analyser.init({"verboseLevel": 0, "displayNetwork": False})
+
+    book_json = synthetic.blueprint_book(
+        [synthetic.straight_belt(length) for _ in range(nb_blueprints)])
+
+    cpu_count = os.cpu_count() or 1
+    jobs = sorted(set([1, 2, 4, cpu_count]))
+
+    print(f"{nb_blueprints} blueprints of {length} belts, {cpu_count} cores")
+    print(f"{'processes':>10} {'wall time':>12} {'blueprints time':>16}")
+    for processes in jobs:
+        start = time.perf_counter()
+        results = list(book.analyse_book(book_json, processes=processes))
+        wall_time = time.perf_counter() - start
+
+        errors = [result for result in results if result["error"] is not None]
+        if len(errors) > 0:
+            raise Exception(f"{len(errors)} blueprints failed: {errors[0]['error']}")
+
+        blueprints_time = sum(result["time"] for result in results)
+        print(f"{processes:>10} {wall_time:>11.2f}s {blueprints_time:>15.2f}s")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, blueprint, network  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the compaction of the belt segments on main buses,
+# with underground belts and belt tier changes
+# Each bus lane should be compacted in one node by belt tier,
+# in a time growing linearly with the bus length
+#
+# Usage: python benchmarks/bench_compaction.py [length ...]
+# -----------------------------------------------------------
+
+
+if __name__ == "__main__":
+    lengths = [int(arg) for arg in sys.argv[1:]] or [500, 2000, 8000]
+    lanes = 8
+
+    test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+    print(f"{'bus':>10} {'entities':>10} {'nodes':>8} {'optimize':>10} {'per entity':>12}")
+    with test_analyser.activate():
+        for length in lengths:
+            bp = blueprint.Blueprint(synthetic.main_bus(lanes, length))
+            creator = network.NetworkCreator(bp)
+            node_map = creator.create_nodes()
+
+            # The network creation runs the optimization
+            start = time.perf_counter()
+            nw = network.Network(bp, node_map)
+            duration = time.perf_counter() - start
+
+            print(f"{lanes:>4}x{length:<5} {len(bp.entities):>10} {len(nw.nodes):>8}"
+                  f" {duration * 1000:>8.1f}ms {duration / len(bp.entities) * 1e6:>10.2f}us")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the lp solver on assembly lines with several rows,
+# each row is a group of linked nodes solved on its own
+# The rows are solved in the analyser process, then by pools
+# of processes: the time should go down with the number of processes
+#
+# Usage: python benchmarks/bench_components.py [processes ...]
+# -----------------------------------------------------------
+
+
+if __name__ == "__main__":
+    processes = [int(arg) for arg in sys.argv[1:]] or [0, 2, 4]
+    nb_rows = 8
+    nb_assemblers = 60
+
+    bp_json = synthetic.assembly_line(nb_assemblers, rows=nb_rows)
+
+    print(f"{'processes':>10} {'groups':>8} {'nodes':>8} {'analysis':>10} {'groups time':>12}")
+    for nb_processes in processes:
+        test_analyser = analyser.Analyser({
+            "verboseLevel": 0,
+            "displayNetwork": False,
+            "bottleneckSolver": "lp",
+            "solverProcesses": nb_processes,
+            "parallelMinNodes": 100,
+            "analysisMetadata": True
+        })
+
+        start = time.perf_counter()
+        analysis = test_analyser.analyse_blueprint_json(bp_json)
+        duration = time.perf_counter() - start
+
+        components = analysis["blueprint"]["metadata"]["components"]
+        print(f"{nb_processes:>10} {len(components):>8}"
+              f" {sum(component['nodes'] for component in components):>8}"
+              f" {duration * 1000:>8.1f}ms"
+              f" {sum(component['time'] for component in components) * 1000:>10.1f}ms")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, blueprint, network, solver, csr  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the memory used by the entities, by the network nodes
+# and by the network index, see csr.py
+# Once the purposes are estimated, the index is created and the
+# nodes and the entities are released: the flows are calculated
+# by the linear programming solver and exported from the index alone
+#
+# The blueprint is made of rows of assembling machines,
+# each row is a group of linked nodes solved on its own
+#
+# Usage: python benchmarks/bench_csr.py [nb_entities]
+# -----------------------------------------------------------
+
+# Assembling machines by row, with 6 belts and 2 inserters each
+row_length = 20
+
+
+def measure(function):
+    # Returns the function result and the memory it allocated
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    return (result, tracemalloc.get_traced_memory()[0] - before)
+
+
+def solve(graph):
+    # The flows of all the groups of linked nodes, from the index
+    flows = {}
+    for component in graph.components():
+        component_program = solver.create_component_program(graph, component)
+        flows.update(solver.get_flows(graph, component_program,
+                                      component_program.program.solve()))
+    graph.set_flows(flows)
+
+
+if __name__ == "__main__":
+    nb_entities = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    test_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "lp"})
+    bp_json = synthetic.assembly_line(row_length, rows=max(1, nb_entities // (9 * row_length)))
+
+    tracemalloc.start()
+    with test_analyser.activate():
+        (bp, entities_memory) = measure(lambda: blueprint.Blueprint(bp_json))
+        (nw, network_memory) = measure(lambda: network.create_network(bp))
+        nw.calculate_purposes()
+        nb_entities = len(bp.entities)
+        nb_nodes = len(nw.nodes)
+
+        def create_index():
+            graph = csr.CSRNetwork(nw)
+            graph.load_items(nw.nodes)
+            return graph
+
+        (graph, index_memory) = measure(create_index)
+
+        # Only the index is kept
+        bp_json = bp.blueprint
+        (_, released_memory) = measure(lambda: nw.__dict__.clear() or bp.__dict__.clear())
+        del nw, bp
+
+        start = time.perf_counter()
+        (_, flows_memory) = measure(lambda: solve(graph))
+        solve_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analysis = blueprint.get_index_analysis(graph, bp_json)
+        export_time = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{nb_entities} entities, {nb_nodes} nodes")
+    print(f"{'':>16} {'total':>10} {'per entity':>12}")
+    for (name, memory) in [("entities", entities_memory),
+                           ("network", network_memory),
+                           ("index", index_memory + flows_memory)]:
+        print(f"{name:>16} {memory / 1e6:>8.1f}MB {memory / nb_entities:>11.0f}B")
+
+    print(f"the index is {(entities_memory + network_memory) / (index_memory + flows_memory):.1f}x"
+          f" smaller than the entities and the network,"
+          f" {-released_memory / 1e6:.1f}MB released")
+    print(f"solved in {solve_time * 1000:.0f}ms and exported in {export_time * 1000:.0f}ms"
+          f" from the index, {sum(analysis['blueprint']['items_output'].values()):.1f} items/s")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import blueprint_analyser, daemon  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the latency of an analysis by the daemon
+# with a new CLI process for each analysis
+#
+# Usage: python benchmarks/bench_daemon.py [blueprint path] [requests]
+# -----------------------------------------------------------
+
+repo_path = os.path.join(os.path.dirname(__file__), "..")
+
+
+def cli_time(blueprint_path):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "blueprint_analyser", "-f",
+                        "-i", blueprint_path, "-o", os.path.join(output_dir, "out.json")],
+                       cwd=repo_path, check=True, capture_output=True)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    blueprint_path = sys.argv[1] if len(sys.argv) > 1 else "tests/blueprints/belt.json"
+    nb_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with open(os.path.join(repo_path, blueprint_path), "r") as f:
+        blueprint_string = f.read()
+
+    blueprint_analyser.init({"verboseLevel": 0, "displayNetwork": False})
+
+    with tempfile.TemporaryDirectory() as socket_dir, \
+            blueprint_analyser.create_pool(1) as pool:
+        socket_path = os.path.join(socket_dir, "analyser.sock")
+        server = daemon.AnalysisServer(socket_path, pool, 4, 30)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # The first request starts the worker
+        daemon.analyse_remote(socket_path, blueprint_string)
+
+        durations = []
+        for _ in range(nb_requests):
+            start = time.perf_counter()
+            daemon.analyse_remote(socket_path, blueprint_string)
+            durations.append(time.perf_counter() - start)
+
+        server.shutdown()
+        server.server_close()
+
+    durations.sort()
+    print(f"CLI process:     {cli_time(blueprint_path) * 1000:.1f} ms")
+    print(f"Daemon median:   {durations[len(durations) // 2] * 1000:.2f} ms")
+    print(f"Daemon p99:      {durations[int(len(durations) * 0.99)] * 1000:.2f} ms")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, config, factorio  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the Factorio data load time
+# from the JSON file and from the binary snapshot
+#
+# Usage: python benchmarks/bench_data_load.py [repetitions]
+# -----------------------------------------------------------
+
+
+def time_load(analyser_config, repetitions):
+    durations = []
+    for _ in range(repetitions):
+        # The loaded data is kept in memory, we only measure the file load
+        factorio.loaded_data.clear()
+
+        start = time.perf_counter()
+        factorio.load_data(analyser_config)
+        durations.append(time.perf_counter() - start)
+
+    return min(durations)
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    # Activated to read the verbose level
+    quiet_analyser = analyser.Analyser({"verboseLevel": 0, "snapshotDir": ""})
+
+    with tempfile.TemporaryDirectory() as snapshot_dir, quiet_analyser.activate():
+        # Cold JSON load, snapshots disabled
+        json_config = config.Config({"verboseLevel": 0, "snapshotDir": ""})
+        json_time = time_load(json_config, repetitions)
+
+        # Snapshot load, the first load creates the snapshot
+        snapshot_config = config.Config({"verboseLevel": 0, "snapshotDir": snapshot_dir})
+        factorio.load_data(snapshot_config)
+        snapshot_time = time_load(snapshot_config, repetitions)
+
+    print(f"JSON load:     {json_time * 1000:.2f} ms")
+    print(f"Snapshot load: {snapshot_time * 1000:.2f} ms")
+    print(f"Speedup:       x{json_time / snapshot_time:.1f}")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, blueprint, network, item  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the items flow accounting: the flow operations alone,
+# then the greedy bottleneck calculation on assembly lines,
+# which reads the flows total amount on each request
+#
+# Usage: python benchmarks/bench_flow.py [nb_assemblers ...]
+# -----------------------------------------------------------
+
+
+def measure_flow_operations(nb_operations):
+    flow = item.Flow()
+
+    start = time.perf_counter()
+    for _ in range(nb_operations):
+        flow.add_item("iron-plate", 0.5)
+        flow.add_item("copper-plate", 0.25)
+        flow.total_amount
+        flow.reduce("iron-plate", 0.25)
+        flow.total_amount
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [25, 50, 100]
+
+    nb_operations = 100000
+    duration = measure_flow_operations(nb_operations)
+    print(f"{nb_operations} x (2 add, 1 reduce, 2 totals): {duration * 1000:.1f}ms,"
+          f" {duration / nb_operations / 5 * 1e9:.0f}ns per operation")
+
+    test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+    print(f"{'assemblers':>10} {'nodes':>8} {'bottleneck':>12}")
+    with test_analyser.activate():
+        for size in sizes:
+            bp = blueprint.Blueprint(synthetic.assembly_line(size, rows=4))
+            nw = network.create_network(bp)
+
+            start = time.perf_counter()
+            nw.calculate_bottleneck()
+            duration = time.perf_counter() - start
+
+            print(f"{size * 4:>10} {len(nw.nodes):>8} {duration * 1000:>10.1f}ms")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the time of an edit with the incremental analysis and
+# the time of a full analysis, on assembly lines with several rows
+# The rows are not linked, an edit only creates one row again:
+# the edit time should not grow with the number of rows
+#
+# Usage: python benchmarks/bench_incremental.py [rows ...]
+# -----------------------------------------------------------
+
+
+if __name__ == "__main__":
+    rows = [int(arg) for arg in sys.argv[1:]] or [1, 4, 16, 64]
+    nb_assemblers = 20
+
+    test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+    print(f"{'rows':>6} {'entities':>10} {'full':>10} {'edit':>10} {'tiles':>8}")
+    for nb_rows in rows:
+        bp_json = synthetic.assembly_line(nb_assemblers, rows=nb_rows)
+
+        start = time.perf_counter()
+        test_analyser.analyse_blueprint_json(bp_json)
+        full_time = time.perf_counter() - start
+
+        incremental_analysis = test_analyser.create_incremental_analysis(bp_json)
+
+        # Change the recipe of an assembling machine of the first row
+        # and set it back
+        assembler_number = [e["entity_number"] for e in bp_json["blueprint"]["entities"]
+                            if e["name"] == "assembling-machine-2"][0]
+
+        start = time.perf_counter()
+        incremental_analysis.set_recipe(assembler_number, "copper-cable")
+        incremental_analysis.set_recipe(assembler_number, "iron-gear-wheel")
+        edit_time = (time.perf_counter() - start) / 2
+
+        print(f"{nb_rows:>6} {len(bp_json['blueprint']['entities']):>10}"
+              f" {full_time * 1000:>8.1f}ms {edit_time * 1000:>8.1f}ms"
+              f" {incremental_analysis.nb_updated_tiles:>8}")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the analysis time with and without the instrumentation,
+# on assembly lines with several rows
+# Without the instrumentation, the time should not change
+#
+# Usage: python benchmarks/bench_instrumentation.py [rows ...]
+# -----------------------------------------------------------
+
+repeat = 5
+
+
+def best_time(test_analyser, bp_json):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        test_analyser.analyse_blueprint_json(bp_json)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+if __name__ == "__main__":
+    rows = [int(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    nb_assemblers = 20
+
+    config = {"verboseLevel": 0, "displayNetwork": False}
+    analysers = [analyser.Analyser(dict(config, instrumentation=enabled))
+                 for enabled in [False, True]]
+
+    print(f"{'rows':>6} {'entities':>10} {'disabled':>10} {'enabled':>10}")
+    for nb_rows in rows:
+        bp_json = synthetic.assembly_line(nb_assemblers, rows=nb_rows)
+        (disabled_time, enabled_time) = [best_time(a, bp_json) for a in analysers]
+
+        print(f"{nb_rows:>6} {len(bp_json['blueprint']['entities']):>10}"
+              f" {disabled_time * 1000:>8.1f}ms {enabled_time * 1000:>8.1f}ms")
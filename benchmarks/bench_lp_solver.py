@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import os
+import sys
+import copy
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, blueprint, network  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the greedy and the linear programming bottleneck solvers
+# on assembly lines, and on the test blueprints:
+# the bottleneck calculation time and the total output of the leaf nodes
+#
+# Usage: python benchmarks/bench_lp_solver.py [nb_assemblers ...]
+# -----------------------------------------------------------
+
+
+def measure(bp_json):
+    # Returns the bottleneck time and the output of the network
+    # The analysis modifies the blueprint JSON
+    bp = blueprint.Blueprint(copy.deepcopy(bp_json))
+    nw = network.create_network(bp)
+
+    start = time.perf_counter()
+    nw.calculate_bottleneck()
+    duration = time.perf_counter() - start
+
+    output = sum(node.flow.total_amount for node in nw.leaf_nodes())
+    return (duration, output, len(nw.nodes))
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 50, 200]
+    rows = 4
+
+    analysers = {
+        solver: analyser.Analyser({"verboseLevel": 0, "displayNetwork": False,
+                                   "bottleneckSolver": solver})
+        for solver in ["greedy", "lp"]
+    }
+
+    blueprints_path = os.path.join(os.path.dirname(__file__), "..", "tests", "blueprints")
+    cases = [(f"{rows}x{size} assemblers", synthetic.assembly_line(size, rows=rows))
+             for size in sizes]
+    cases += [(name, blueprint.read_blueprint_from_path(os.path.join(blueprints_path, name)))
+              for name in ["redCircuitFactory", "circuitFactory", "combatRobotBook"]]
+
+    print(f"{'blueprint':>20} {'nodes':>8} {'greedy':>10} {'output':>8}"
+          f" {'lp':>10} {'output':>8}")
+    for (name, bp_json) in cases:
+        results = []
+        for solver in ["greedy", "lp"]:
+            with analysers[solver].activate():
+                results.append(measure(bp_json))
+
+        print(f"{name:>20} {results[0][2]:>8}"
+              f" {results[0][0] * 1000:>8.1f}ms {results[0][1]:>8.2f}"
+              f" {results[1][0] * 1000:>8.1f}ms {results[1][1]:>8.2f}")
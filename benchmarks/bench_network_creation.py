@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import blueprint_analyser, blueprint, network  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the network creation time on long straight belts
+# The nodes creation time should grow linearly with the belt length
+#
+# Usage: python benchmarks/bench_network_creation.py [length ...]
+# -----------------------------------------------------------
+
+
+if __name__ == "__main__":
+    lengths = [int(arg) for arg in sys.argv[1:]] or [10000, 20000, 40000]
+
+    blueprint_analyser.init({"verboseLevel": 0, "displayNetwork": False})
+
+    print(f"{'belts':>8} {'blueprint':>12} {'nodes':>12} {'per belt':>12} {'network':>12}")
+    for length in lengths:
+        bp_json = synthetic.straight_belt(length)
+
+        start = time.perf_counter()
+        bp = blueprint.Blueprint(bp_json)
+        blueprint_time = time.perf_counter() - start
+
+        creator = network.NetworkCreator(bp)
+
+        start = time.perf_counter()
+        node_map = creator.create_nodes()
+        nodes_time = time.perf_counter() - start
+
+        # Extraction of the nodes from the map and network optimization
+        start = time.perf_counter()
+        network.Network(bp, node_map)
+        network_time = time.perf_counter() - start
+
+        print(f"{length:>8} {blueprint_time * 1000:>10.1f}ms {nodes_time * 1000:>10.1f}ms"
+              f" {nodes_time / length * 1e6:>10.2f}us {network_time * 1000:>10.1f}ms")
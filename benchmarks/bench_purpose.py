@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser, blueprint, network  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Measure the purpose estimation time on assembly lines of
+# electronic circuits (recipes with several ingredients), and on
+# assembly lines taking their ingredients from belts merged many
+# times by a splitter lattice
+# Each assembling machine sends its purpose along the belts,
+# the time per node should stay the same
+#
+# Usage: python benchmarks/bench_purpose.py [assemblers ...]
+# -----------------------------------------------------------
+
+lattice_lanes = 8
+
+blueprints = [
+    ("assembly line", lambda size: synthetic.assembly_line(size, recipe="electronic-circuit")),
+    ("merged belts", lambda size: synthetic.merged_assembly_line(lattice_lanes, size)),
+]
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400, 800]
+
+    test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+    print(f"{'blueprint':>14} {'assemblers':>10} {'nodes':>8} {'purposes':>10} {'outputs':>10}"
+          f" {'inputs':>10} {'per node':>10}")
+    with test_analyser.activate():
+        for (name, create_blueprint) in blueprints:
+            for size in sizes:
+                bp = blueprint.Blueprint(create_blueprint(size))
+                nw = network.create_network(bp)
+
+                start = time.perf_counter()
+                nw.estimate_purposes()
+                purposes_time = time.perf_counter() - start
+
+                # The outputs of the leaf nodes, asked by the bottleneck calculation
+                start = time.perf_counter()
+                for node in nw.leaf_nodes():
+                    node.get_materials_output()
+                outputs_time = time.perf_counter() - start
+
+                # Asked by the purpose estimation for the recipes with several ingredients
+                start = time.perf_counter()
+                for node in nw.nodes:
+                    node.connected_to_input()
+                inputs_time = time.perf_counter() - start
+
+                total_time = purposes_time + outputs_time + inputs_time
+                print(f"{name:>14} {size:>10} {len(nw.nodes):>8}"
+                      f" {purposes_time * 1000:>8.1f}ms {outputs_time * 1000:>8.1f}ms"
+                      f" {inputs_time * 1000:>8.1f}ms {total_time / len(nw.nodes) * 1e6:>8.2f}us")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import os
+import sys
+import subprocess
+
+# -----------------------------------------------------------
+# Measure the import time of the package with python -X importtime
+# and check it against a budget. The optional dependencies
+# (pyvis, termcolor, yaml) must not be imported by the analysis
+#
+# Usage: python benchmarks/bench_startup.py [budget in ms] [repetitions]
+# Exits with an error if the import time is over the budget
+# -----------------------------------------------------------
+
+repo_path = os.path.join(os.path.dirname(__file__), "..")
+module = "factorio_blueprint_analyser.blueprint_analyser"
+
+
+def import_time():
+    # Returns the cumulative import time of the module, in seconds,
+    # and the time of its 5 slowest imports
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=repo_path, check=True, capture_output=True, text=True)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative) / 1e6, name.strip()))
+
+    total = next(duration for (duration, name) in imports if name == module)
+    return total, sorted(imports, reverse=True)[1:6]
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.150
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # The first run can be slower, the .pyc files are written
+    import_time()
+    total, slowest = min(import_time() for _ in range(repetitions))
+
+    print(f"{module} import: {total * 1000:.1f} ms (budget {budget * 1000:.0f} ms)")
+    for (duration, name) in slowest:
+        print(f"    {duration * 1000:>7.1f} ms  {name}")
+
+    if total > budget:
+        print("Over budget")
+        sys.exit(1)
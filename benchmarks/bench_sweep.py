@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import marshal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from factorio_blueprint_analyser import analyser  # noqa: E402
+import synthetic  # noqa: E402
+
+# -----------------------------------------------------------
+# Compare the time of a capacity sweep with the time of one
+# full analysis per scenario, on assembly lines with several rows
+# The sweep creates the network and the purposes once
+#
+# Usage: python benchmarks/bench_sweep.py [rows ...]
+# -----------------------------------------------------------
+
+scenarios = [{"inserterCapacityBonus": bonus} for bonus in range(8)] + \
+    [{"beltTier": tier} for tier in
+     ["transport-belt", "fast-transport-belt", "express-transport-belt"]]
+
+
+if __name__ == "__main__":
+    rows = [int(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    nb_assemblers = 20
+
+    config = {"verboseLevel": 0, "displayNetwork": False}
+    test_analyser = analyser.Analyser(config)
+
+    # The full analyses need one analyser per inserter capacity bonus
+    bonus_analysers = {bonus: analyser.Analyser(dict(config, inserterCapacityBonus=bonus))
+                       for bonus in range(8)}
+
+    print(f"{'rows':>6} {'entities':>10} {'scenarios':>10} {'full':>10} {'sweep':>10}")
+    for nb_rows in rows:
+        bp_json = synthetic.assembly_line(nb_assemblers, rows=nb_rows)
+
+        # Full analysis of each scenario, the belt tiers
+        # are set in a copy of the blueprint
+        start = time.perf_counter()
+        for scenario in scenarios:
+            if "inserterCapacityBonus" in scenario:
+                bonus_analysers[scenario["inserterCapacityBonus"]].analyse_blueprint_json(bp_json)
+            else:
+                upgraded_json = marshal.loads(marshal.dumps(bp_json))
+                for entity in upgraded_json["blueprint"]["entities"]:
+                    if entity["name"] == "transport-belt":
+                        entity["name"] = scenario["beltTier"]
+                test_analyser.analyse_blueprint_json(upgraded_json)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        test_analyser.sweep_blueprint_json(bp_json, scenarios)
+        sweep_time = time.perf_counter() - start
+
+        print(f"{nb_rows:>6} {len(bp_json['blueprint']['entities']):>10}"
+              f" {len(scenarios):>10} {full_time * 1000:>8.1f}ms {sweep_time * 1000:>8.1f}ms")
@@ -0,0 +1,173 @@
+# -----------------------------------------------------------
+# Synthetic blueprints used by the benchmarks
+# The blueprints are returned as blueprint JSON dictionaries
+# -----------------------------------------------------------
+
+
+def blueprint_json(entities, label="synthetic"):
+    return {
+        "blueprint": {
+            "entities": entities,
+            "item": "blueprint",
+            "label": label,
+        }
+    }
+
+
+def straight_belt(length, names=["transport-belt"]):
+    # A belt going to the right, the belt tiers
+    # are taken one after the other from the names
+    entities = []
+    for x in range(length):
+        entities.append({
+            "entity_number": x + 1,
+            "name": names[x % len(names)],
+            "position": {"x": x + 0.5, "y": 0.5},
+            "direction": 2
+        })
+
+    return blueprint_json(entities, f"straight belt {length}")
+
+
+def blueprint_book(blueprints, label="synthetic book"):
+    # A book containing the given blueprint JSON dictionaries
+    return {
+        "blueprint_book": {
+            "blueprints": [dict(bp, index=i) for (i, bp) in enumerate(blueprints)],
+            "item": "blueprint-book",
+            "label": label,
+        }
+    }
+
+
+def assembly_line(nb_assemblers, recipe="iron-gear-wheel", rows=1):
+    # Rows of assembling machines between an input belt
+    # and an output belt, both going to the right
+    #   input belt   ========
+    #   inserters     v  v  v
+    #   assemblers   [ ][ ][ ]
+    #   inserters     v  v  v
+    #   output belt  ========
+    entities = []
+
+    def add(name, x, y, **properties):
+        entities.append(dict({
+            "entity_number": len(entities) + 1,
+            "name": name,
+            "position": {"x": x, "y": y}
+        }, **properties))
+
+    for row in range(rows):
+        top = row * 8
+        for x in range(nb_assemblers * 3):
+            add("transport-belt", x + 0.5, top + 0.5, direction=2)
+            add("transport-belt", x + 0.5, top + 6.5, direction=2)
+
+        for i in range(nb_assemblers):
+            x = i * 3 + 1.5
+            add("inserter", x, top + 1.5)
+            add("assembling-machine-2", x, top + 3.5, recipe=recipe)
+            add("inserter", x, top + 5.5)
+
+    return blueprint_json(entities, f"assembly line {rows}x{nb_assemblers}")
+
+
+def splitter_lattice(lanes, columns):
+    # Parallel belts going to the right, with columns of splitters
+    # between the belts, shifted by one belt on each column:
+    # each belt is merged with its neighbours, the paths from
+    # the inputs to the outputs form a lattice of diamonds
+    entities = []
+
+    def add(name, x, y, **properties):
+        entities.append(dict({
+            "entity_number": len(entities) + 1,
+            "name": name,
+            "position": {"x": x, "y": y},
+            "direction": 2
+        }, **properties))
+
+    for lane in range(lanes):
+        add("transport-belt", 0.5, lane + 0.5)
+
+    for column in range(columns):
+        x = column * 2 + 1.5
+        lane = column % 2
+        if lane == 1:
+            add("transport-belt", x, 0.5)
+
+        while lane + 1 < lanes:
+            add("splitter", x, lane + 1)
+            lane += 2
+
+        if lane < lanes:
+            add("transport-belt", x, lane + 0.5)
+
+        for lane in range(lanes):
+            add("transport-belt", x + 1, lane + 0.5)
+
+    return blueprint_json(entities, f"splitter lattice {lanes}x{columns}")
+
+
+def merged_assembly_line(lanes, nb_assemblers, recipe="electronic-circuit"):
+    # The belts of a splitter lattice, followed by a row of
+    # assembling machines taking their ingredients from the first belt
+    #   output belt   ========
+    #   inserters      ^  ^  ^
+    #   assemblers    [ ][ ][ ]
+    #   inserters      ^  ^  ^
+    #   lattice  ###  ========
+    bp_json = splitter_lattice(lanes, lanes * 2)
+    entities = bp_json["blueprint"]["entities"]
+
+    def add(name, x, y, **properties):
+        entities.append(dict({
+            "entity_number": len(entities) + 1,
+            "name": name,
+            "position": {"x": x, "y": y}
+        }, **properties))
+
+    start = lanes * 4 + 1
+    for x in range(start, start + nb_assemblers * 3):
+        add("transport-belt", x + 0.5, 0.5, direction=2)
+        add("transport-belt", x + 0.5, -5.5, direction=2)
+
+    for i in range(nb_assemblers):
+        x = start + i * 3 + 1.5
+        add("inserter", x, -0.5, direction=4)
+        add("assembling-machine-2", x, -2.5, recipe=recipe)
+        add("inserter", x, -4.5, direction=4)
+
+    bp_json["blueprint"]["label"] = f"merged assembly line {lanes}x{nb_assemblers}"
+    return bp_json
+
+
+def main_bus(lanes, length):
+    # Parallel belts going to the right, as in a main bus:
+    # the belts go under the roads with underground belts
+    # and their tier changes along the bus
+    entities = []
+
+    def add(name, x, y, **properties):
+        entities.append(dict({
+            "entity_number": len(entities) + 1,
+            "name": name,
+            "position": {"x": x + 0.5, "y": y + 0.5},
+            "direction": 2
+        }, **properties))
+
+    tiers = ["", "fast-", "express-"]
+    for lane in range(lanes):
+        x = 0
+        while x < length:
+            tier = tiers[(x // 50) % len(tiers)]
+            if x % 25 == 20:
+                # Road crossing
+                add(f"{tier}underground-belt", x, lane, type="input")
+                add(f"{tier}underground-belt", x + 3, lane, type="output")
+                x += 4
+            else:
+                add(f"{tier}transport-belt", x, lane)
+                x += 1
+
+    return blueprint_json(entities, f"main bus {lanes}x{length}")
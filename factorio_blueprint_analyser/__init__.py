@@ -1 +1,4 @@
 
+# The only place the version is written, read by setup.py
+# The Factorio data snapshots and the analysis cache keys depend on it
+__version__ = "1.3.5"
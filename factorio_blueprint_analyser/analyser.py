@@ -0,0 +1,175 @@
+import marshal
+import threading
+
+from factorio_blueprint_analyser import (
+    factorio,
+    blueprint,
+    network,
+    config,
+    context,
+    cache,
+    incremental,
+    sweep,
+    instrumentation
+)
+
+# -----------------------------------------------------------
+# Blueprint analyser
+# An analyser owns its config, its Factorio data and its result cache.
+# Several analysers can be used in the same process, with different
+# configs or data files, and from several threads at the same time.
+#
+# The analyser is activated, see context.py, while it analyses
+# a blueprint, so the other modules use its config and its data
+# -----------------------------------------------------------
+
+
+class Analyser:
+    def __init__(self, config_dict=None):
+        self.config = config.Config(config_dict)
+
+        with self.activate():
+            # The data is shared with the other analysers using the same file
+            self.data = factorio.load_data(self.config)
+
+        # Optional analysis results cache, see cache.py
+        self.result_cache = None
+        if self.config.cache_dir:
+            self.result_cache = cache.ResultCache(
+                self.config.cache_dir,
+                self.config.cache_max_size * 1024 * 1024,
+                self.config.cache_max_entries)
+
+        # Processes solving the large groups of linked nodes, created
+        # by the first analysis needing them, see Network.calculate_lp_flows
+        self.solver_pool = None
+        self.solver_pool_lock = threading.Lock()
+
+    def activate(self):
+        # Context manager using this analyser in the current thread
+        return context.use_analyser(self)
+
+    def analyse_blueprint(self, blueprint_string):
+        with instrumentation.record(self.config.instrumentation):
+            with instrumentation.phase("decode"):
+                blueprint_json = blueprint.read_blueprint(blueprint_string)
+
+            return self._analyse(blueprint_json)
+
+    def analyse_blueprint_from_path(self, blueprint_path):
+        with instrumentation.record(self.config.instrumentation):
+            with instrumentation.phase("decode"):
+                blueprint_json = blueprint.read_blueprint_from_path(blueprint_path)
+
+            return self._analyse(blueprint_json)
+
+    def analyse_blueprint_json(self, blueprint_json):
+        # The analysis modifies and returns the blueprint JSON
+        # so the given blueprint is copied, it can be analysed again
+        with instrumentation.record(self.config.instrumentation):
+            return self._analyse(marshal.loads(marshal.dumps(blueprint_json)))
+
+    def create_incremental_analysis(self, blueprint_json):
+        # Analysis of a blueprint kept up to date while its
+        # entities are edited, see incremental.py
+        return incremental.IncrementalAnalysis(self, blueprint_json)
+
+    def sweep_blueprint_json(self, blueprint_json, scenarios):
+        # Results of the blueprint analysis for each capacity
+        # scenario, the network is created once, see sweep.py
+        return sweep.Sweep(self, blueprint_json).run(scenarios)
+
+    def sweep_blueprint_from_path(self, blueprint_path, scenarios):
+        return self.sweep_blueprint_json(
+            blueprint.read_blueprint_from_path(blueprint_path), scenarios)
+
+    def get_cache_stats(self):
+        # Returns the result cache hits and misses counters
+        # or None if the cache is disabled
+        if self.result_cache is None:
+            return None
+
+        return self.result_cache.stats()
+
+    def create_pool(self, processes):
+        # Pool of processes analysing blueprints with this analyser config
+        # Each process loads the Factorio data once, when it starts
+        config_dict = self.config.to_dict()
+
+        # The network is never displayed by the workers
+        config_dict["displayNetwork"] = False
+
+        # Imported here, blueprint_analyser creates the default analyser,
+        # and the multiprocessing modules are only needed by the pools
+        from concurrent.futures import ProcessPoolExecutor
+        from factorio_blueprint_analyser import blueprint_analyser
+
+        return ProcessPoolExecutor(max_workers=processes,
+                                   initializer=blueprint_analyser.init,
+                                   initargs=(config_dict,))
+
+    def get_solver_pool(self):
+        # The pool is shared by the analyses of this analyser
+        with self.solver_pool_lock:
+            if self.solver_pool is None:
+                # Imported here, the pool is only needed by the large blueprints
+                from concurrent.futures import ProcessPoolExecutor
+                self.solver_pool = ProcessPoolExecutor(max_workers=self.config.solver_processes)
+
+            return self.solver_pool
+
+    def close(self):
+        # Stop the solver processes, they are started again if needed
+        with self.solver_pool_lock:
+            if self.solver_pool is not None:
+                self.solver_pool.shutdown()
+                self.solver_pool = None
+
+    def _analyse(self, blueprint_json):
+        with self.activate():
+            # The cache is not used when the network is displayed,
+            # or when the analysis times are recorded: the instrumentation
+            # report and the groups times of the metadata
+            if self.result_cache is None or self.config.display_network or \
+                    self.config.instrumentation or self.config.analysis_metadata:
+                return self._process_blueprint(blueprint.Blueprint(blueprint_json))
+
+            # The key is computed before the blueprint JSON is modified by the analysis
+            key = self.result_cache.make_key(blueprint_json, self._get_config_digest())
+            analysis_result = self.result_cache.get(key)
+
+            if analysis_result is None:
+                analysis_result = self._process_blueprint(
+                    blueprint.Blueprint(blueprint_json))
+                self.result_cache.set(key, analysis_result)
+
+            return analysis_result
+
+    def _get_config_digest(self):
+        # The config values and data that change the analysis result
+        return f"{self.config.difficulty}_{self.config.inserter_capacity_bonus}_" \
+            f"{self.config.bottleneck_solver}_{self.data.digest}"
+
+    def _process_blueprint(self, bp):
+        bp.display()
+
+        # Creade a node network from the blueprint
+        nw = network.create_network(bp)
+        instrumentation.set_counter("compacted_nodes", nw.compaction.nb_removed_nodes())
+
+        # Calculate bottleneck
+        nw.calculate_bottleneck()
+        if self.config.display_network:
+            nw.display()
+
+        # Export the analysis
+        with instrumentation.phase("export"):
+            analysis_result = bp.get_analysis()
+
+        # The report is added once all the phases are timed
+        report = instrumentation.get_report()
+        if report is not None:
+            analysis_result["blueprint"].setdefault("metadata", {})["instrumentation"] = \
+                report.to_dict()
+
+        return analysis_result
@@ -0,0 +1,226 @@
+import os
+import glob
+import json
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from factorio_blueprint_analyser import blueprint_analyser, export, utils
+
+# -----------------------------------------------------------
+# Analyse a corpus of blueprints
+# The corpus can be:
+#   - a directory: each file is a blueprint
+#   - a glob pattern: each matching file is a blueprint
+#   - a text file: each non empty line is a blueprint string
+#
+# The blueprints are analysed by a pool of processes and one JSON
+# line is written per blueprint, as soon as it is analysed:
+#   {
+#       "id": "corpus.txt:12",  # File path, and line number for text files
+#       "time": 0.42,  # Analysis time in seconds
+#       "analysis": {...},  # None if the analysis failed
+#       "error": None  # The error message if the analysis failed
+#   }
+#
+# If the output file already exists, the blueprints already written
+# in it are skipped and the new results are appended, so an
+# interrupted batch can be resumed
+# -----------------------------------------------------------
+
+# Maximum number of blueprints sent to the pool for each process
+# The corpus is read little by little instead of being loaded in memory
+tasks_per_process = 4
+
+# Minimum time between two progress reports, in seconds
+progress_interval = 2
+
+
+def is_glob(source):
+    return glob.has_magic(source)
+
+
+def iter_inputs(source):
+    # Yield the (id, path, blueprint_string) of the corpus blueprints
+    # The blueprint string is None when the blueprint is a whole file
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            path = os.path.join(source, file_name)
+            if os.path.isfile(path) and not file_name.startswith("."):
+                yield (path, path, None)
+
+    elif is_glob(source):
+        for path in sorted(glob.glob(source, recursive=True)):
+            if os.path.isfile(path):
+                yield (path, path, None)
+
+    elif os.path.isfile(source):
+        with open(source, "r") as f:
+            for (i, line) in enumerate(f):
+                line = line.strip()
+                if line != "":
+                    yield (f"{source}:{i + 1}", None, line)
+
+    else:
+        raise Exception(f"Batch input '{source}' is not a directory, a glob or a file")
+
+
+def read_done_ids(output_path):
+    # Returns the ids already written in the output file
+    # A line partially written by an interrupted batch is removed
+    done_ids = set()
+    if not os.path.exists(output_path):
+        return done_ids
+
+    valid_size = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+
+            try:
+                done_ids.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                utils.warning(f"Invalid line in {output_path}, ignoring it")
+
+            valid_size += len(line)
+
+    if valid_size < os.path.getsize(output_path):
+        utils.warning(f"Removing the last incomplete line of {output_path}")
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_size)
+
+    return done_ids
+
+
+def analyse_batch(source, output_path, processes=None, resume=True):
+    # Analyse the corpus and write the results in the output file
+    # Returns a summary of the batch
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    done_ids = read_done_ids(output_path) if resume else set()
+
+    summary = {
+        "total": 0,
+        "skipped": 0,
+        "analysed": 0,
+        "failed": 0,
+        "time": 0
+    }
+
+    # The corpus is read once, the blueprints are counted
+    # while they are sent to the pool
+    inputs = InputReader(source, done_ids, summary)
+    start = time.perf_counter()
+    last_report = start
+
+    with open(output_path, "a" if resume else "w") as f:
+        for result in _analyse_inputs(inputs, processes):
+            export.write_result(result, f)
+
+            summary["analysed"] += 1
+            if result["error"] is not None:
+                summary["failed"] += 1
+                utils.warning(f"{result['id']}: {result['error']}")
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                f.flush()
+                last_report = now
+                _report_progress(summary, now - start, inputs.complete)
+
+    summary["time"] = time.perf_counter() - start
+    _report_progress(summary, summary["time"], inputs.complete)
+
+    return summary
+
+
+class InputReader:
+    # Yields the corpus blueprints that are not already analysed,
+    # and counts the blueprints of the summary while it reads them
+    def __init__(self, source, done_ids, summary):
+        self.source = source
+        self.done_ids = done_ids
+        self.summary = summary
+
+        # True once the whole corpus is read
+        self.complete = False
+
+    def __iter__(self):
+        for item in iter_inputs(self.source):
+            self.summary["total"] += 1
+            if item[0] in self.done_ids:
+                self.summary["skipped"] += 1
+            else:
+                yield item
+
+        self.complete = True
+        if self.summary["skipped"] > 0:
+            utils.verbose(f"Resuming the batch, {self.summary['skipped']}/"
+                          f"{self.summary['total']} blueprints already analysed")
+
+
+def _analyse_inputs(inputs, processes):
+    # Generator of the results, in completion order
+    if processes == 1:
+        for item in inputs:
+            yield _analyse(*item)
+        return
+
+    max_pending = processes * tasks_per_process
+
+    with blueprint_analyser.create_pool(processes) as executor:
+        pending = {}
+        for item in inputs:
+            pending[executor.submit(_analyse, *item)] = item[0]
+
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from _get_results(done, pending)
+
+        while len(pending) > 0:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from _get_results(done, pending)
+
+
+def _get_results(done, pending):
+    for future in done:
+        item_id = pending.pop(future)
+        try:
+            yield future.result()
+        except Exception as e:
+            # The worker process itself failed
+            yield _result(item_id, 0, None, e)
+
+
+def _analyse(item_id, path, blueprint_string):
+    start = time.perf_counter()
+
+    try:
+        if path is not None:
+            analysis = blueprint_analyser.analyse_blueprint_from_path(path)
+        else:
+            analysis = blueprint_analyser.analyse_blueprint(blueprint_string)
+    except Exception as e:
+        return _result(item_id, time.perf_counter() - start, None, e)
+
+    return _result(item_id, time.perf_counter() - start, analysis, None)
+
+
+def _result(item_id, duration, analysis, error):
+    return {
+        "id": item_id,
+        "time": duration,
+        "analysis": analysis,
+        "error": None if error is None else f"{type(error).__name__}: {error}"
+    }
+
+
+def _report_progress(summary, duration, complete):
+    # The total is only known once the whole corpus is read
+    done = summary["skipped"] + summary["analysed"]
+    total = summary["total"] if complete else f"{summary['total']} read"
+    throughput = summary["analysed"] / duration if duration > 0 else 0
+    utils.verbose(
+        f"{done}/{total} blueprints, {summary['failed']} failed, "
+        f"{throughput:.1f} blueprints/s")
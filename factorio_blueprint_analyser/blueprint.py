@@ -1,29 +1,34 @@
 import json
 
-from factorio_blueprint_analyser import utils, entity, config
+from factorio_blueprint_analyser import utils, entity, config, spatial, item, instrumentation
 
 # -----------------------------------------------------------
 # Read the blueprint from the given file
 # Decode the file is encoded
 # Create an entity list from the blueprint items
-# Place the entities in a 2D array according to their position
+# Place the entities in a sparse 2D index according to their position
 # -----------------------------------------------------------
 
+# Maximum distance between an inserter and its drop tile (long handed inserters)
+max_drop_distance = 2
 
-class Blueprint:
-    entities = []
-    label = ""
-    heigth = 0
-    width = 0
-    array = []
-    blueprint = None
 
+class Blueprint:
     def __init__(self, bp_json):
         self.blueprint = bp_json
 
-        # For some reason, the class variables needs to be reset
         self.entities = []
-        self.array = []
+        self.grid = spatial.SpatialIndex()
+        self.label = ""
+        self.heigth = 0
+        self.width = 0
+
+        # Position of the blueprint top left entity,
+        # the entities positions are relative to it
+        self.origin = [0, 0]
+
+        # Tiles where an entity is hidden by another one
+        self.hidden_tiles = set()
 
         # Check if the json is valid
         if "blueprint_book" in bp_json:
@@ -53,99 +58,202 @@ class Blueprint:
         # === Blueprint pre process ===
 
         # entities creation
-        for entity_dic in entities:
+        with instrumentation.phase("entities"):
+            for entity_dic in entities:
+                new_entity = self.create_entity(entity_dic)
 
-            # Replace infinit chests with a normal chest
-            if entity_dic["name"] == "infinity-chest":
-                entity_dic["name"] = "iron-chest"
-
-            # Creation of the entity from the blueprint entity dictionary
-            new_entity = entity.create_entity(entity_dic)
-
-            if new_entity is not None:
-                self.entities.append(new_entity)
+                if new_entity is not None:
+                    self.entities.append(new_entity)
 
         if len(self.entities) == 0:
             utils.warning(f"No entities in the blueprint {self.label}")
             return
 
-        # For some reason, the blueprint does not always start at 0,0 so we set a new origin:
-        lowest_x = min(e.position[0] for e in self.entities)
-        lowest_y = min(e.position[1] for e in self.entities)
-
-        for entity_obj in self.entities:
-            entity_obj.position[0] -= lowest_x
-            entity_obj.position[1] -= lowest_y
+        with instrumentation.phase("grid"):
+            # For some reason, the blueprint does not always start at 0,0 so we set a new origin:
+            lowest_x = min(e.position[0] for e in self.entities)
+            lowest_y = min(e.position[1] for e in self.entities)
+            self.origin = [lowest_x, lowest_y]
 
-        self.width = max(e.position[0] for e in self.entities) + 1
-        self.heigth = max(e.position[1] for e in self.entities) + 1
+            for entity_obj in self.entities:
+                entity_obj.position[0] -= lowest_x
+                entity_obj.position[1] -= lowest_y
 
-        # === Convertion of the blueprint into a 2D array ===
-        self.array = []
+            self.width = max(e.position[0] for e in self.entities) + 1
+            self.heigth = max(e.position[1] for e in self.entities) + 1
 
-        for _ in range(self.heigth):
-            self.array.append([None] * self.width)
+            # === Placement of the entities in the sparse 2D index ===
+            for created_entity in self.entities:
+                self.place_entity(created_entity)
 
-        for created_entity in self.entities:
-            if created_entity.large:
-                # Because entites like the assembling machine is a 3x3 block,
-                # we need to store it in the array 9 times
-                for offset in created_entity.offsets:
-                    offset_coord_x = offset[0] + created_entity.position[0]
-                    offset_coord_y = offset[1] + created_entity.position[1]
+        # === Post process ===
 
-                    # check that the offset is in the bondaries
-                    if offset_coord_x >= self.width or offset_coord_x < 0:
-                        continue
+        # Adding a temporary entity to the index where arms pickup or drop items
+        # on an empty tile
 
-                    if offset_coord_y >= self.heigth or offset_coord_y < 0:
-                        continue
+        with instrumentation.phase("virtual_entities"):
+            # The inserters are processed line by line
+            inserters = [e for e in self.entities if e.data["type"] == "inserter"]
+            inserters.sort(key=lambda e: (e.position[1], e.position[0]))
 
-                    self.array[offset_coord_y][offset_coord_x] = created_entity
+            for e in inserters:
+                self.add_virtual_entity(e)
 
-            else:
-                self.array[created_entity.position[1]
-                           ][created_entity.position[0]] = created_entity
+        utils.success(f"Blueprint {self.label} loaded successfully")
 
-        # === Post process ===
+    def create_entity(self, entity_dic):
+        # Returns the entity object of a blueprint entity dictionary,
+        # or None if the entity is not supported
+
+        # Replace infinit chests with a normal chest
+        if entity_dic["name"] == "infinity-chest":
+            entity_dic["name"] = "iron-chest"
+
+        # Creation of the entity from the blueprint entity dictionary
+        return entity.create_entity(entity_dic)
+
+    def get_entity_tiles(self, entity_obj):
+        # The tiles of the blueprint covered by the entity
+        if not entity_obj.large:
+            return [(entity_obj.position[0], entity_obj.position[1])]
+
+        # Because entites like the assembling machine is a 3x3 block,
+        # they are stored in the index on each of their tiles
+        tiles = []
+        for offset in entity_obj.offsets:
+            offset_coord = [offset[0] + entity_obj.position[0],
+                            offset[1] + entity_obj.position[1]]
+
+            # check that the offset is in the bondaries
+            if self.is_coord_in_boundaries(offset_coord):
+                tiles.append((offset_coord[0], offset_coord[1]))
+
+        return tiles
+
+    def place_entity(self, entity_obj):
+        for (x, y) in self.get_entity_tiles(entity_obj):
+            if self.grid.get(x, y) is not None:
+                # Overlapping entities, the last one is kept
+                self.hidden_tiles.add((x, y))
+            self.grid.set(x, y, entity_obj)
+
+    def add_virtual_entity(self, inserter):
+        # Adds a virtual chest on the drop tile of the inserter if it is empty
+        if self.grid.get(inserter.position[0], inserter.position[1]) is not inserter:
+            # The inserter tile has been overwritten by another entity
+            return
 
-        # Adding a temporary entity to the array where arms pickup or drop items
-        # on an empty tile
+        # Check drop tile
+        # If the drop tile is empty, add a virtual chest
+        # No need to check the pickup tile because the inserter
+        # will pickup the item from the virtual chest
+        # created by the other arm
+        drop_coord = inserter.get_drop_tile_coord()
+        if self.is_coord_in_boundaries(drop_coord):
+            drop_tile = self.grid.get(drop_coord[0], drop_coord[1])
+            if drop_tile is None:
+                # The drop tile is empty, we add a temporary entity
+                container = entity.create_entity(
+                    {
+                        'entity_number': str(inserter.number) + "_virtual\n(empty tile)",
+                        'name': 'wooden-chest',
+                        'position': {'x': drop_coord[0], 'y': drop_coord[1]}
+                    }, virtual=True)
+
+                utils.verbose(
+                    f"Adding temporary entity {container}")
+                self.grid.set(drop_coord[0], drop_coord[1], container)
+
+    def replace_entities(self, removed_entities, added_entities):
+        # Update the index after an edit of the blueprint entities
+        # The added entities positions are not yet relative to the origin
+        # Returns the changed tiles, or None if the blueprint must be created
+        # again: the edit changes the blueprint bounds or overlaps other entities
+        for added_entity in added_entities:
+            added_entity.position[0] -= self.origin[0]
+            added_entity.position[1] -= self.origin[1]
+
+            if not self.is_coord_in_boundaries(added_entity.position):
+                return None
+
+        # The bounds can change if an entity on the border is removed
+        if any(removed_entity.position[0] in [0, self.width - 1] or
+               removed_entity.position[1] in [0, self.heigth - 1]
+               for removed_entity in removed_entities):
+            positions = [e.position for e in self.entities + added_entities
+                         if all(e is not removed_entity for removed_entity in removed_entities)]
+            if len(positions) == 0 or \
+                    min(position[0] for position in positions) != 0 or \
+                    min(position[1] for position in positions) != 0 or \
+                    max(position[0] for position in positions) != self.width - 1 or \
+                    max(position[1] for position in positions) != self.heigth - 1:
+                return None
+
+        # Overlapping entities hide each other, the last one is kept
+        for removed_entity in removed_entities:
+            for (x, y) in self.get_entity_tiles(removed_entity):
+                if self.grid.get(x, y) is not removed_entity or (x, y) in self.hidden_tiles:
+                    return None
+
+        for added_entity in added_entities:
+            for (x, y) in self.get_entity_tiles(added_entity):
+                tile = self.grid.get(x, y)
+                if tile is not None and not tile.virtual and \
+                        all(tile is not removed_entity for removed_entity in removed_entities):
+                    return None
+
+        # The entities tiles and the drop tiles of the inserters
+        changed_tiles = set()
+        for edited_entity in removed_entities + added_entities:
+            changed_tiles.update(self.get_entity_tiles(edited_entity))
+            if edited_entity.data["type"] == "inserter":
+                drop_coord = edited_entity.get_drop_tile_coord()
+                if self.is_coord_in_boundaries(drop_coord):
+                    changed_tiles.add((drop_coord[0], drop_coord[1]))
+
+        # The added entities take the place of the removed ones in the list
+        index = len(self.entities)
+        for removed_entity in removed_entities:
+            for (x, y) in self.get_entity_tiles(removed_entity):
+                self.grid.remove(x, y)
+            index = self.entities.index(removed_entity)
+            self.entities.pop(index)
+
+        for added_entity in added_entities:
+            self.entities.insert(index, added_entity)
+            index += 1
+
+        # The virtual chests of the changed tiles are created again
+        for (x, y) in changed_tiles:
+            tile = self.grid.get(x, y)
+            if tile is not None and tile.virtual:
+                self.grid.remove(x, y)
+
+        for added_entity in added_entities:
+            self.place_entity(added_entity)
+
+        for (x, y) in sorted(changed_tiles, key=lambda tile: (tile[1], tile[0])):
+            if self.grid.get(x, y) is not None:
+                continue
 
-        for y in range(self.heigth):
-            for x in range(self.width):
-                e = self.array[y][x]
-                if e is not None and e.data["type"] == "inserter":
-                    # Check drop tile
-                    # If the drop tile is empty, add a virtual chest
-                    # No need to check the pickup tile because the inserter
-                    # will pickup the item from the virtual chest
-                    # created by the other arm
-                    drop_coord = e.get_drop_tile_coord()
-                    if self.is_coord_in_boundaries(drop_coord):
-                        drop_tile = self.array[drop_coord[1]][drop_coord[0]]
-                        if drop_tile is None:
-                            # The drop tile is empty, we add a temporary entity
-                            container = entity.create_entity(
-                                {
-                                    'entity_number': str(e.number) + "_virtual\n(empty tile)",
-                                    'name': 'wooden-chest',
-                                    'position': {'x': drop_coord[0], 'y': drop_coord[1]}
-                                }, virtual=True)
-
-                            utils.verbose(
-                                f"Adding temporary entity {container}")
-                            self.array[drop_coord[1]
-                                       ][drop_coord[0]] = container
+            # The first inserter, line by line, dropping on the tile
+            for (_, _, tile) in self.grid.query_rect(
+                    x - max_drop_distance, y - max_drop_distance,
+                    x + max_drop_distance, y + max_drop_distance):
+                if tile.data["type"] == "inserter" and \
+                        tile.get_drop_tile_coord() == [x, y] and \
+                        self.grid.get(tile.position[0], tile.position[1]) is tile:
+                    self.add_virtual_entity(tile)
+                    break
 
-        utils.success(f"Blueprint {self.label} loaded successfully")
+        return changed_tiles
 
     def is_coord_in_boundaries(self, coord):
         return coord[0] >= 0 and coord[0] < self.width and\
             coord[1] >= 0 and coord[1] < self.heigth
 
     def display(self):
-        if config.config.verbose_level < 3:
+        if config.get_config().verbose_level < 3:
             return
 
         utils.verbose(
@@ -154,9 +262,10 @@ class Blueprint:
             utils.verbose("  " + str(entity))
 
         utils.verbose("")
-        for (y, row) in enumerate(self.array):
+        for y in range(self.heigth):
             utils.verbose("   ", end=" ")
-            for (x, entity) in enumerate(row):
+            for x in range(self.width):
+                entity = self.grid.get(x, y)
                 if entity is None:
                     utils.verbose(" ", end=" ")
                 else:
@@ -167,9 +276,11 @@ class Blueprint:
             utils.verbose("")
         utils.verbose("")
 
-    def get_analysis(self):
+    def get_analysis(self, blueprint_json=None):
         # Read the blueprint network if it exists
         # Then fill the information in a new dictionary
+        # The analysis is written in the entities of the given
+        # blueprint JSON, the blueprint own JSON by default
 
         if self.network is None:
             raise Exception("No network found")
@@ -248,122 +359,156 @@ class Blueprint:
         #     "entities_input": [1, 2, 3, ...],
         #     "entities_output": [32, 33, 34, ...],
         #     "entities_bottleneck": [18, 23],
+        #
+        #     "metadata": {  # With the analysisMetadata config
+        #         "components": [
+        #             {"first_entity": 1, "nodes": 12, "entities": 40,
+        #              "time": 0.0012, "parallel": False},
+        #             ...
+        #         ]
+        #     }
         # }
 
-        analysed_bp = self.blueprint.copy()
+        if blueprint_json is None:
+            blueprint_json = self.blueprint
 
-        # Pre load network input and output
-        root_entities_number = [
-            node.entity.number for node in self.network.root_nodes()]
-        leaf_entities_number = [
-            node.entity.number for node in self.network.leaf_nodes()]
+        # The analysis is read from the network index, see csr.py
+        analysed_bp = get_index_analysis(self.network.csr(flows=True), blueprint_json)
 
-        entities_bottleneck = []
+        # Adding the groups of linked nodes sizes and calculation times
+        if config.get_config().analysis_metadata:
+            analysed_bp["blueprint"]["metadata"] = {
+                "components": [{
+                    "first_entity": stats["node"].entity.number,
+                    "nodes": stats["nodes"],
+                    "entities": stats["entities"],
+                    "time": stats["time"],
+                    "parallel": stats["parallel"]
+                } for stats in self.network.components_stats]
+            }
 
-        # Entities related information
-        for entity in analysed_bp["blueprint"]["entities"]:
-            node = self.network.get_node(entity["entity_number"])
+        return analysed_bp
 
-            if node is None:
-                continue
 
-            # Adding usage_rate
-            usage_rate = node.usage_ratio
-            if usage_rate is not None:
-                entity["usage_rate"] = usage_rate
-
-                # If the node as been "compacted" with other entities
-                # due to optimization, we need to update the oser entites
-                for compacted_node in node.compacted_nodes:
-                    compacted_entity = self._get_entity(
-                        compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
-                    compacted_entity["usage_rate"] = usage_rate
-
-                    # Adding bottleneck entities number
-                    if usage_rate >= 1:
-                        entities_bottleneck.append(
-                            compacted_entity["entity_number"])
-
-                # Adding bottleneck entities number
-                if usage_rate >= 1:
-                    entities_bottleneck.append(entity["entity_number"])
-
-            # Adding input/output
-            if node.entity.number in root_entities_number:
-                entity["input"] = True
-
-                for compacted_node in node.compacted_nodes:
-                    compacted_entity = self._get_entity(
-                        compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
-                    compacted_entity["input"] = True
-
-            if node.entity.number in leaf_entities_number:
-                entity["output"] = True
-
-                for compacted_node in node.compacted_nodes:
-                    compacted_entity = self._get_entity(
-                        compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
-                    compacted_entity["output"] = True
-
-            # Adding transpoted_items
-            entity["transpoted_items"] = node.flow.items
-            for compacted_node in node.compacted_nodes:
-                compacted_entity = self._get_entity(
-                    compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
-                compacted_entity["transpoted_items"] = node.flow.items
-
-            # Adding parents and childrens
-            entity["parents"] = node.original_parents
-            entity["children"] = node.original_childs
-
-            for compacted_node in node.compacted_nodes:
-                compacted_entity = self._get_entity(
-                    compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
-
-                compacted_entity["parents"] = compacted_node.original_parents
-                compacted_entity["children"] = compacted_node.original_childs
-
-        # Blueprint related information
-        # Adding the total in and out flow
-        items_input = {}
-        for root_node in self.network.root_nodes():
-            items = root_node.flow.items
-            for item in items:
-                if item in items_input:
-                    items_input[item] += items[item]
-                else:
-                    items_input[item] = items[item]
-
-        items_output = {}
-        for leaf_node in self.network.leaf_nodes():
-            items = leaf_node.flow.items
-            for item in items:
-                if item in items_output:
-                    items_output[item] += items[item]
-                else:
-                    items_output[item] = items[item]
+def get_index_analysis(graph, blueprint_json):
+    # Write the analysis of a network index in the entities
+    # of the blueprint JSON, see Blueprint.get_analysis
+    # The node objects are not used, only the index and its flows
+    analysed_bp = blueprint_json.copy()
+    entities = analysed_bp["blueprint"]["entities"]
 
-        analysed_bp["blueprint"]["items_input"] = items_input
-        analysed_bp["blueprint"]["items_output"] = items_output
+    # Index the blueprint entities by number, the first one is kept
+    entities_by_number = {}
+    for entity in entities:
+        if entity["entity_number"] not in entities_by_number:
+            entities_by_number[entity["entity_number"]] = entity
 
-        # Adding the entities input and output
-        analysed_bp["blueprint"]["entities_input"] = root_entities_number
-        analysed_bp["blueprint"]["entities_output"] = leaf_entities_number
+    # Index the nodes by entity number, the first node of an entity is kept
+    node_indexes = {}
+    for i in range(graph.nb_nodes):
+        node_indexes.setdefault(graph.get_entity_number(i), i)
 
-        # Adding the entities bottleneck
-        analysed_bp["blueprint"]["entities_bottleneck"] = entities_bottleneck
+    # Pre load network input and output
+    root_entities_number = [
+        graph.get_entity_number(i) for i in graph.root_indexes()]
+    leaf_entities_number = [
+        graph.get_entity_number(i) for i in graph.leaf_indexes()]
 
-        return analysed_bp
+    root_entities_number_set = set(root_entities_number)
+    leaf_entities_number_set = set(leaf_entities_number)
+
+    entities_bottleneck = []
 
-    def _get_entity(self, entity_number, entites):
-        for entity in entites:
-            if entity["entity_number"] == entity_number:
-                return entity
+    # Entities related information
+    for entity in entities:
+        i = node_indexes.get(entity["entity_number"])
 
-        return {}
+        if i is None:
+            continue
+
+        usage_rate = graph.get_usage_rate(i)
+        is_input = entity["entity_number"] in root_entities_number_set
+        is_output = entity["entity_number"] in leaf_entities_number_set
+
+        # The entities compacted in the node by the optimization
+        # are given the node flow, the items dictionary is shared
+        transported_items = graph.get_flow_items(i)
+
+        for member in graph.members(i):
+            if member == graph.member_offsets[i]:
+                member_entity = entity
+            else:
+                member_entity = entities_by_number.get(graph.get_member_number(member), {})
+
+            _set_entity_analysis(graph, member_entity, member, usage_rate,
+                                 is_input, is_output, transported_items)
+
+            # Adding bottleneck entities number
+            # The node entity is added after its compacted entities
+            if member != graph.member_offsets[i] and \
+                    usage_rate is not None and usage_rate >= 1:
+                entities_bottleneck.append(member_entity["entity_number"])
+
+        if usage_rate is not None and usage_rate >= 1:
+            entities_bottleneck.append(entity["entity_number"])
+
+    # Blueprint related information
+    # Adding the total in and out flow
+    items_input = item.Flow()
+    for i in graph.root_indexes():
+        for (item_id, amount) in graph.get_flow(i):
+            items_input.add_item_id(item_id, amount)
+
+    items_output = item.Flow()
+    for i in graph.leaf_indexes():
+        for (item_id, amount) in graph.get_flow(i):
+            items_output.add_item_id(item_id, amount)
+
+    analysed_bp["blueprint"]["items_input"] = items_input.items
+    analysed_bp["blueprint"]["items_output"] = items_output.items
+
+    # Adding the entities input and output
+    analysed_bp["blueprint"]["entities_input"] = root_entities_number
+    analysed_bp["blueprint"]["entities_output"] = leaf_entities_number
+
+    # Adding the entities bottleneck
+    analysed_bp["blueprint"]["entities_bottleneck"] = entities_bottleneck
+
+    return analysed_bp
+
+
+def _set_entity_analysis(graph, entity, member, usage_rate, is_input, is_output, transported_items):
+    # Write the analysis of an entity of a node in its blueprint entity
+
+    # Adding usage_rate
+    if usage_rate is not None:
+        entity["usage_rate"] = usage_rate
+
+    # Adding input/output
+    if is_input:
+        entity["input"] = True
+
+    if is_output:
+        entity["output"] = True
+
+    # Adding transpoted_items
+    entity["transpoted_items"] = transported_items
+
+    # Adding parents and childrens
+    entity["parents"] = graph.get_member_parents(member)
+    entity["children"] = graph.get_member_childs(member)
 
 
 def load_blueprint(blueprint_sting):
+    return Blueprint(read_blueprint(blueprint_sting))
+
+
+def load_blueprint_from_path(file_path):
+    return Blueprint(read_blueprint_from_path(file_path))
+
+
+def read_blueprint(blueprint_sting):
+    # Returns the blueprint JSON of a JSON or encoded blueprint string
     try:
         # Try to read the string directly as a JSON
         blueprint_json = json.loads(blueprint_sting)
@@ -371,10 +516,10 @@ def load_blueprint(blueprint_sting):
         # If it fails, try to decode it
         blueprint_json = utils.decode(blueprint_sting)
 
-    return Blueprint(blueprint_json)
+    return blueprint_json
 
 
-def load_blueprint_from_path(file_path):
+def read_blueprint_from_path(file_path):
     # Read the file
     if file_path.endswith(".json"):
         # No need to decode the json
@@ -386,4 +531,4 @@ def load_blueprint_from_path(file_path):
             bp_encoded = f.read()
         bp_json = utils.decode(bp_encoded)
 
-    return Blueprint(bp_json)
+    return bp_json
@@ -1,41 +1,45 @@
+from factorio_blueprint_analyser import analyser, context
+
+# -----------------------------------------------------------
+# Module level API, using a default analyser
+# To use several configs or data files in the same process,
+# create analyser.Analyser objects instead
+# -----------------------------------------------------------
 
-from factorio_blueprint_analyser import (
-    factorio,
-    blueprint,
-    network,
-    config
-)
 
 def init(config_dict=None):
-    # Init config
-    config.load_config(config_dict)
+    # Create the default analyser: read the config and load the Factorio data
+    context.set_default_analyser(analyser.Analyser(config_dict))
 
-    # Load the Factorio data
-    factorio.load_data()
 
+def get_analyser():
+    default_analyser = context.default_analyser
+    if default_analyser is None:
+        raise Exception(
+            "The analyser is not initialised, call blueprint_analyser.init() first")
 
-def analyse_blueprint(blueprint_string):
-    bp = blueprint.load_blueprint(blueprint_string)
-    return _process_blueprint(bp)
+    return default_analyser
 
 
-def analyse_blueprint_from_path(blueprint_path):
-    bp = blueprint.load_blueprint_from_path(blueprint_path)
-    return _process_blueprint(bp)
+def get_cache_stats():
+    return get_analyser().get_cache_stats()
+
+
+def create_pool(processes):
+    return get_analyser().create_pool(processes)
 
 
-def _process_blueprint(bp):
-    bp.display()
+def analyse_blueprint(blueprint_string):
+    return get_analyser().analyse_blueprint(blueprint_string)
+
+
+def analyse_blueprint_from_path(blueprint_path):
+    return get_analyser().analyse_blueprint_from_path(blueprint_path)
 
-    # Creade a node network from the blueprint
-    nw = network.create_network(bp)
 
-    # Calculate bottleneck
-    nw.calculate_bottleneck()
-    if config.config.display_network:
-        nw.display()
+def analyse_blueprint_json(blueprint_json):
+    return get_analyser().analyse_blueprint_json(blueprint_json)
 
-    # Export the analysis
-    analysis_result = bp.get_analysis()
 
-    return analysis_result
+def sweep_blueprint_from_path(blueprint_path, scenarios):
+    return get_analyser().sweep_blueprint_from_path(blueprint_path, scenarios)
@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import as_completed
+
+from factorio_blueprint_analyser import blueprint_analyser, blueprint
+
+# -----------------------------------------------------------
+# Analyse all the blueprints of a blueprint book
+# The blueprints are analysed in a pool of processes, each process
+# loads the Factorio data once and then analyses the blueprints it
+# receives. A result is given for each blueprint as soon as it is
+# analysed, an error in one blueprint doesn't stop the others.
+#
+# Each result is a dictionary:
+#   {
+#       "path": [1, 0],  # Index of the blueprint in each nested book
+#       "label": "My blueprint",
+#       "time": 0.42,  # Analysis time in seconds
+#       "analysis": {...},  # None if the analysis failed
+#       "error": None  # The error message if the analysis failed
+#   }
+# -----------------------------------------------------------
+
+# Book entries that are not blueprints
+ignored_entries = ["upgrade_planner", "deconstruction_planner"]
+
+
+def list_blueprints(book_json, book_path=None):
+    # Returns the (path, blueprint_json) of all the blueprints of the book,
+    # in the book order, nested books included
+    if book_path is None:
+        book_path = []
+
+    if "blueprint" in book_json:
+        # Single blueprint
+        return [(book_path, book_json)]
+
+    if "blueprint_book" not in book_json:
+        raise Exception("Invalid blueprint book, no 'blueprint_book' key found")
+
+    blueprints = []
+    entries = book_json["blueprint_book"].get("blueprints", [])
+    for (i, entry) in enumerate(entries):
+        path = book_path + [entry["index"] if "index" in entry else i]
+
+        if "blueprint" in entry or "blueprint_book" in entry:
+            blueprints.extend(list_blueprints(entry, path))
+        elif not any(key in entry for key in ignored_entries):
+            raise Exception(f"Unknown blueprint book entry at {path}")
+
+    return blueprints
+
+
+def analyse_book(book_json, processes=None):
+    # Generator of the blueprints analysis results, in completion order
+    # processes: number of processes, the CPU count by default
+    # with processes=1, the blueprints are analysed in this process
+    blueprints = list_blueprints(book_json)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(blueprints)))
+
+    if processes == 1:
+        for (path, bp_json) in blueprints:
+            yield _analyse(path, bp_json)
+        return
+
+    with blueprint_analyser.create_pool(processes) as executor:
+        futures = {executor.submit(_analyse, path, bp_json): (path, bp_json)
+                   for (path, bp_json) in blueprints}
+
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker process itself failed
+                path, bp_json = futures[future]
+                yield _result(path, _get_label(bp_json), 0, None, e)
+
+
+def analyse_book_string(book_string, processes=None):
+    return analyse_book(blueprint.read_blueprint(book_string), processes)
+
+
+def analyse_book_from_path(book_path, processes=None):
+    return analyse_book(blueprint.read_blueprint_from_path(book_path), processes)
+
+
+def _analyse(path, bp_json):
+    start = time.perf_counter()
+    label = _get_label(bp_json)
+
+    try:
+        analysis = blueprint_analyser.analyse_blueprint_json(bp_json)
+    except Exception as e:
+        return _result(path, label, time.perf_counter() - start, None, e)
+
+    return _result(path, label, time.perf_counter() - start, analysis, None)
+
+
+def _result(path, label, duration, analysis, error):
+    return {
+        "path": path,
+        "label": label,
+        "time": duration,
+        "analysis": analysis,
+        "error": None if error is None else f"{type(error).__name__}: {error}"
+    }
+
+
+def _get_label(bp_json):
+    if "blueprint" in bp_json and "label" in bp_json["blueprint"]:
+        return bp_json["blueprint"]["label"]
+    return "No label"
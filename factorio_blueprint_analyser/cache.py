@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import marshal
+import tempfile
+
+from factorio_blueprint_analyser import utils, __version__
+
+# -----------------------------------------------------------
+# On-disk cache of the blueprint analysis results
+#
+# A result is stored in a file named after the hash of:
+#   - the blueprint content, with its keys sorted
+#   - the config values used by the analysis
+#   - the Factorio data file digest
+#   - the analyser version
+# so a result is never reused if one of them changes.
+#
+# The files are written atomically, several processes can share
+# the same cache directory. When the cache is too big, the least
+# recently used results are removed: a file modification time is
+# updated each time the result is read.
+# -----------------------------------------------------------
+
+file_extension = ".marshal"
+
+
+class ResultCache:
+    def __init__(self, cache_dir, max_size, max_entries):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size  # bytes
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Estimation of the cache content, the other processes
+        # using the cache directory can change it
+        self.size = None
+        self.entries = None
+
+    def make_key(self, blueprint_json, config_digest):
+        content = json.dumps(blueprint_json, sort_keys=True, separators=(",", ":"))
+
+        key = hashlib.sha256(content.encode("utf8"))
+        key.update(config_digest.encode("utf8"))
+        # The marshal format can change between Python versions
+        key.update(f"{__version__}_{marshal.version}".encode("utf8"))
+
+        return key.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, key + file_extension)
+
+    def get(self, key):
+        # Returns the cached analysis or None
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                analysis = marshal.loads(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            utils.warning(f"Invalid cached result {path}, ignoring it")
+            self.misses += 1
+            return None
+
+        # Mark the result as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return analysis
+
+    def set(self, key, analysis):
+        path = self.get_path(key)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # The result is written in a temporary file first
+            # so another process never reads a partially written result
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    marshal.dump(analysis, f)
+                    size = f.tell()
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        except (OSError, ValueError) as e:
+            utils.warning(f"Could not save the analysis in the cache: {e}")
+            return
+
+        if self.size is None:
+            self.scan()
+        else:
+            self.size += size
+            self.entries += 1
+
+        if self.size > self.max_size or self.entries > self.max_entries:
+            self.evict()
+
+    def scan(self):
+        # Returns the (mtime, size, path) of the cached results
+        # and updates the cache content estimation
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(file_extension):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Removed by another process
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+
+        self.size = sum(file[1] for file in files)
+        self.entries = len(files)
+
+        return files
+
+    def evict(self):
+        # Remove the least recently used results until the cache fits its limits
+        files = self.scan()
+        files.sort()
+
+        for (_, size, path) in files:
+            if self.size <= self.max_size and self.entries <= self.max_entries:
+                break
+
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                # Already removed by another process
+                pass
+
+            self.size -= size
+            self.entries -= 1
+
+    def clear(self):
+        for (_, _, path) in self.scan():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        self.size = 0
+        self.entries = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
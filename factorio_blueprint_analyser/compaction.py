@@ -0,0 +1,125 @@
+# -----------------------------------------------------------
+# Compacted nodes tracking
+# When the network is optimized, the removed nodes are merged
+# in their parent, see node.py. The merged nodes are kept in
+# disjoint sets, one set by surviving node:
+#
+#   - Each removed node points to the node it was merged in,
+#     the pointers are followed to the surviving node and
+#     shortened on the way (path compression)
+#   - The nodes of a set are kept in a linked list, in the
+#     order used by the exporter: each node after the nodes
+#     merged in it. Merging two sets links the two lists.
+#
+# Finding the surviving node of an entity, and the nodes
+# compacted in a surviving node, don't walk the merge history.
+# -----------------------------------------------------------
+
+
+class Compaction:
+    def __init__(self):
+        # {id(node): node the node was merged in}, removed nodes only
+        self.merged_in = {}
+
+        # {entity number: removed node}, the first node of an entity is kept
+        self.removed_by_entity = {}
+
+        # Linked lists of the compacted nodes, by surviving node
+        self.first = {}  # {id(node): first compacted node}
+        self.last = {}  # {id(node): last compacted node}
+        self.next = {}  # {id(node): next compacted node of the same list}
+        self.sizes = {}  # {id(node): number of compacted nodes}
+
+    def merge(self, node, parent):
+        # The node is removed and merged in its parent,
+        # with the nodes already merged in it
+        # The parent list becomes: parent list + node list + node
+        self.merged_in[id(node)] = parent
+        if node.entity.number not in self.removed_by_entity:
+            self.removed_by_entity[node.entity.number] = node
+
+        # The node list, followed by the node
+        first = self.first.pop(id(node), node)
+        last = self.last.pop(id(node), None)
+        if last is not None:
+            self.next[id(last)] = node
+        size = self.sizes.pop(id(node), 0) + 1
+
+        # Appended to the parent list
+        if id(parent) in self.last:
+            self.next[id(self.last[id(parent)])] = first
+        else:
+            self.first[id(parent)] = first
+        self.last[id(parent)] = node
+        self.sizes[id(parent)] = self.sizes.get(id(parent), 0) + size
+
+    def discard(self, node):
+        # Forget the surviving node and the nodes merged in it
+        for compacted_node in self.get_compacted_nodes(node):
+            del self.merged_in[id(compacted_node)]
+            self.next.pop(id(compacted_node), None)
+            if self.removed_by_entity.get(compacted_node.entity.number) is compacted_node:
+                del self.removed_by_entity[compacted_node.entity.number]
+
+        self.first.pop(id(node), None)
+        self.last.pop(id(node), None)
+        self.next.pop(id(node), None)
+        self.sizes.pop(id(node), None)
+
+    def update(self, other):
+        # Add the sets of another compaction, with other surviving nodes
+        self.merged_in.update(other.merged_in)
+        for (entity_number, node) in other.removed_by_entity.items():
+            self.removed_by_entity.setdefault(entity_number, node)
+        self.first.update(other.first)
+        self.last.update(other.last)
+        self.next.update(other.next)
+        self.sizes.update(other.sizes)
+
+    def find(self, node):
+        # The surviving node the given node was merged in,
+        # or the node itself if it was not removed
+        root = node
+        while id(root) in self.merged_in:
+            root = self.merged_in[id(root)]
+
+        # Path compression
+        while node is not root:
+            (self.merged_in[id(node)], node) = (root, self.merged_in[id(node)])
+
+        return root
+
+    def find_entity(self, entity_number):
+        # The surviving node of a removed entity, None if
+        # the entity was not removed
+        node = self.removed_by_entity.get(entity_number)
+        if node is None:
+            return None
+
+        return self.find(node)
+
+    def is_compacted(self, node):
+        # True if the node was merged in another node
+        return id(node) in self.merged_in
+
+    def nb_removed_nodes(self):
+        # Number of nodes merged in another node
+        return len(self.merged_in)
+
+    def nb_compacted_nodes(self, node):
+        return self.sizes.get(id(node), 0)
+
+    def get_compacted_nodes(self, node):
+        # The nodes merged in the surviving node, and the nodes
+        # merged in them, each node after the nodes merged in it
+        compacted_nodes = []
+        compacted_node = self.first.get(id(node))
+        last = self.last.get(id(node))
+
+        while compacted_node is not None:
+            compacted_nodes.append(compacted_node)
+            if compacted_node is last:
+                break
+            compacted_node = self.next.get(id(compacted_node))
+
+        return compacted_nodes
@@ -1,12 +1,15 @@
 import os
 import pathlib
 
-config = None
+from factorio_blueprint_analyser import context
 
 # Finding where the assets are for when this is installed as a package
 parent_path = pathlib.Path(__file__).parent.resolve()
 
 # factorio:
+#   # Recipes difficulty: normal or expensive
+#   difficulty: normal
+
 #   # Inserter_capacity_bonus
 #   # number between 0 and 7
 #   # (https://wiki.factorio.com/Inserter_capacity_bonus_(research))
@@ -18,12 +21,49 @@ parent_path = pathlib.Path(__file__).parent.resolve()
 #   # (Comming soon)
 #   data_file_path: "factorio_blueprint_analyser/assets/factorio_raw/factorio_raw_min.json"
 
+#   # The Factorio data is saved in this directory as a binary snapshot
+#   # to speed up the next loads. Set to an empty string to disable it
+#   snapshot_dir: "~/.cache/factorio_blueprint_analyser"
+
+# cache:
+#   # The analysis results are saved in this directory and reused
+#   # when the same blueprint is analysed again with the same config
+#   # Set to an empty string to disable it
+#   dir: ""
+#   # When the cache is bigger than this size, in megabytes, or has more
+#   # results than this number, the least recently used results are removed
+#   max_size: 512
+#   max_entries: 100000
+
 # network:
 #   # The alogrithm will displat the
 #   # results on a web page in a node network
 #   # You can disable this feature by setting this to false
 #   display: true
 
+#   # The bottleneck solver:
+#   # - greedy: the leaf nodes ask their parents for the items
+#   # - lp: the flows are calculated as a linear program,
+#   #   slower but the best throughput is always found
+#   bottleneck_solver: greedy
+
+#   # The groups of linked nodes with at least parallel_min_nodes nodes
+#   # are solved by this number of processes, with the lp solver
+#   # Set to 0 to solve all the groups in the analyser process
+#   # The processes are started by the first analysis needing them
+#   # and used by the next analyses, until Analyser.close is called
+#   solver_processes: 0
+#   parallel_min_nodes: 1000
+
+#   # Add the sizes and the calculation times of
+#   # the groups of linked nodes to the analysis
+#   # The analysis cache is not used with this option
+#   metadata: false
+
+#   # Add the time of each analysis phase and the number
+#   # of flow calculation calls to the analysis metadata
+#   instrumentation: false
+
 # # Verbose level
 # # 1: only errors
 # # 2: errors and warnings
@@ -33,16 +73,36 @@ parent_path = pathlib.Path(__file__).parent.resolve()
 
 class Config:
     # Factorio
+    difficulty = "normal"
     inserter_capacity_bonus = 0
     data_file_path = str(parent_path) + \
         "/assets/factorio_raw/factorio_raw_min.json"
+    snapshot_dir = "~/.cache/factorio_blueprint_analyser"
+    # Result cache
+    cache_dir = ""
+    cache_max_size = 512  # megabytes
+    cache_max_entries = 100000
     # Network
     display_network = True
+    bottleneck_solver = "greedy"
+    solver_processes = 0
+    parallel_min_nodes = 1000
+    analysis_metadata = False
+    instrumentation = False
     # Verbose level
     verbose_level = 3
 
     def __init__(self, config=None):
         if config:
+            if "difficulty" in config:
+                difficulty = config["difficulty"]
+                if difficulty in ["normal", "expensive"]:
+                    self.difficulty = difficulty
+                else:
+                    print(
+                        f"Config warning: Invalid difficulty value: {difficulty}. The value must be \
+                        normal or expensive. Using default value: {self.difficulty}")
+
             if "inserterCapacityBonus" in config:
                 bonus = config["inserterCapacityBonus"]
                 if type(bonus) is int and 0 <= bonus <= 7:
@@ -61,6 +121,42 @@ class Config:
                         f"Config warning: Invalid dataFilePath value: {path}. The file does not exist.\
                              Using default value: {self.data_file_path}")
 
+            if "snapshotDir" in config:
+                snapshot_dir = config["snapshotDir"]
+                if type(snapshot_dir) is str:
+                    self.snapshot_dir = snapshot_dir
+                else:
+                    print(
+                        f"Config warning: Invalid snapshotDir value: {snapshot_dir}. The value must be a \
+                        string. Using default value: {self.snapshot_dir}")
+
+            if "cacheDir" in config:
+                cache_dir = config["cacheDir"]
+                if type(cache_dir) is str:
+                    self.cache_dir = cache_dir
+                else:
+                    print(
+                        f"Config warning: Invalid cacheDir value: {cache_dir}. The value must be a \
+                        string. Using default value: {self.cache_dir}")
+
+            if "cacheMaxSize" in config:
+                max_size = config["cacheMaxSize"]
+                if type(max_size) in [int, float] and max_size > 0:
+                    self.cache_max_size = max_size
+                else:
+                    print(
+                        f"Config warning: Invalid cacheMaxSize value: {max_size}. The value must be a \
+                        positive number. Using default value: {self.cache_max_size}")
+
+            if "cacheMaxEntries" in config:
+                max_entries = config["cacheMaxEntries"]
+                if type(max_entries) is int and max_entries > 0:
+                    self.cache_max_entries = max_entries
+                else:
+                    print(
+                        f"Config warning: Invalid cacheMaxEntries value: {max_entries}. The value must be a \
+                        positive integer. Using default value: {self.cache_max_entries}")
+
             if "displayNetwork" in config:
                 if type(config["displayNetwork"]) is bool:
                     self.display_network = config["displayNetwork"]
@@ -69,6 +165,49 @@ class Config:
                         f"Config warning: Invalid displayNetwork value: {config['displayNetwork']}. \
                             The value must be a boolean. Using default value: {self.display_network}")
 
+            if "bottleneckSolver" in config:
+                solver = config["bottleneckSolver"]
+                if solver in ["greedy", "lp"]:
+                    self.bottleneck_solver = solver
+                else:
+                    print(
+                        f"Config warning: Invalid bottleneckSolver value: {solver}. The value must be \
+                        greedy or lp. Using default value: {self.bottleneck_solver}")
+
+            if "solverProcesses" in config:
+                processes = config["solverProcesses"]
+                if type(processes) is int and processes >= 0:
+                    self.solver_processes = processes
+                else:
+                    print(
+                        f"Config warning: Invalid solverProcesses value: {processes}. The value must be a \
+                        positive integer or 0. Using default value: {self.solver_processes}")
+
+            if "parallelMinNodes" in config:
+                min_nodes = config["parallelMinNodes"]
+                if type(min_nodes) is int and min_nodes > 0:
+                    self.parallel_min_nodes = min_nodes
+                else:
+                    print(
+                        f"Config warning: Invalid parallelMinNodes value: {min_nodes}. The value must be a \
+                        positive integer. Using default value: {self.parallel_min_nodes}")
+
+            if "analysisMetadata" in config:
+                if type(config["analysisMetadata"]) is bool:
+                    self.analysis_metadata = config["analysisMetadata"]
+                else:
+                    print(
+                        f"Config warning: Invalid analysisMetadata value: {config['analysisMetadata']}. \
+                            The value must be a boolean. Using default value: {self.analysis_metadata}")
+
+            if "instrumentation" in config:
+                if type(config["instrumentation"]) is bool:
+                    self.instrumentation = config["instrumentation"]
+                else:
+                    print(
+                        f"Config warning: Invalid instrumentation value: {config['instrumentation']}. \
+                            The value must be a boolean. Using default value: {self.instrumentation}")
+
             if "verboseLevel" in config:
                 level = config["verboseLevel"]
                 if type(level) is int and 0 <= level <= 3:
@@ -79,6 +218,34 @@ class Config:
                         integer between 0 and 3. Using default value: {self.verbose_level}")
 
 
-def load_config(config_dict):
-    global config
-    config = Config(config_dict)
+    def to_dict(self):
+        # Returns the config in the format given to the constructor
+        return {
+            "difficulty": self.difficulty,
+            "inserterCapacityBonus": self.inserter_capacity_bonus,
+            "dataFilePath": self.data_file_path,
+            "snapshotDir": self.snapshot_dir,
+            "cacheDir": self.cache_dir,
+            "cacheMaxSize": self.cache_max_size,
+            "cacheMaxEntries": self.cache_max_entries,
+            "displayNetwork": self.display_network,
+            "bottleneckSolver": self.bottleneck_solver,
+            "solverProcesses": self.solver_processes,
+            "parallelMinNodes": self.parallel_min_nodes,
+            "analysisMetadata": self.analysis_metadata,
+            "instrumentation": self.instrumentation,
+            "verboseLevel": self.verbose_level
+        }
+
+
+# Used when no analyser is initialised
+default_config = Config()
+
+
+def get_config():
+    # Returns the config of the current analyser, see context.py
+    analyser = context.get_analyser()
+    if analyser is None:
+        return default_config
+
+    return analyser.config
@@ -0,0 +1,38 @@
+import contextvars
+import contextlib
+
+# -----------------------------------------------------------
+# Analyser used by the current thread or task
+# The modules read the config and the Factorio data of this analyser,
+# so several analysers can be used in the same process, even at the
+# same time from different threads. When no analyser is activated,
+# the default analyser, created by blueprint_analyser.init, is used
+# -----------------------------------------------------------
+
+_current_analyser = contextvars.ContextVar("current_analyser", default=None)
+
+default_analyser = None
+
+
+def get_analyser():
+    # Returns the current analyser, or None if there is none
+    analyser = _current_analyser.get()
+    if analyser is None:
+        return default_analyser
+
+    return analyser
+
+
+def set_default_analyser(analyser):
+    global default_analyser
+    default_analyser = analyser
+
+
+@contextlib.contextmanager
+def use_analyser(analyser):
+    # Activate the analyser in the current thread or task
+    token = _current_analyser.set(analyser)
+    try:
+        yield analyser
+    finally:
+        _current_analyser.reset(token)
@@ -0,0 +1,375 @@
+from array import array
+
+from factorio_blueprint_analyser import item
+
+# -----------------------------------------------------------
+# Network index
+# Immutable copy of a network in typed arrays: the nodes are
+# numbered from 0 and each array holds one value by node,
+# or one row of values by node. The linear programming solver
+# and the analysis export only read the index, the node objects
+# and the entities can be released once it is created,
+# see benchmarks/bench_csr.py
+#
+# The rows are stored in the compressed sparse row format,
+# the childs of the node i are:
+#   child_indexes[child_offsets[i]:child_offsets[i + 1]]
+# and its parents, the same way:
+#   parent_indexes[parent_offsets[i]:parent_offsets[i + 1]]
+#
+# The index is made of three parts:
+#   - The topology, the capacities and the recipes of the nodes,
+#     and the entities merged in each node with their original links
+#   - The items transported by the nodes, loaded once their
+#     purposes are estimated, see load_items
+#   - The flows of the nodes, loaded from the nodes after the
+#     greedy calculation or set by the linear programming solver
+#
+# The network keeps its index until the topology or the capacities
+# change, and unloads the items and the flows when they change.
+# The types, recipes and virtual entities are numbered by each index,
+# the indexes of several analysers can be created at the same time.
+# -----------------------------------------------------------
+
+# Capacity of the nodes without speed (chests)
+no_capacity = -1.0
+
+# Recipe id of the nodes without recipe
+no_recipe = -1
+
+
+class CSRNetwork:
+    def __init__(self, network):
+        nodes = network.nodes
+        self.nb_nodes = len(nodes)
+
+        node_indexes = {id(node): i for (i, node) in enumerate(nodes)}
+
+        (self.child_offsets, self.child_indexes) = \
+            _create_rows(nodes, node_indexes, "childs")
+        (self.parent_offsets, self.parent_indexes) = \
+            _create_rows(nodes, node_indexes, "parents")
+
+        # Nodes data
+        self.entity_numbers = array("q")
+        self.type_codes = array("H")
+        self.capacities = array("d")
+        self.recipe_ids = array("i")
+
+        # Type names by type code
+        self.type_names = []
+        type_codes = {}
+
+        # Numbers of the virtual entities added by the analyser,
+        # the entity number -1 - i is the virtual entity i
+        self.virtual_numbers = []
+
+        # Recipes by recipe id, one recipe id by recipe and crafting speed:
+        # items produced per second, result item id and ingredients
+        self.recipe_names = []
+        self.recipe_rates = array("d")
+        self.recipe_result_ids = array("i")
+        self.ingredient_offsets = array("i", [0])
+        self.ingredient_ids = array("i")
+        self.ingredient_ratios = array("d")  # Ingredient per result item
+        recipe_ids = {}
+
+        # Entities merged in each node, the node entity first,
+        # and their parents and childs before the optimization
+        self.member_offsets = array("i", [0])
+        self.member_numbers = array("q")
+        self.member_parent_offsets = array("i", [0])
+        self.member_parent_numbers = array("q")
+        self.member_child_offsets = array("i", [0])
+        self.member_child_numbers = array("q")
+
+        for node in nodes:
+            self.entity_numbers.append(self.encode_number(node.entity.number))
+
+            if node.type not in type_codes:
+                type_codes[node.type] = len(self.type_names)
+                self.type_names.append(node.type)
+            self.type_codes.append(type_codes[node.type])
+
+            # Items per second of the transport nodes,
+            # crafting speed of the assembling machines
+            speed = node.speed
+            self.capacities.append(speed if speed is not None else no_capacity)
+
+            recipe = getattr(node.entity, "recipe", None)
+
+            if recipe is None:
+                self.recipe_ids.append(no_recipe)
+            else:
+                recipe_key = (recipe.name, node.entity.speed)
+                if recipe_key not in recipe_ids:
+                    recipe_ids[recipe_key] = len(self.recipe_names)
+                    self.add_recipe(node.entity)
+                self.recipe_ids.append(recipe_ids[recipe_key])
+
+            members = [node]
+            if network.compaction.nb_compacted_nodes(node) > 0:
+                members += node.get_compacted_nodes()
+
+            for member in members:
+                self.member_numbers.append(self.encode_number(member.entity.number))
+                self.member_parent_numbers.extend(self.encode_numbers(member.original_parents))
+                self.member_parent_offsets.append(len(self.member_parent_numbers))
+                self.member_child_numbers.extend(self.encode_numbers(member.original_childs))
+                self.member_child_offsets.append(len(self.member_child_numbers))
+            self.member_offsets.append(len(self.member_numbers))
+
+        # Loaded later, see load_items and load_flows
+        self.unload_items()
+        self.unload_flows()
+
+    def add_recipe(self, assembling_machine):
+        # The ratios are calculated as the assembling machine does,
+        # the machines of a recipe id have the same crafting speed
+        recipe = assembling_machine.recipe
+        items_per_second = assembling_machine.items_per_second
+
+        self.recipe_names.append(recipe.name)
+        self.recipe_rates.append(items_per_second)
+        self.recipe_result_ids.append(item.get_item_id(recipe.result.name))
+
+        for ingredient_name in unique_names(recipe.ingredients):
+            self.ingredient_ids.append(item.get_item_id(ingredient_name))
+            self.ingredient_ratios.append(
+                assembling_machine.required_items_per_second[ingredient_name] / items_per_second)
+        self.ingredient_offsets.append(len(self.ingredient_ids))
+
+    def encode_number(self, number):
+        # The virtual entities numbers are not integers
+        if type(number) is int:
+            return number
+
+        self.virtual_numbers.append(number)
+        return -len(self.virtual_numbers)
+
+    def encode_numbers(self, numbers):
+        if all(type(number) is int for number in numbers):
+            return numbers
+        return [self.encode_number(number) for number in numbers]
+
+    def decode_number(self, code):
+        return code if code >= 0 else self.virtual_numbers[-1 - code]
+
+    def decode_numbers(self, codes):
+        numbers = codes.tolist()
+        if len(self.virtual_numbers) > 0:
+            numbers = [self.decode_number(code) for code in numbers]
+        return numbers
+
+    # Topology
+    def childs(self, i):
+        return self.child_indexes[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def parents(self, i):
+        return self.parent_indexes[self.parent_offsets[i]:self.parent_offsets[i + 1]]
+
+    def nb_childs(self, i):
+        return self.child_offsets[i + 1] - self.child_offsets[i]
+
+    def nb_parents(self, i):
+        return self.parent_offsets[i + 1] - self.parent_offsets[i]
+
+    def root_indexes(self):
+        return [i for i in range(self.nb_nodes) if self.nb_parents(i) == 0]
+
+    def leaf_indexes(self):
+        return [i for i in range(self.nb_nodes) if self.nb_childs(i) == 0]
+
+    def components(self):
+        # Returns the groups of linked nodes indexes, in the nodes order
+        # Union-find on the links
+        group = array("q", range(self.nb_nodes))
+
+        def find(i):
+            while group[i] != i:
+                group[i] = group[group[i]]
+                i = group[i]
+            return i
+
+        for i in range(self.nb_nodes):
+            for j in self.childs(i):
+                group[find(i)] = find(j)
+
+        components = {}
+        for i in range(self.nb_nodes):
+            components.setdefault(find(i), []).append(i)
+
+        return list(components.values())
+
+    # Nodes data
+    def get_entity_number(self, i):
+        return self.decode_number(self.entity_numbers[i])
+
+    def get_type(self, i):
+        return self.type_names[self.type_codes[i]]
+
+    def is_assembly(self, i):
+        return self.get_type(i) == "assembling-machine"
+
+    def get_capacity(self, i):
+        # The node speed, None if the node has no limit
+        capacity = self.capacities[i]
+        return capacity if capacity != no_capacity else None
+
+    def get_recipe_id(self, i):
+        recipe_id = self.recipe_ids[i]
+        return recipe_id if recipe_id != no_recipe else None
+
+    def get_recipe_name(self, i):
+        recipe_id = self.recipe_ids[i]
+        return self.recipe_names[recipe_id] if recipe_id != no_recipe else None
+
+    def get_ingredients(self, recipe_id):
+        # Returns the ingredients ids and their amount per result item
+        start = self.ingredient_offsets[recipe_id]
+        end = self.ingredient_offsets[recipe_id + 1]
+        return zip(self.ingredient_ids[start:end], self.ingredient_ratios[start:end])
+
+    def get_usage_rate(self, i):
+        # Same as the node usage_ratio
+        if self.is_assembly(i):
+            recipe_id = self.get_recipe_id(i)
+            if recipe_id is None:
+                return None
+            return self.flow_totals[i] / self.recipe_rates[recipe_id]
+
+        capacity = self.get_capacity(i)
+        if capacity is None:
+            return None
+        return self.flow_totals[i] / capacity
+
+    # Entities merged in the nodes
+    def members(self, i):
+        # The members positions of the node, its own entity first
+        return range(self.member_offsets[i], self.member_offsets[i + 1])
+
+    def get_member_number(self, member):
+        return self.decode_number(self.member_numbers[member])
+
+    def get_member_parents(self, member):
+        start = self.member_parent_offsets[member]
+        end = self.member_parent_offsets[member + 1]
+        return self.decode_numbers(self.member_parent_numbers[start:end])
+
+    def get_member_childs(self, member):
+        start = self.member_child_offsets[member]
+        end = self.member_child_offsets[member + 1]
+        return self.decode_numbers(self.member_child_numbers[start:end])
+
+    # Items
+    def load_items(self, nodes):
+        # The items transported by the transport nodes, and the
+        # items given out of the network by the leaf nodes
+        self.transported_offsets = array("i", [0])
+        self.transported_ids = array("i")
+        self.output_offsets = array("i", [0])
+        self.output_ids = array("i")
+
+        # The leaf nodes without purpose find their items from their
+        # parents first, the nodes without purpose before them are
+        # given the items of their own parents, see node.py
+        items_outputs = {i: nodes[i].get_materials_output() for i in self.leaf_indexes()}
+
+        for (i, node) in enumerate(nodes):
+            if not self.is_assembly(i) and node.transported_items is not None:
+                for item_name in unique_names(node.transported_items):
+                    self.transported_ids.append(item.get_item_id(item_name))
+            self.transported_offsets.append(len(self.transported_ids))
+
+            if items_outputs.get(i) is not None:
+                for item_name in unique_names(items_outputs[i]):
+                    self.output_ids.append(item.get_item_id(item_name))
+            self.output_offsets.append(len(self.output_ids))
+
+    def unload_items(self):
+        self.transported_offsets = None
+        self.transported_ids = None
+        self.output_offsets = None
+        self.output_ids = None
+
+    def has_items(self):
+        return self.transported_offsets is not None
+
+    def get_transported_items(self, i):
+        return self.transported_ids[self.transported_offsets[i]:self.transported_offsets[i + 1]]
+
+    def get_output_items(self, i):
+        # The items given out of the network by a leaf node
+        return self.output_ids[self.output_offsets[i]:self.output_offsets[i + 1]]
+
+    # Flows
+    def load_flows(self, nodes):
+        # The flows calculated on the nodes, with their total amount
+        self.flow_offsets = array("i", [0])
+        self.flow_ids = array("i")
+        self.flow_amounts = array("d")
+        self.flow_totals = array("d")
+
+        for node in nodes:
+            self.flow_ids.extend(node.flow.item_ids)
+            self.flow_amounts.extend(node.flow.amounts)
+            self.flow_offsets.append(len(self.flow_ids))
+            self.flow_totals.append(node.flow.total_amount)
+
+    def set_flows(self, flows):
+        # flows: {node index: [(item id, amount)]}, in the flow order
+        self.flow_offsets = array("i", [0])
+        self.flow_ids = array("i")
+        self.flow_amounts = array("d")
+        self.flow_totals = array("d")
+
+        for i in range(self.nb_nodes):
+            total_amount = 0
+            for (item_id, amount) in flows.get(i, []):
+                self.flow_ids.append(item_id)
+                self.flow_amounts.append(amount)
+                total_amount += amount
+            self.flow_offsets.append(len(self.flow_ids))
+            self.flow_totals.append(total_amount)
+
+    def unload_flows(self):
+        self.flow_offsets = None
+        self.flow_ids = None
+        self.flow_amounts = None
+        self.flow_totals = None
+
+    def has_flows(self):
+        return self.flow_offsets is not None
+
+    def get_flow(self, i):
+        # The (item id, amount) of the node flow
+        start = self.flow_offsets[i]
+        end = self.flow_offsets[i + 1]
+        return zip(self.flow_ids[start:end], self.flow_amounts[start:end])
+
+    def get_flow_items(self, i):
+        # The amounts by item name, as Flow.items
+        return {item.item_names[item_id]: amount for (item_id, amount) in self.get_flow(i)}
+
+
+def _create_rows(nodes, node_indexes, direction):
+    # Returns the offsets and the indexes arrays of the nodes links
+    offsets = array("i", [0])
+    indexes = array("i")
+
+    for node in nodes:
+        for neighbour in getattr(node, direction):
+            i = node_indexes.get(id(neighbour))
+            if i is not None:
+                indexes.append(i)
+        offsets.append(len(indexes))
+
+    return (offsets, indexes)
+
+
+def unique_names(items):
+    names = []
+    for item_ in items:
+        if item_.name not in names:
+            names.append(item_.name)
+    return names
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+from concurrent.futures import TimeoutError
+
+from factorio_blueprint_analyser import blueprint_analyser, utils
+
+# -----------------------------------------------------------
+# Analysis daemon
+# The daemon loads the config and the Factorio data once, starts a
+# pool of worker processes, and analyses the blueprints sent on a
+# local Unix socket. This avoids the process start and the data load
+# for each analysis.
+#
+# Each request and response is a JSON object on one line:
+#   request:  {"blueprint": "0eNqd..."}
+#   response: {"analysis": {...}, "error": None, "time": 0.004}
+#
+# When too many requests are waiting, the new requests are refused
+# with an error instead of waiting in a growing queue
+# -----------------------------------------------------------
+
+# Time given to an analysis before answering with an error, in seconds
+default_request_timeout = 30
+
+# Number of requests analysed or waiting for a worker, for each worker
+default_max_pending_per_process = 4
+
+# Maximum size of a request line
+max_request_size = 64 * 1024 * 1024
+
+
+class AnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, pool, max_pending, request_timeout):
+        self.pool = pool
+        self.request_timeout = request_timeout
+        self.pending = threading.BoundedSemaphore(max_pending)
+
+        super().__init__(socket_path, AnalysisRequestHandler)
+
+    def analyse(self, request):
+        # Returns the response to the request
+        if not isinstance(request, dict) or not isinstance(request.get("blueprint"), str):
+            return _response(None, "Invalid request, expected {\"blueprint\": \"...\"}", 0)
+
+        # Backpressure, the request is refused if the pool is full
+        if not self.pending.acquire(blocking=False):
+            return _response(None, "The analyser is busy, try again later", 0)
+
+        start = time.perf_counter()
+        try:
+            future = self.pool.submit(_analyse, request["blueprint"])
+        except Exception as e:
+            # The pool can't run analyses anymore
+            self.pending.release()
+            return _response(None, _error_message(e), 0)
+
+        # The request is pending until its analysis is over,
+        # even if its response is sent before, see below
+        future.add_done_callback(lambda _: self.pending.release())
+
+        try:
+            return future.result(timeout=self.request_timeout)
+        except TimeoutError:
+            # A running analysis can't be stopped, its worker will
+            # be available again once it is over
+            future.cancel()
+            return _response(
+                None, f"The analysis took more than {self.request_timeout}s",
+                time.perf_counter() - start)
+        except Exception as e:
+            # The worker process itself failed
+            return _response(None, _error_message(e), time.perf_counter() - start)
+
+
+class AnalysisRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Several requests can be sent on the same connection
+        while True:
+            line = self.rfile.readline(max_request_size)
+            if not line:
+                return
+
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+
+            response = self.server.analyse(request)
+            self.wfile.write(json.dumps(response).encode("utf8") + b"\n")
+            self.wfile.flush()
+
+
+def serve(socket_path, processes=None,
+          max_pending=None, request_timeout=default_request_timeout):
+    # Start the daemon, blueprint_analyser.init must have been called
+    # Runs until the process is interrupted
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = processes * default_max_pending_per_process
+
+    _remove_stale_socket(socket_path)
+
+    with blueprint_analyser.create_pool(processes) as pool:
+        # Start the workers now, so they load the data before the first request
+        for future in [pool.submit(_ping) for _ in range(processes)]:
+            future.result()
+
+        server = AnalysisServer(socket_path, pool, max_pending, request_timeout)
+        utils.success(f"Analysis daemon listening on {socket_path} with {processes} workers")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.remove(socket_path)
+
+
+def analyse_remote(socket_path, blueprint_string, timeout=None):
+    # Send the blueprint to the daemon and returns its analysis
+    # Raises an exception if the analysis failed
+    response = request_remote(socket_path, blueprint_string, timeout)
+
+    if response["error"] is not None:
+        raise Exception(f"Remote analysis failed: {response['error']}")
+
+    return response["analysis"]
+
+
+def request_remote(socket_path, blueprint_string, timeout=None):
+    # Returns the daemon response
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+
+        request = json.dumps({"blueprint": blueprint_string}).encode("utf8") + b"\n"
+        client.sendall(request)
+
+        with client.makefile("rb") as f:
+            line = f.readline()
+
+    if not line:
+        raise Exception("The analysis daemon closed the connection")
+
+    return json.loads(line)
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+
+    # Check that no daemon is using the socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(socket_path)
+            return
+
+    raise Exception(f"An analysis daemon is already listening on {socket_path}")
+
+
+def _ping():
+    return True
+
+
+def _analyse(blueprint_string):
+    # Run in the worker processes
+    start = time.perf_counter()
+
+    try:
+        analysis = blueprint_analyser.analyse_blueprint(blueprint_string)
+    except Exception as e:
+        return _response(None, _error_message(e), time.perf_counter() - start)
+
+    return _response(analysis, None, time.perf_counter() - start)
+
+
+def _response(analysis, error, duration):
+    return {
+        "analysis": analysis,
+        "error": error,
+        "time": duration
+    }
+
+
+def _error_message(error):
+    return f"{type(error).__name__}: {error}"
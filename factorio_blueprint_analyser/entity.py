@@ -1,5 +1,4 @@
 from math import floor
-from termcolor import colored
 
 from factorio_blueprint_analyser import factorio, recipe, utils, config
 
@@ -29,51 +28,58 @@ def create_entity(entity_in_blueprint, virtual=False):
     # },
 
     # Check that the entity exists in the Factorio data
-    if entity_in_blueprint["name"] not in factorio.entities:
+    prototypes = factorio.get_data().prototypes
+    if entity_in_blueprint["name"] not in prototypes:
         utils.warning(
             f"Entity {entity_in_blueprint['name']} not found in Factorio data")
         # sys.exit(1)
         return None
 
-    entity_data = factorio.entities[entity_in_blueprint["name"]]
-
-    # Virtual entities are entities that are not in the original blueprint
-    # We have created them to solve certain edge cases such as the inserter
-    # that needs to pickup the item from an empty tile
-    entity_data["virtual"] = virtual
+    entity_prototype = prototypes[entity_in_blueprint["name"]]
 
     # Return the corresponding Entity object
-    if entity_data["type"] == "transport-belt":
-        return TransportBelt(entity_in_blueprint, entity_data)
-
-    elif entity_data["type"] == "assembling-machine":
-        return AssemblingMachine(entity_in_blueprint, entity_data)
-
-    elif entity_data["type"] == "inserter":
-        if entity_data["name"] == "long-handed-inserter":
-            return RedArm(entity_in_blueprint, entity_data)
-        elif entity_data["name"] == "stack-inserter":
-            return StackInserter(entity_in_blueprint, entity_data)
+    entity_class = None
+    if entity_prototype.type == "transport-belt":
+        entity_class = TransportBelt
+
+    elif entity_prototype.type == "assembling-machine":
+        entity_class = AssemblingMachine
+
+    elif entity_prototype.type == "inserter":
+        if entity_prototype.name == "long-handed-inserter":
+            entity_class = RedArm
+        elif entity_prototype.name == "stack-inserter":
+            entity_class = StackInserter
         else:
-            return Inserter(entity_in_blueprint, entity_data)
+            entity_class = Inserter
 
-    elif entity_data["type"] in ["container", "logistic-container"]:
-        return Container(entity_in_blueprint, entity_data)
+    elif entity_prototype.type in ["container", "logistic-container"]:
+        entity_class = Container
 
-    elif entity_data["type"] == "underground-belt":
-        return UndergroundBelt(entity_in_blueprint, entity_data)
+    elif entity_prototype.type == "underground-belt":
+        entity_class = UndergroundBelt
 
-    elif entity_data["type"] == "splitter":
-        return Splitter(entity_in_blueprint, entity_data)
+    elif entity_prototype.type == "splitter":
+        entity_class = Splitter
 
-    utils.warning(
-        f"entity {entity_in_blueprint['name']} of type {entity_data['type']} not supported")
+    if entity_class is None:
+        utils.warning(
+            f"entity {entity_in_blueprint['name']} of type {entity_prototype.type} not supported")
+        return None
+
+    # Virtual entities are entities that are not in the original blueprint
+    # We have created them to solve certain edge cases such as the inserter
+    # that needs to pickup the item from an empty tile
+    return entity_class(entity_in_blueprint, entity_prototype, virtual=virtual)
 
 
 # Enities interfaces
 class Entity:
-    def __init__(self, entity_in_blueprint, entity_data):
-        self.data = entity_data
+    def __init__(self, entity_in_blueprint, entity_prototype, virtual=False):
+        # The prototype is shared by all the entities with the same name
+        self.prototype = entity_prototype
+        self.data = entity_prototype.data
+        self.virtual = virtual
         self.number = entity_in_blueprint["entity_number"]
         self.name = entity_in_blueprint["name"]
         self.large = False
@@ -116,10 +122,10 @@ class Entity:
 
 class LargeEntity(Entity):
     # Assembling machines, splitters, furnace, etc.
-    def __init__(self, entity_in_blueprint, entity_data):
-        super().__init__(entity_in_blueprint, entity_data)
+    def __init__(self, entity_in_blueprint, entity_prototype, virtual=False):
+        super().__init__(entity_in_blueprint, entity_prototype, virtual)
         self.large = True
-        self.offsets = []
+        self.offsets = entity_prototype.offsets
 
     def to_char(self, coords=[0, 0]):
         return '?'
@@ -132,24 +138,16 @@ class LargeEntity(Entity):
 
 # Factorio entities:
 class TransportBelt(Entity):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
-        # Saving speed of the belt
-        if "speed" not in entity_data:
-            utils.warning(f"{self.name} has no speed")
-            self.tile_per_sec = 0.03125  # the tile_per_sec of the lvl1 transport belt
-        else:
-            self.tile_per_sec = entity_data["speed"]
+        # Saving speed of the belt, calculated by the prototype
+        self.set_belt_speed(entity_prototype)
 
-        # Calculation of the belt item per second
-        # 60 ticks / second
-        # A tile is 4 items
-        # There is two line on the belt
-        # this will result, for the first belt, with an output of 15 item per second
-        # This can be veryfied here: https://wiki.factorio.com/Belt_transport_system
-
-        self.speed = self.tile_per_sec * 60 * 4 * 2
+    def set_belt_speed(self, belt_prototype):
+        # The speed of the given belt tier, the belt own prototype at creation
+        self.tile_per_sec = belt_prototype.belt_speed
+        self.speed = belt_prototype.items_per_second
 
     def to_char(self):
         color = "white"
@@ -162,15 +160,15 @@ class TransportBelt(Entity):
 
         # ← ↑ → ↓
         if self.direction == 2:
-            return colored("→", color)
+            return utils.colored("→", color)
         elif self.direction == 4:
-            return colored("↓", color)
+            return utils.colored("↓", color)
         elif self.direction == 6:
-            return colored("←", color)
+            return utils.colored("←", color)
         elif self.direction == 0 or self.direction is None:
-            return colored("↑", color)
+            return utils.colored("↑", color)
 
-        return colored("?", color)
+        return utils.colored("?", color)
 
     def get_tile_in_front_offset(self):
         # Returns an offset of the tile
@@ -230,24 +228,20 @@ class TransportBelt(Entity):
 
 
 class Inserter (Entity):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
         # Saving speed of the inserter
-        if "rotation_speed" not in entity_data:
-            utils.warning(f"{self.name} has no rotation speed")
-            self.rotation_speed = 0.014  # the rotation_speed of the lvl1 inserter
-        else:
-            self.rotation_speed = entity_data["rotation_speed"]
+        self.rotation_speed = entity_prototype.rotation_speed
+        self.set_capacity_bonus(config.get_config().inserter_capacity_bonus)
 
-        # The rotation speed is the turn per tick
-        # There is 60 ticks per second
-        self.speed = self.rotation_speed * 60  # turn or items per second
+    def set_capacity_bonus(self, inserter_capacity_bonus):
+        self.speed = self.prototype.inserter_rate  # turn or items per second
 
         # Inserter capacity bonnus https://wiki.factorio.com/Inserter_capacity_bonus_(research)
-        if config.config.inserter_capacity_bonus >= 7:
+        if inserter_capacity_bonus >= 7:
             self.speed *= 3
-        elif config.config.inserter_capacity_bonus >= 2:
+        elif inserter_capacity_bonus >= 2:
             self.speed *= 2
 
     def get_drop_tile_offset(self):
@@ -321,38 +315,39 @@ class Inserter (Entity):
 
         # ► ▼ ▲ ◄
         if self.direction == 2:
-            return colored("◄", color)
+            return utils.colored("◄", color)
         elif self.direction == 4:
-            return colored("▲", color)
+            return utils.colored("▲", color)
         elif self.direction == 6:
-            return colored("►", color)
+            return utils.colored("►", color)
         else:
-            return colored("▼", color)
+            return utils.colored("▼", color)
 
 
 class StackInserter  (Inserter):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
+    def set_capacity_bonus(self, inserter_capacity_bonus):
         # Rewriting the speed
-        self.speed = self.rotation_speed * 60  # turn or items per second
+        self.speed = self.prototype.inserter_rate  # turn or items per second
 
         # Inserter capacity bonnus https://wiki.factorio.com/Inserter_capacity_bonus_(research)
-        capacity_multiplier = 2 + config.config.inserter_capacity_bonus
+        capacity_multiplier = 2 + inserter_capacity_bonus
 
-        if config.config.inserter_capacity_bonus >= 5:
+        if inserter_capacity_bonus >= 5:
             capacity_multiplier += 1
-        if config.config.inserter_capacity_bonus >= 6:
+        if inserter_capacity_bonus >= 6:
             capacity_multiplier += 1
-        if config.config.inserter_capacity_bonus >= 7:
+        if inserter_capacity_bonus >= 7:
             capacity_multiplier += 1
 
         self.speed *= capacity_multiplier
 
 
 class RedArm (Inserter):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
     def get_drop_tile_offset(self):
         return [e * 2 for e in super().get_drop_tile_offset()]
@@ -363,20 +358,8 @@ class RedArm (Inserter):
 
 
 class AssemblingMachine (LargeEntity):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
-
-        self.offsets = [
-            [0, 0],
-            [0, 1],
-            [0, -1],
-            [1, 1],
-            [1, 0],
-            [1, -1],
-            [-1, 1],
-            [-1, 0],
-            [-1, -1],
-        ]
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
         self.recipe = None
         if "recipe" in dictionary_entity:
@@ -384,11 +367,12 @@ class AssemblingMachine (LargeEntity):
 
         if self.recipe is not None:
             # Saving speed of the assembling machine
-            if "crafting_speed" not in entity_data:
-                utils.warning(f"{self.name} has no crafting speed", level=1)
-                self.speed = 0.5  # the speed of the assembling-machine-1
-            else:
-                self.speed = entity_data["crafting_speed"]
+            self.set_crafting_speed(entity_prototype.crafting_speed)
+
+    def set_crafting_speed(self, crafting_speed):
+        # Items produced and required per second at this crafting speed
+        if self.recipe is not None:
+            self.speed = crafting_speed
 
             time_per_item = self.recipe.time / self.speed
             self.items_per_second = self.recipe.result.amount / time_per_item
@@ -409,7 +393,7 @@ class AssemblingMachine (LargeEntity):
             color = "yellow"
 
         if coords is None:
-            return colored(self.recipe.name[0] if self.recipe is not None else "?", color)
+            return utils.colored(self.recipe.name[0] if self.recipe is not None else "?", color)
 
         offset = [coords[0] - self.position[0],
                   coords[1] - self.position[1]]
@@ -425,19 +409,19 @@ class AssemblingMachine (LargeEntity):
         # └─┘
 
         if offset == [0, 0] or coords is None:
-            return colored(self.recipe.name[0] if self.recipe is not None else "?", color)
+            return utils.colored(self.recipe.name[0] if self.recipe is not None else "?", color)
         elif offset == [1, 1]:
-            return colored("┘", color)
+            return utils.colored("┘", color)
         elif offset == [1, -1]:
-            return colored("┐", color)
+            return utils.colored("┐", color)
         elif offset == [-1, 1]:
-            return colored("└", color)
+            return utils.colored("└", color)
         elif offset == [-1, -1]:
-            return colored("┌", color)
+            return utils.colored("┌", color)
         elif offset == [0, 1] or offset == [0, -1]:
-            return colored("─", color)
+            return utils.colored("─", color)
         else:
-            return colored("│", color)
+            return utils.colored("│", color)
 
     def __str__(self):
         recipe_str = ""
@@ -448,20 +432,20 @@ class AssemblingMachine (LargeEntity):
 
 
 class Container (Entity):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
     def to_char(self):
         if self.name == "logistic-chest-passive-provider":
-            return colored("⧈", "red")
+            return utils.colored("⧈", "red")
         elif self.name == "logistic-chest-active-provider":
-            return colored("⧈", "magenta")
+            return utils.colored("⧈", "magenta")
         elif self.name == "logistic-chest-buffer":
-            return colored("⧈", "green")
+            return utils.colored("⧈", "green")
         elif self.name == "logistic-chest-requester":
-            return colored("⧈", "cyan")
+            return utils.colored("⧈", "cyan")
         elif self.name == "logistic-chest-storage":
-            return colored("⧈", "yellow")
+            return utils.colored("⧈", "yellow")
 
         return "⧈"
 
@@ -482,25 +466,13 @@ class Container (Entity):
 
 
 class UndergroundBelt (TransportBelt):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
 
         self.belt_type = dictionary_entity["type"]  # "input" or "output"
 
         # Saving belt distance
-        if "max_distance" not in entity_data:
-            self.max_distance = 5  # the distance of the lvl1 underground-belt
-        else:
-            self.max_distance = entity_data["max_distance"]
-
-        # Saving speed
-        if "speed" not in entity_data:
-            utils.warning(f"{self.name} has no speed")
-            self.speed = 0.03125  # the speed of the lvl1 underground-belt
-        else:
-            self.speed = entity_data["speed"]
-
-        self.speed = self.speed * 60 * 4 * 2
+        self.max_distance = entity_prototype.max_distance
 
     def get_possible_output_coords(self):
         start_coord = self.position
@@ -528,42 +500,40 @@ class UndergroundBelt (TransportBelt):
         if self.belt_type == "input":
             # ⇐ ⇑ ⇒ ⇓
             if self.direction == 2:
-                return colored("⇒", color)
+                return utils.colored("⇒", color)
             elif self.direction == 4:
-                return colored("⇓", color)
+                return utils.colored("⇓", color)
             elif self.direction == 6:
-                return colored("⇐", color)
+                return utils.colored("⇐", color)
             else:
-                return colored("⇑", color)
+                return utils.colored("⇑", color)
         else:
             # ⇦ ⇨ ⇧ ⇩
             if self.direction == 2:
-                return colored("⇨", color)
+                return utils.colored("⇨", color)
             elif self.direction == 4:
-                return colored("⇩", color)
+                return utils.colored("⇩", color)
             elif self.direction == 6:
-                return colored("⇦", color)
+                return utils.colored("⇦", color)
             else:
-                return colored("⇧", color)
+                return utils.colored("⇧", color)
 
     def __str__(self):
         return super().__str__() + " " + self.belt_type
 
 
 class Splitter (LargeEntity):
-    def __init__(self, dictionary_entity, entity_data):
-        super().__init__(dictionary_entity, entity_data)
+    def __init__(self, dictionary_entity, entity_prototype, virtual=False):
+        super().__init__(dictionary_entity, entity_prototype, virtual)
         self.offsets = [[0, 0], self.get_second_belt_offset()]
         # TODO: Filters
 
         # Saving speed
-        if "speed" not in entity_data:
-            utils.warning(f"{self.name} has no speed")
-            self.speed = 0.03125  # the speed of the lvl1 splitter
-        else:
-            self.speed = entity_data["speed"]
+        self.set_belt_speed(entity_prototype)
 
-        self.speed = self.speed * 60 * 4 * 2
+    def set_belt_speed(self, belt_prototype):
+        # The speed of the given splitter tier
+        self.speed = belt_prototype.items_per_second
 
     def get_second_belt_offset(self):
 
@@ -624,26 +594,26 @@ class Splitter (LargeEntity):
         # ↳    ↲
 
         if coords is None:
-            return colored("⬑⬏", color)
+            return utils.colored("⬑⬏", color)
 
         if self.position[0] == coords[0] and self.position[1] == coords[1]:
             if self.direction == 2:
-                return colored("↳", color)
+                return utils.colored("↳", color)
             elif self.direction == 4:
-                return colored("⬎", color)
+                return utils.colored("⬎", color)
             elif self.direction == 6:
-                return colored("↲", color)
+                return utils.colored("↲", color)
             else:
-                return colored("⬏", color)
+                return utils.colored("⬏", color)
         else:
             if self.direction == 2:
-                return colored("↱", color)
+                return utils.colored("↱", color)
             elif self.direction == 4:
-                return colored("⬐", color)
+                return utils.colored("⬐", color)
             elif self.direction == 6:
-                return colored("↰", color)
+                return utils.colored("↰", color)
             else:
-                return colored("⬑", color)
+                return utils.colored("⬑", color)
 
 
 # ↕ ↔
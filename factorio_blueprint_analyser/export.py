@@ -0,0 +1,117 @@
+import json
+
+# -----------------------------------------------------------
+# Write the analysed blueprints in a file
+# The JSON is written little by little instead of
+# building the whole JSON string in memory
+# -----------------------------------------------------------
+
+output_formats = ["json", "compact", "jsonl"]
+
+# Number of JSON chunks buffered before writing them in the file
+write_buffer_size = 1024
+
+# In compact mode, the containers deeper than this are written at once
+# For a blueprint, each entity is written at once
+compact_stream_depth = 3
+
+
+def write_analysis(analysis, file, output_format="json"):
+    if output_format == "json":
+        write_json(analysis, file, indent=4)
+    elif output_format == "compact":
+        write_json(analysis, file, indent=None)
+    elif output_format == "jsonl":
+        write_jsonl(analysis, file)
+    else:
+        raise Exception(
+            f"Unknown output format '{output_format}', available formats: {', '.join(output_formats)}")
+
+
+def write_json(analysis, file, indent=4):
+    # Write the analysis as a JSON document
+    # With an indent, the output is the same as json.dumps(analysis, indent=indent)
+    if indent is None:
+        chunks = iter_compact_json(analysis, json.JSONEncoder(separators=(",", ":")))
+    else:
+        chunks = json.JSONEncoder(indent=indent).iterencode(analysis)
+
+    write_chunks(chunks, file)
+
+
+def write_jsonl(analysis, file):
+    # Write the analysis as JSON Lines:
+    # - The first line contains the blueprint information,
+    #   without the entities: {"blueprint": {"label": ..., "items_output": ...}}
+    # - Then one line per entity
+    encoder = json.JSONEncoder(separators=(",", ":"))
+
+    blueprint = analysis["blueprint"] if "blueprint" in analysis else {}
+    entities = blueprint["entities"] if "entities" in blueprint else []
+
+    header = {}
+    for key in analysis:
+        if key == "blueprint":
+            header[key] = {k: v for (k, v) in blueprint.items() if k != "entities"}
+        else:
+            header[key] = analysis[key]
+
+    write_chunks(iter_jsonl(header, entities, encoder), file)
+
+
+def write_result(result, file):
+    # Write one book or batch result on one line, see book.py and batch.py
+    encoder = json.JSONEncoder(separators=(",", ":"))
+    write_chunks(iter_compact_json(result, encoder), file)
+    file.write("\n")
+
+
+def iter_jsonl(header, entities, encoder):
+    yield encoder.encode(header)
+    yield "\n"
+
+    for entity in entities:
+        yield encoder.encode(entity)
+        yield "\n"
+
+
+def iter_compact_json(value, encoder, depth=0):
+    # Yield the compact JSON of the value piece by piece
+    # The C JSON encoder only writes everything at once,
+    # so it is only used for the small deep values
+
+    if depth >= compact_stream_depth or \
+            not isinstance(value, (dict, list)) or len(value) == 0 or \
+            isinstance(value, dict) and not all(isinstance(key, str) for key in value):
+        # The non string keys are converted by the encoder
+        yield encoder.encode(value)
+
+    elif isinstance(value, dict):
+        yield "{"
+        for (i, key) in enumerate(value):
+            if i > 0:
+                yield ","
+            yield encoder.encode(key)
+            yield ":"
+            yield from iter_compact_json(value[key], encoder, depth + 1)
+        yield "}"
+
+    else:
+        yield "["
+        for (i, element) in enumerate(value):
+            if i > 0:
+                yield ","
+            yield from iter_compact_json(element, encoder, depth + 1)
+        yield "]"
+
+
+def write_chunks(chunks, file):
+    buffer = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= write_buffer_size:
+            file.write("".join(buffer))
+            buffer = []
+
+    if len(buffer) > 0:
+        file.write("".join(buffer))
@@ -1,18 +1,27 @@
-
 import json
+import os
+import hashlib
+import marshal
+import tempfile
+import threading
 
-from factorio_blueprint_analyser import utils, config
+from factorio_blueprint_analyser import utils, context, prototype, recipe, item, __version__
 
 # -----------------------------------------------------------
 # Provide for the other files Factorio data
 # from the factorio_blueprint_analyser/assets/factorio_raw/factorio_raw_min.json file
+#
+# Parsing the JSON file is slow, so the loaded data is saved as a
+# binary snapshot in the snapshot directory. The snapshot is keyed by
+# the data file content hash and the analyser version, it is rebuilt
+# as soon as one of them changes.
+#
+# The loaded data is never modified, it is shared by all the analysers
+# using the same data file, see analyser.py
 # -----------------------------------------------------------
 
 recipies_key = "recipe"
-recipies = {}
-
 items_key = "item"
-items = {}
 
 entities_categories_keys = [
     "splitter",
@@ -25,36 +34,150 @@ entities_categories_keys = [
     "furnace",
     "transport-belt",
 ]
-entities = {}
+
+# Loaded data by (data digest, difficulty)
+loaded_data = {}
+loaded_data_lock = threading.Lock()
+
+
+class FactorioData:
+    def __init__(self, data, digest, difficulty):
+        # sha256 of the data file
+        self.digest = digest
+        self.difficulty = difficulty
+
+        self.recipies = data[recipies_key]
+        self.items = data[items_key]
+        self.entities = data["entities"]
+
+        # One immutable prototype by entity name, see prototype.py
+        self.prototypes = prototype.create_prototypes(self.entities)
+        self.catalogue = recipe.RecipeCatalogue(self.recipies, difficulty)
+
+        # The data items get the first item ids, see item.py
+        item.register_items(self.items)
 
 
-def load_data():
-    global recipies, entities, items
-    factorio_raw_data_file_path = config.config.data_file_path
+def get_data():
+    # Returns the Factorio data of the current analyser, see context.py
+    analyser = context.get_analyser()
+    if analyser is None:
+        raise Exception(
+            "The Factorio data is not loaded, call blueprint_analyser.init() first")
+
+    return analyser.data
+
+
+def load_data(config):
+    # Returns the Factorio data of the config data file
+    # The data is loaded only once for each data file
+    factorio_raw_data_file_path = config.data_file_path
 
     # TODO:. check that the file exists
-    with open(factorio_raw_data_file_path, "r") as f:
-        data = json.load(f)
+    with open(factorio_raw_data_file_path, "rb") as f:
+        raw_data = f.read()
+
+    digest = hashlib.sha256(raw_data).hexdigest()
+    key = (digest, config.difficulty)
+
+    with loaded_data_lock:
+        if key not in loaded_data:
+            data = load_snapshot(digest, config.snapshot_dir)
+
+            if data is None:
+                data = parse_data(raw_data)
+                save_snapshot(digest, config.snapshot_dir, data)
+
+            loaded_data[key] = FactorioData(data, digest, config.difficulty)
+
+    utils.success(f"Factorio data successfully loaded")
+
+    return loaded_data[key]
+
+
+def parse_data(raw_data):
+    # Read the Factorio data JSON file content
+    # and keep only what the analyser needs
+    data = json.loads(raw_data)
+
+    # Load the recipies
+    if recipies_key not in data:
+        utils.warning(f"Recipe key {recipies_key} not found in Factorio data")
+
+    # Load the items
+    if items_key not in data:
+        utils.warning(f"Item key {items_key} not found in Factorio data")
+
+    # Load the entities
+    loaded_entities = {}
+    for key in entities_categories_keys:
+        if key not in data:
+            utils.warning(
+                f"Entity {key} category not found if Factorio data")
+        else:
+            for entity in data[key]:
+                loaded_entities[entity] = data[key][entity]
+
+    return {
+        recipies_key: data[recipies_key],
+        items_key: data[items_key],
+        "entities": loaded_entities
+    }
+
+
+# Snapshots
+def get_snapshot_path(digest, snapshot_dir):
+    if not snapshot_dir:
+        # Snapshots are disabled
+        return None
+
+    # The marshal format can change between Python versions
+    file_name = f"factorio_data_{digest}_{__version__}_{marshal.version}.marshal"
+    return os.path.join(os.path.expanduser(snapshot_dir), file_name)
+
+
+def load_snapshot(digest, snapshot_dir):
+    # Returns the snapshot data or None
+    # if there is no valid snapshot for this digest
+    snapshot_path = get_snapshot_path(digest, snapshot_dir)
+    if snapshot_path is None or not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        utils.warning(f"Invalid Factorio data snapshot {snapshot_path}, ignoring it")
+        return None
+
+    if not isinstance(data, dict) or \
+            any(key not in data for key in [recipies_key, items_key, "entities"]):
+        utils.warning(f"Invalid Factorio data snapshot {snapshot_path}, ignoring it")
+        return None
+
+    return data
 
-        # Load the recipies
-        if recipies_key not in data:
-            utils.warning(f"Recipe key {recipies_key} not found in Factorio data")
 
-        recipies = data[recipies_key]
+def save_snapshot(digest, snapshot_dir, data):
+    snapshot_path = get_snapshot_path(digest, snapshot_dir)
+    if snapshot_path is None:
+        return
 
-        # Load the items
-        if items_key not in data:
-            utils.warning(f"Item key {items_key} not found in Factorio data")
+    snapshot_dir = os.path.dirname(snapshot_path)
 
-        items = data[items_key]
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
 
-        # Load the entities
-        for key in entities_categories_keys:
-            if key not in data:
-                utils.warning(
-                    f"Entity {key} category not found if Factorio data")
-            else:
-                for entity in data[key]:
-                    entities[entity] = data[key][entity]
+        # The snapshot is written in a temporary file first
+        # so another process never reads a partially written snapshot
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, snapshot_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
 
-        utils.success(f"Factorio data successfully loaded")
+    except OSError as e:
+        utils.warning(f"Could not save the Factorio data snapshot: {e}")
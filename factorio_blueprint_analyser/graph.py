@@ -0,0 +1,195 @@
+# -----------------------------------------------------------
+# Graph algorithms on the network nodes
+# The networks can contain loops: belt loops (sushi belts),
+# inserters moving items between chests and back, ...
+# The recursive walks of the nodes would never end on those loops,
+# so the loops are condensed: each strongly connected component
+# (the nodes that can all reach each other) becomes a single
+# component, and the components form a graph without loops
+# that can be walked in topological order.
+#
+# All the algorithms are iterative, the long belts would
+# else reach the Python recursion limit.
+# -----------------------------------------------------------
+
+
+def strongly_connected_components(nodes):
+    # Tarjan algorithm, returns the components in topological order:
+    # the parents components before their childs components
+    # The nodes of a component are in the given nodes order
+    in_graph = set(id(node) for node in nodes)
+    node_indexes = {}  # {id(node): discovery index}
+    low_links = {}
+    on_stack = set()
+    stack = []
+    components = []
+
+    for start in nodes:
+        if id(start) in node_indexes:
+            continue
+
+        # Each entry is a node and the iterator over its childs
+        work = [(start, iter(start.childs))]
+        node_indexes[id(start)] = low_links[id(start)] = len(node_indexes)
+        stack.append(start)
+        on_stack.add(id(start))
+
+        while len(work) > 0:
+            (node, childs) = work[-1]
+
+            for child in childs:
+                if id(child) not in in_graph:
+                    continue
+
+                if id(child) not in node_indexes:
+                    node_indexes[id(child)] = low_links[id(child)] = len(node_indexes)
+                    stack.append(child)
+                    on_stack.add(id(child))
+                    work.append((child, iter(child.childs)))
+                    break
+
+                if id(child) in on_stack:
+                    low_links[id(node)] = min(low_links[id(node)], node_indexes[id(child)])
+            else:
+                # All the childs are visited
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low_links[id(parent)] = min(low_links[id(parent)], low_links[id(node)])
+
+                if low_links[id(node)] == node_indexes[id(node)]:
+                    # The node is the root of a component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(id(member))
+                        component.append(member)
+                        if member is node:
+                            break
+                    components.append(component)
+
+    # Tarjan finds the childs components first
+    components.reverse()
+
+    # Keep the nodes order inside the components
+    order = {id(node): i for (i, node) in enumerate(nodes)}
+    for component in components:
+        component.sort(key=lambda node: order[id(node)])
+
+    return components
+
+
+def walk(start, direction, follow):
+    # Yields the start node and the nodes reachable from it,
+    # going through the "parents" or the "childs" of the nodes
+    # The neighbours of a node are only visited if follow(node) is True
+    # Each node is yielded once, in depth first order
+    visited = set([id(start)])
+    stack = [start]
+
+    while len(stack) > 0:
+        node = stack.pop()
+        yield node
+
+        if not follow(node):
+            continue
+
+        # Reversed so the first neighbours are visited first
+        for neighbour in reversed(getattr(node, direction)):
+            if id(neighbour) not in visited:
+                visited.add(id(neighbour))
+                stack.append(neighbour)
+
+
+class Condensation:
+    # The graph of the strongly connected components of the nodes
+    def __init__(self, nodes):
+        self.components = strongly_connected_components(nodes)
+
+        # {id(node): component index}, the indexes are in topological order
+        self.component_indexes = {}
+        for (i, component) in enumerate(self.components):
+            for node in component:
+                self.component_indexes[id(node)] = i
+
+        # Links between the components, without duplicates
+        self.parent_components = [[] for _ in self.components]
+        self.child_components = [[] for _ in self.components]
+        self.cyclic = [len(component) > 1 for component in self.components]
+
+        for (i, component) in enumerate(self.components):
+            for node in component:
+                for child in node.childs:
+                    j = self.component_indexes.get(id(child))
+                    if j is None:
+                        continue
+
+                    if j == i:
+                        # A node linked to itself is a loop too
+                        self.cyclic[i] = True
+                    elif j not in self.child_components[i]:
+                        self.child_components[i].append(j)
+                        self.parent_components[j].append(i)
+
+        # Calculated when needed
+        self.connected_to_root = None
+
+    def get_component_index(self, node):
+        return self.component_indexes.get(id(node))
+
+    def is_cyclic(self, node):
+        # True if the node is part of a loop
+        i = self.get_component_index(node)
+        return i is not None and self.cyclic[i]
+
+    def capacity(self, component_index):
+        # Items per second that can go through the component:
+        # the items going around a loop go through all its nodes,
+        # the slowest node limits the whole loop
+        # None if no node of the component has a speed limit (chests)
+        # The assembling machines speed is a crafting speed, not items per second
+        speeds = [node.speed for node in self.components[component_index]
+                  if node.node_type == "transport_node" and node.speed is not None]
+
+        if len(speeds) == 0:
+            return None
+        return min(speeds)
+
+    def is_connected_to_root(self, node):
+        # True if the node has no parents, or if one of its parents,
+        # or one of their parents, and so on, has no parents
+        if self.connected_to_root is None:
+            # The parents components are before their childs
+            self.connected_to_root = []
+            for (i, component) in enumerate(self.components):
+                self.connected_to_root.append(
+                    any(len(member.parents) == 0 for member in component) or
+                    any(self.connected_to_root[j] for j in self.parent_components[i]))
+
+        i = self.get_component_index(node)
+        return i is not None and self.connected_to_root[i]
+
+    def upstream_components(self, start_nodes, stop):
+        # Indexes of the components of the start nodes and of their parents
+        # components, in topological order
+        # The parents of a component are not visited if stop(node)
+        # is True for all its nodes
+        visited = set()
+        stack = []
+        for node in start_nodes:
+            i = self.get_component_index(node)
+            if i is not None and i not in visited:
+                visited.add(i)
+                stack.append(i)
+
+        while len(stack) > 0:
+            i = stack.pop()
+            if all(stop(node) for node in self.components[i]):
+                continue
+
+            for j in self.parent_components[i]:
+                if j not in visited:
+                    visited.add(j)
+                    stack.append(j)
+
+        return sorted(visited)
@@ -0,0 +1,230 @@
+import marshal
+from math import floor
+
+from factorio_blueprint_analyser import blueprint, network
+
+# -----------------------------------------------------------
+# Incremental analysis
+# Keeps the analysis of a blueprint up to date while its entities
+# are edited: added, removed, rotated or given another recipe.
+#
+# A node only depends on the entities of the tiles requested while
+# it is created, see NetworkCreator, and the flows of a node only
+# depend on the nodes linked to it. After an edit, only the tiles
+# linked by those requests to the changed tiles are created again:
+#
+#   - The changed tiles are found on the blueprint index, see
+#     Blueprint.replace_entities
+#   - The region of the tiles linked to them by the requests is
+#     created in a new network, with the same nodes, in the same
+#     order, as in a network created for the whole blueprint.
+#     If the new nodes request tiles outside of the region, the
+#     region is extended and created again.
+#   - The bottleneck of the region is calculated, then its nodes
+#     replace the old ones in the blueprint network
+#
+# The blueprint is analysed again from the start if the edit
+# changes the blueprint bounds, if entities overlap, or if the
+# region contains a tile of overlapping entities.
+# -----------------------------------------------------------
+
+
+class IncrementalAnalysis:
+    def __init__(self, analyser, blueprint_json):
+        self.analyser = analyser
+
+        # The edits change the blueprint JSON, so it is copied
+        self.blueprint_json = marshal.loads(marshal.dumps(blueprint_json))
+
+        # Number of tiles whose nodes were created by the last edit
+        self.nb_updated_tiles = 0
+
+        with self.analyser.activate():
+            self.analyse()
+
+    def analyse(self):
+        # Analyse the whole blueprint
+        self.blueprint = blueprint.Blueprint(self.blueprint_json)
+
+        # Only the first blueprint of a book is analysed
+        self.blueprint_json = self.blueprint.blueprint
+
+        self.network = network.create_network(self.blueprint)
+        self.network.calculate_bottleneck()
+        self.nb_updated_tiles = len(self.blueprint.grid)
+
+    # Edits
+    def add_entity(self, entity_dic):
+        # Returns the number of the added entity,
+        # a new number is given if it has none
+        entity_dic = dict(entity_dic)
+        if "entity_number" not in entity_dic:
+            entity_dic["entity_number"] = max(
+                [e["entity_number"] for e in self.get_entities()
+                 if isinstance(e["entity_number"], int)], default=0) + 1
+
+        self.edit(None, entity_dic)
+        return entity_dic["entity_number"]
+
+    def remove_entity(self, entity_number):
+        self.edit(entity_number, None)
+
+    def rotate_entity(self, entity_number, direction):
+        entity_dic = dict(self.get_entity_dic(entity_number))
+        entity_dic["direction"] = direction
+
+        self.edit(entity_number, entity_dic)
+
+    def set_recipe(self, entity_number, recipe_name):
+        # The recipe is removed if recipe_name is None
+        entity_dic = dict(self.get_entity_dic(entity_number))
+        entity_dic.pop("recipe", None)
+        if recipe_name is not None:
+            entity_dic["recipe"] = recipe_name
+
+        self.edit(entity_number, entity_dic)
+
+    def edit(self, entity_number, entity_dic):
+        # Replace the entity of the given number by the given entity
+        # The entity is added if entity_number is None,
+        # and removed if entity_dic is None
+        with self.analyser.activate():
+            entities = self.get_entities()
+            removed_entities = []
+            added_entities = []
+
+            if entity_number is None:
+                entities.append(entity_dic)
+            else:
+                index = self.get_entity_index(entity_number)
+                removed_entity = self.get_entity(entities[index])
+                if removed_entity is not None:
+                    removed_entities.append(removed_entity)
+
+                if entity_dic is None:
+                    entities.pop(index)
+                else:
+                    entities[index] = entity_dic
+
+            if entity_dic is not None:
+                added_entity = self.blueprint.create_entity(entity_dic)
+                if added_entity is not None:
+                    added_entities.append(added_entity)
+
+            changed_tiles = self.blueprint.replace_entities(
+                removed_entities, added_entities)
+
+            if changed_tiles is None:
+                self.analyse()
+            else:
+                self.update(changed_tiles)
+
+    def update(self, changed_tiles):
+        # Create the nodes of the region linked to the changed tiles again
+        self.nb_updated_tiles = 0
+        if len(changed_tiles) == 0:
+            # Entity not supported by the analyser
+            return
+
+        region = set()
+        new_tiles = changed_tiles
+
+        while len(new_tiles) > 0:
+            region.update(self.get_region(new_tiles))
+
+            if not self.blueprint.hidden_tiles.isdisjoint(region):
+                # On the tiles of overlapping entities, the node depends on
+                # the order the nodes are created in the whole blueprint
+                self.analyse()
+                return
+
+            coords = sorted((tile for tile in region
+                             if self.blueprint.grid.get(tile[0], tile[1]) is not None),
+                            key=lambda tile: (tile[1], tile[0]))
+
+            creator = network.NetworkCreator(self.blueprint)
+            node_map = creator.create_nodes(coords)
+
+            # Nodes requested outside of the region
+            new_tiles = [tile for tile in node_map.tiles if tile not in region]
+
+        region_network = network.Network(self.blueprint, node_map, creator.requests)
+        region_network.calculate_bottleneck()
+
+        self.network.replace_region(region, region_network)
+        self.nb_updated_tiles = len(coords)
+
+    def get_region(self, tiles):
+        # The tiles linked to the given tiles by the node creation requests:
+        # the tiles of their entities, the tiles requested by their entities
+        # and the tiles of the entities requesting them, and so on
+        requests = self.network.requests
+        region = set()
+        visited_entities = set()
+        stack = list(tiles)
+
+        while len(stack) > 0:
+            tile = stack.pop()
+            if tile in region:
+                continue
+            region.add(tile)
+
+            # The old entity of the tile, its new entity and the entities requesting it
+            tile_entities = list(requests.get_requesters(tile))
+            node = self.network.node_map.get(tile[0], tile[1])
+            if node is not None:
+                tile_entities.append(node.entity)
+            tile_entity = self.blueprint.grid.get(tile[0], tile[1])
+            if tile_entity is not None:
+                tile_entities.append(tile_entity)
+
+            for tile_entity in tile_entities:
+                if id(tile_entity) in visited_entities:
+                    continue
+                visited_entities.add(id(tile_entity))
+
+                stack.extend(self.blueprint.get_entity_tiles(tile_entity))
+                stack.extend(requests.get_requested_tiles(tile_entity))
+
+        return region
+
+    # Blueprint JSON
+    def get_entities(self):
+        return self.blueprint_json["blueprint"]["entities"]
+
+    def get_entity_index(self, entity_number):
+        for (i, entity_dic) in enumerate(self.get_entities()):
+            if entity_dic["entity_number"] == entity_number:
+                return i
+
+        raise Exception(f"Entity {entity_number} not found in the blueprint")
+
+    def get_entity_dic(self, entity_number):
+        return self.get_entities()[self.get_entity_index(entity_number)]
+
+    def get_entity(self, entity_dic):
+        # The blueprint entity of a blueprint entity dictionary,
+        # None if the entity is not supported
+        # The entity is found on its tile, unless it is hidden by another entity
+        x = floor(entity_dic["position"]["x"]) - self.blueprint.origin[0]
+        y = floor(entity_dic["position"]["y"]) - self.blueprint.origin[1]
+        tile_entity = self.blueprint.grid.get(x, y)
+
+        if tile_entity is not None and tile_entity.original_position is entity_dic["position"]:
+            return tile_entity
+
+        for blueprint_entity in self.blueprint.entities:
+            if blueprint_entity.original_position is entity_dic["position"]:
+                return blueprint_entity
+
+        return None
+
+    def get_blueprint_json(self):
+        # Copy of the edited blueprint JSON
+        return marshal.loads(marshal.dumps(self.blueprint_json))
+
+    def get_analysis(self):
+        # The analysis is written in a copy of the blueprint JSON,
+        # it is analysed again after the next edits
+        with self.analyser.activate():
+            return self.blueprint.get_analysis(self.get_blueprint_json())
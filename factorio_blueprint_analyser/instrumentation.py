@@ -0,0 +1,107 @@
+import contextvars
+import contextlib
+import time
+
+# -----------------------------------------------------------
+# Analysis instrumentation
+# With the instrumentation config, each analysis records the time
+# of its phases and counts the calls of the flow calculation.
+# The report is added to the analysis metadata:
+#
+#   "metadata": {
+#       "instrumentation": {
+#           "phases": {"decode": 0.0004, "entities": 0.0021, ...},  # seconds
+#           "total": 0.0153,
+#           "counters": {"ask_flow": 1520, "take_back_flow": 12,
+#                        "max_flow_depth": 48, "compacted_nodes": 210}
+#       }
+#   }
+#
+# The report of the current analysis is kept like the current analyser,
+# see context.py. Without a report, the phases are not timed and the
+# flow requests are not counted, see node.run_flow.
+# -----------------------------------------------------------
+
+# The analysis phases, in the order they are run
+phases = [
+    "decode",  # Blueprint string decoding
+    "entities",  # Entities creation
+    "grid",  # Entities placement in the sparse 2D index
+    "virtual_entities",  # Virtual chests where the inserters pick up or drop items
+    "network",  # Nodes creation
+    "optimization",  # Belt segments compaction
+    "purposes",  # Step 1 of the bottleneck calculation
+    "flows",  # Step 2 of the bottleneck calculation
+    "export",  # Analysis written in the blueprint JSON
+]
+
+counters = ["ask_flow", "take_back_flow", "max_flow_depth", "compacted_nodes"]
+
+# The counter of each flow request, by name of the node method running it
+flow_requests = {"ask_flow_steps": "ask_flow", "take_back_flow_steps": "take_back_flow"}
+
+_current_report = contextvars.ContextVar("current_report", default=None)
+
+
+class Report:
+    def __init__(self):
+        self.phases = {}  # {phase: seconds}
+        self.counters = {counter: 0 for counter in counters}
+
+    def count_flow_request(self, steps, depth):
+        # A flow request started, with depth requests
+        # running one inside the other, see node.run_flow
+        self.counters[flow_requests[steps.__name__]] += 1
+        if depth > self.counters["max_flow_depth"]:
+            self.counters["max_flow_depth"] = depth
+
+    def to_dict(self):
+        return {
+            "phases": {phase: self.phases[phase] for phase in phases if phase in self.phases},
+            "total": sum(self.phases.values()),
+            "counters": dict(self.counters)
+        }
+
+
+def get_report():
+    # Returns the report of the current analysis, or None if there is none
+    return _current_report.get()
+
+
+@contextlib.contextmanager
+def record(enabled=True):
+    # Record the analysis run in this context in a new report,
+    # the report is None if the instrumentation is disabled
+    # An analysis run inside another one is recorded in the same report
+    report = _current_report.get()
+    if not enabled or report is not None:
+        yield report
+        return
+
+    report = Report()
+    token = _current_report.set(report)
+    try:
+        yield report
+    finally:
+        _current_report.reset(token)
+
+
+@contextlib.contextmanager
+def phase(name):
+    # Time the code run in this context
+    report = _current_report.get()
+    if report is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.phases[name] = report.phases.get(name, 0) + time.perf_counter() - start
+
+
+def set_counter(name, value):
+    report = _current_report.get()
+    if report is not None:
+        report.counters[name] = value
@@ -1,14 +1,37 @@
+import threading
+
 # -----------------------------------------------------------
 # Items class
 # Used to calculate bottleneck
+#
+# The item names are interned: each name has an integer id,
+# the same for all the flows, analysers and threads of the process
 # -----------------------------------------------------------
 
+# {item name: item id}
+item_ids = {}
+# Item names by id
+item_names = []
+item_ids_lock = threading.Lock()
+
 
 class Item:
+    # An item and its amount in a recipe
+    # The items are shared by the recipes of the Factorio data
+    # and the nodes transporting them, they are immutable
+    __slots__ = ("name", "amount", "type")
+
     def __init__(self, name, amount, type="item"):
-        self.name = name
-        self.amount = amount
-        self.type = type
+        set_attr = super().__setattr__
+        set_attr("name", name)
+        set_attr("amount", amount)
+        set_attr("type", type)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Item {self.name} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Item {self.name} is immutable")
 
     def __str__(self):
         return f"{self.name} ({self.amount})"
@@ -25,47 +48,116 @@ class Item:
 
 
 class Flow:
+    # Items per second going through a node
+    # The items are stored by id in two small lists, in the order they
+    # were added: most nodes only transport one or two items, an array
+    # indexed by the item ids would have an entry for each item of the data.
+    # The total amount is updated by the amount added or removed, it is read
+    # much more often than it is changed by the bottleneck calculation
+    __slots__ = ("item_ids", "amounts", "total_amount")
+
     def __init__(self):
-        self.items = {}
-        # Format:  {
-        #    item_name_1: 0.8, # Per min
-        #    item_name_2: 0.4,
-        # }
+        self.item_ids = []
+        self.amounts = []
+        self.total_amount = 0
 
     def add_item(self, item, amount):
-        if item is None:
-            raise Exception("Flow added without item")
+        self.add_item_id(get_item_id(item), amount)
 
-        if type(item) is not str:
-            raise Exception("Flow added with invalid item")
+    def add_item_id(self, item_id, amount):
+        if item_id in self.item_ids:
+            self.amounts[self.item_ids.index(item_id)] += amount
+        else:
+            # The amounts are floats, as in the network index, see csr.py
+            self.item_ids.append(item_id)
+            self.amounts.append(float(amount))
 
-        if amount is None:
-            raise Exception("Flow added without amount")
+        self.total_amount += float(amount)
 
-        if item not in self.items:
-            self.items[item] = amount
-        else:
-            self.items[item] += amount
+    def add_flow(self, flow):
+        # Add the amounts of another flow
+        for (item_id, amount) in zip(flow.item_ids, flow.amounts):
+            self.add_item_id(item_id, amount)
 
     def reduce(self, item, amount):
-        if item not in self.items:
-            print(f"/!\ Warning, item {item} not in flow")
+        item_id = item_ids.get(item)
+        if item_id not in self.item_ids:
+            print(f"/!\\ Warning, item {item} not in flow")
             # raise Exception("Item not in flow")
             return
 
-        self.items[item] -= amount
-        if self.items[item] <= 0:
-            del self.items[item]
+        index = self.item_ids.index(item_id)
+        if self.amounts[index] <= amount:
+            # The item is removed with all its amount
+            self.total_amount -= self.amounts[index]
+            del self.item_ids[index]
+            del self.amounts[index]
+        else:
+            self.amounts[index] -= amount
+            self.total_amount -= amount
+
+        if not self.item_ids:
+            self.total_amount = 0
+
+    def get_amount(self, item):
+        # The amount of an item, None if it is not in the flow
+        item_id = item_ids.get(item)
+        if item_id not in self.item_ids:
+            return None
+
+        return self.amounts[self.item_ids.index(item_id)]
+
+    def get_items(self):
+        # The (item name, amount) pairs, without building a dict
+        return [(item_names[item_id], amount)
+                for (item_id, amount) in zip(self.item_ids, self.amounts)]
 
     @property
-    def total_amount(self):
-        if len(self.items) == 0:
-            return 0
-        return sum(self.items.values())
+    def items(self):
+        # The amounts by item name, a new dict built on each access:
+        # used by the export, see get_items and get_amount for the reads
+        # Format:  {
+        #    item_name_1: 0.8, # Per min
+        #    item_name_2: 0.4,
+        # }
+        return {item_names[item_id]: amount
+                for (item_id, amount) in zip(self.item_ids, self.amounts)}
 
     def __str__(self) -> str:
         return (
             "["
-            + ", ".join([f"{item}: {amount}" for item, amount in self.items.items()])
+            + ", ".join([f"{item}: {amount}" for item, amount in self.get_items()])
             + "]"
         )
+
+
+def get_item_id(name):
+    item_id = item_ids.get(name)
+    if item_id is None:
+        item_id = register_item(name)
+
+    return item_id
+
+
+def register_item(name):
+    # Returns the id of the item, a new id is given to the unknown items
+    if name is None:
+        raise Exception("Flow added without item")
+
+    if type(name) is not str:
+        raise Exception("Flow added with invalid item")
+
+    with item_ids_lock:
+        if name not in item_ids:
+            item_ids[name] = len(item_names)
+            item_names.append(name)
+
+        return item_ids[name]
+
+
+def register_items(names):
+    # Called when the Factorio data is loaded, so the data items
+    # have the first ids, in the data order
+    for name in names:
+        if name not in item_ids:
+            register_item(name)
@@ -0,0 +1,224 @@
+# -----------------------------------------------------------
+# Small sparse linear programming solver
+# Maximize c.x subject to linear constraints and x >= 0,
+# with the simplex algorithm on a sparse tableau: each row
+# is a dictionary {variable index: coefficient}.
+#
+# All the constraints right hand sides must be positive or zero,
+# which is always the case for the flow problems of the analyser:
+#   - "<=" constraints get a slack variable, used as first basis
+#   - "=" constraints get an artificial variable, their right hand
+#     side must be 0. The artificial variables stay at 0, they leave
+#     the basis as soon as possible and never enter it again.
+# -----------------------------------------------------------
+
+# Values smaller than this are considered as 0
+epsilon = 1e-9
+
+# Number of pivots without improvement before using
+# the Bland rule, which avoids cycling
+max_degenerate_pivots = 50
+
+
+class LinearProgram:
+    def __init__(self):
+        self.nb_variables = 0
+        self.objective = {}  # {variable: coefficient}
+        self.constraints = []  # [(coefficients, sense, rhs)]
+
+    def add_variable(self, objective_coefficient=0):
+        # Returns the new variable index
+        variable = self.nb_variables
+        self.nb_variables += 1
+
+        if objective_coefficient != 0:
+            self.objective[variable] = objective_coefficient
+
+        return variable
+
+    def add_constraint(self, coefficients, sense, rhs):
+        # coefficients: {variable: coefficient}
+        # sense: "<=" or "="
+        if sense not in ["<=", "="]:
+            raise Exception(f"Unknown constraint sense {sense}")
+        if rhs < 0 or (sense == "=" and rhs != 0):
+            raise Exception(f"Unsupported constraint right hand side {rhs}")
+
+        coefficients = {variable: coefficient for (variable, coefficient)
+                        in coefficients.items() if coefficient != 0}
+        self.constraints.append((coefficients, sense, rhs))
+
+    def solve(self):
+        # Returns the optimal values of the variables
+        # Raises an exception if the problem is unbounded
+        return SimplexTableau(self).solve()
+
+
+class SimplexTableau:
+    def __init__(self, program):
+        self.nb_variables = program.nb_variables
+
+        self.rows = []
+        self.rhs = []
+        self.basis = []
+
+        # Rows where each variable has a non zero coefficient
+        self.column_rows = {}
+
+        # Variables that can't enter the basis
+        self.artificial = set()
+
+        next_variable = program.nb_variables
+        for (coefficients, sense, rhs) in program.constraints:
+            row = dict(coefficients)
+            row[next_variable] = 1
+            if sense == "=":
+                self.artificial.add(next_variable)
+
+            self.add_row(row, rhs, next_variable)
+            next_variable += 1
+
+        # Reduced costs, the basis variables costs are 0
+        self.costs = dict(program.objective)
+        self.value = 0
+
+    def add_row(self, row, rhs, basic_variable):
+        row_index = len(self.rows)
+        self.rows.append(row)
+        self.rhs.append(rhs)
+        self.basis.append(basic_variable)
+
+        for variable in row:
+            self.column_rows.setdefault(variable, set()).add(row_index)
+
+    def solve(self):
+        degenerate_pivots = 0
+
+        while True:
+            use_bland = degenerate_pivots >= max_degenerate_pivots
+            entering = self.choose_entering(use_bland)
+            if entering is None:
+                break
+
+            leaving_row = self.choose_leaving_row(entering)
+            if leaving_row is None:
+                raise Exception("The linear program is unbounded")
+
+            if self.rhs[leaving_row] <= epsilon:
+                degenerate_pivots += 1
+            else:
+                degenerate_pivots = 0
+
+            self.pivot(leaving_row, entering)
+
+        values = [0] * self.nb_variables
+        for (row_index, variable) in enumerate(self.basis):
+            if variable < self.nb_variables:
+                values[variable] = max(self.rhs[row_index], 0)
+
+        return values
+
+    def choose_entering(self, use_bland):
+        # Variable with a positive reduced cost
+        # Dantzig rule: the highest reduced cost
+        # Bland rule: the lowest index
+        entering = None
+        best_cost = epsilon
+        for (variable, cost) in self.costs.items():
+            if cost <= epsilon or variable in self.artificial:
+                continue
+
+            if use_bland:
+                if entering is None or variable < entering:
+                    entering = variable
+            elif cost > best_cost:
+                entering = variable
+                best_cost = cost
+
+        return entering
+
+    def choose_leaving_row(self, entering):
+        # Ratio test
+        leaving_row = None
+        best_ratio = None
+        for row_index in self.column_rows.get(entering, ()):
+            coefficient = self.rows[row_index][entering]
+
+            if self.basis[row_index] in self.artificial:
+                # The artificial variables must stay at 0
+                if abs(coefficient) <= epsilon:
+                    continue
+                ratio = 0
+            else:
+                if coefficient <= epsilon:
+                    continue
+                ratio = self.rhs[row_index] / coefficient
+
+            if best_ratio is None or ratio < best_ratio - epsilon or \
+                    (ratio <= best_ratio + epsilon and
+                     self.basis[row_index] < self.basis[leaving_row]):
+                leaving_row = row_index
+                best_ratio = ratio
+
+        return leaving_row
+
+    def pivot(self, pivot_row_index, entering):
+        pivot_row = self.rows[pivot_row_index]
+        pivot = pivot_row[entering]
+
+        # Normalize the pivot row
+        for variable in pivot_row:
+            pivot_row[variable] /= pivot
+        pivot_row[entering] = 1
+        self.rhs[pivot_row_index] /= pivot
+
+        # Remove the entering variable from the other rows
+        for row_index in list(self.column_rows[entering]):
+            if row_index == pivot_row_index:
+                continue
+
+            row = self.rows[row_index]
+            factor = row[entering]
+            self.subtract_row(row, row_index, pivot_row, factor)
+            self.rhs[row_index] -= factor * self.rhs[pivot_row_index]
+
+            if self.rhs[row_index] < 0 and self.rhs[row_index] > -epsilon:
+                self.rhs[row_index] = 0
+
+        # And from the objective
+        factor = self.costs.get(entering, 0)
+        if factor != 0:
+            for (variable, coefficient) in pivot_row.items():
+                cost = self.costs.get(variable, 0) - factor * coefficient
+                if abs(cost) <= epsilon:
+                    self.costs.pop(variable, None)
+                else:
+                    self.costs[variable] = cost
+            self.costs.pop(entering, None)
+            self.value += factor * self.rhs[pivot_row_index]
+
+        leaving = self.basis[pivot_row_index]
+        self.basis[pivot_row_index] = entering
+
+        if leaving in self.artificial:
+            # The artificial variable left the basis, it is not needed anymore
+            self.remove_variable(leaving)
+
+    def subtract_row(self, row, row_index, pivot_row, factor):
+        # row -= factor * pivot_row
+        for (variable, coefficient) in pivot_row.items():
+            value = row.get(variable, 0) - factor * coefficient
+
+            if abs(value) <= epsilon:
+                if variable in row:
+                    del row[variable]
+                    self.column_rows[variable].discard(row_index)
+            else:
+                if variable not in row:
+                    self.column_rows.setdefault(variable, set()).add(row_index)
+                row[variable] = value
+
+    def remove_variable(self, variable):
+        for row_index in self.column_rows.pop(variable, ()):
+            self.rows[row_index].pop(variable, None)
+        self.costs.pop(variable, None)
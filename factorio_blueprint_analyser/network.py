@@ -1,5 +1,7 @@
-from factorio_blueprint_analyser import node as node_service, utils
-from pyvis.network import Network as NetworkDisplay
+import bisect
+import time
+
+from factorio_blueprint_analyser import node as node_service, utils, spatial, config, context, solver, graph, csr, compaction, item, instrumentation
 
 # -----------------------------------------------------------
 # Create a node network from a blueprint
@@ -20,41 +22,88 @@ def create_network(blueprint):
 class NetworkCreator:
     def __init__(self, blueprint):
         self.blueprint = blueprint
-        self.node_map = []
+        self.node_map = spatial.SpatialIndex()
+
+        # The tiles requested by each entity while its node is created,
+        # used to find the nodes changed by an edit, see incremental.py
+        self.requests = Requests()
 
     def create_network(self):
-        # Create a 2D array that will contain all nodes,
-        # the same way as the blueprint array
-        # Knowing where the nodes are located from each other will be useful
+        # The nodes will be exctracted from the node map in a list
+        with instrumentation.phase("network"):
+            self.create_nodes()
 
-        # The nodes will then be exctracted from the 2D array in a list
+        return Network(self.blueprint, self.node_map, self.requests)
 
-        self.node_map = []
+    def create_nodes(self, coords=None):
+        # Create a sparse 2D index that will contain all nodes,
+        # the same way as the blueprint index
+        # Knowing where the nodes are located from each other will be useful
+        # Only the nodes of the given tiles, sorted line by line,
+        # and the nodes they need are created if coords is given
 
-        for _ in range(self.blueprint.heigth):
-            self.node_map += [[None for _ in range(self.blueprint.width)]]
+        self.node_map = spatial.SpatialIndex()
 
-        # Iterate over the blueprint entities
-        # to create each nodes recursively
-        for y in range(self.blueprint.heigth):
-            for x in range(self.blueprint.width):
-                self.create_node(x, y)
+        if coords is None:
+            coords = self.blueprint.grid.coords()
 
-        return Network(self.blueprint, self.node_map)
+        # Iterate over the blueprint entities, line by line,
+        # to create each nodes and the nodes they are linked to
+        for (x, y) in coords:
+            self.create_node(x, y)
+
+        return self.node_map
 
     def create_node(self, x, y):
         # Returns a node object or None
 
+        # The creation of a node needs the nodes it is linked to,
+        # a belt needs the node in front of it, that needs the node
+        # in front of it, and so on.
+        # Instead of recursive calls, that would reach the Python recursion
+        # limit on long belts, each node creation is a generator that
+        # yields the coordinates of the nodes it needs. The generators
+        # are stacked and each one receives the node it asked for.
+
+        stack = [(self._create_node(x, y), [x, y])]
+        requested_node = None
+
+        while len(stack) > 0:
+            (creation, coord) = stack[-1]
+            try:
+                requested_coord = creation.send(requested_node)
+            except StopIteration as creation_end:
+                # The node creation is over,
+                # the node is given to the previous creation
+                stack.pop()
+                requested_node = creation_end.value
+                continue
+
+            # The node creation needs another node
+            self.requests.add(self.blueprint.grid.get(coord[0], coord[1]),
+                              requested_coord)
+            stack.append((self._create_node(
+                requested_coord[0], requested_coord[1]), requested_coord))
+            requested_node = None
+
+        return requested_node
+
+    def _create_node(self, x, y):
+        # Generator creating the node at the given position
+        # The linked nodes are requested with: node = yield [x, y]
+        # Returns a node object or None
+
         # Check if the cell hasn't been filled yet
-        if x < 0 or x >= self.blueprint.width or y < 0 or y >= self.blueprint.heigth:
+        if not self.blueprint.is_coord_in_boundaries([x, y]):
             return None
 
         # Check if a node already exists in the cell
-        if self.node_map[y][x] is not None:
-            return self.node_map[y][x]
+        existing_node = self.node_map.get(x, y)
+        if existing_node is not None:
+            return existing_node
 
         # Get the entity at the given position
-        entity = self.blueprint.array[y][x]
+        entity = self.blueprint.grid.get(x, y)
 
         if entity is None:
             return None
@@ -63,10 +112,10 @@ class NetworkCreator:
         node = node_service.create_node(entity)
 
         # Each game entity interacts with the other nodes in there own way
-        # The requiered nodes will be created recursively
+        # The requiered nodes are requested with yield
         if node.type == "transport-belt":
-            # The node is inserted in the map to avoid infinit recursion
-            self.node_map[y][x] = node
+            # The node is inserted in the map to avoid infinit loops
+            self.node_map.set(x, y, node)
 
             # We want to set the entity in front of the belt as the node's child
             # We get the coordinates of the entity in front of the belt:
@@ -75,7 +124,7 @@ class NetworkCreator:
             target_y = y + tile_in_front_offset[1]
 
             # We get the node in front of the belt or create a new one
-            child_node = self.create_node(target_x, target_y)
+            child_node = (yield [target_x, target_y])
 
             if child_node is not None and entity.can_connect_to(child_node.entity):
                 node.childs.append(child_node)
@@ -84,15 +133,15 @@ class NetworkCreator:
             return node
 
         elif node.type == "inserter":
-            # The node is inserted in the map to avoid infinit recursion
-            self.node_map[y][x] = node
+            # The node is inserted in the map to avoid infinit loops
+            self.node_map.set(x, y, node)
 
             # Set the entity where items are droped as the node's child
             tile_drop_offset = entity.get_drop_tile_offset()
             target_drop_x = x + tile_drop_offset[0]
             target_drop_y = y + tile_drop_offset[1]
 
-            drop_child_node = self.create_node(target_drop_x, target_drop_y)
+            drop_child_node = (yield [target_drop_x, target_drop_y])
 
             if drop_child_node is not None and entity.can_move_to(drop_child_node.entity):
                 node.childs.append(drop_child_node)
@@ -103,7 +152,7 @@ class NetworkCreator:
             target_pickup_x = x + tile_pickup_offset[0]
             target_pickup_y = y + tile_pickup_offset[1]
 
-            pickup_node = self.create_node(target_pickup_x, target_pickup_y)
+            pickup_node = (yield [target_pickup_x, target_pickup_y])
 
             if pickup_node is not None and entity.can_move_from(pickup_node.entity):
                 node.parents.append(pickup_node)
@@ -118,15 +167,14 @@ class NetworkCreator:
                 target_x = node.entity.position[0] + offset[0]
                 target_y = node.entity.position[1] + offset[1]
 
-                if target_x < 0 or target_x >= self.blueprint.width\
-                        or target_y < 0 or target_y >= self.blueprint.heigth:
+                if not self.blueprint.is_coord_in_boundaries([target_x, target_y]):
                     continue
 
-                self.node_map[target_y][target_x] = node
+                self.node_map.set(target_x, target_y, node)
             return node
 
         elif node.type == "underground-belt":
-            self.node_map[y][x] = node
+            self.node_map.set(x, y, node)
 
             if entity.belt_type == "output":
                 # Set the entity where items are droped as the node's child
@@ -136,7 +184,7 @@ class NetworkCreator:
                 target_y = y + tile_in_front_offset[1]
 
                 # We get the node in front of the belt or create a new one
-                child_node = self.create_node(target_x, target_y)
+                child_node = (yield [target_x, target_y])
 
                 if child_node is not None and entity.can_connect_to(child_node.entity):
                     node.childs.append(child_node)
@@ -145,8 +193,7 @@ class NetworkCreator:
                 # We try to connect to the output belt
                 possible_output_coords = entity.get_possible_output_coords()
                 for possible_coord in possible_output_coords:
-                    child_node = self.create_node(
-                        possible_coord[0], possible_coord[1])
+                    child_node = (yield [possible_coord[0], possible_coord[1]])
 
                     if child_node is not None and \
                             child_node.entity.name == node.entity.name and \
@@ -162,7 +209,7 @@ class NetworkCreator:
 
         elif node.type in ["container", "logistic-container"]:
             # Those entities does not interact with others
-            self.node_map[y][x] = node
+            self.node_map.set(x, y, node)
             return node
 
         elif node.type == "splitter":
@@ -170,18 +217,17 @@ class NetworkCreator:
             # We need to add the second splitter tile to the map
             if x == entity.position[0] and y == entity.position[1]:
                 # If we are the original splitter, we need to add the second splitter
-                self.node_map[y][x] = node
+                self.node_map.set(x, y, node)
 
                 second_belt_offset = entity.get_second_belt_offset()
                 second_node_x = x + second_belt_offset[0]
                 second_node_y = y + second_belt_offset[1]
 
-                if second_node_x >= 0 and second_node_x < self.blueprint.width and\
-                        second_node_y >= 0 and second_node_y < self.blueprint.heigth:
-                    self.node_map[second_node_y][second_node_x] = node
+                if self.blueprint.is_coord_in_boundaries([second_node_x, second_node_y]):
+                    self.node_map.set(second_node_x, second_node_y, node)
             else:
                 # We create the original splitter instead
-                return self.create_node(entity.position[0], entity.position[1])
+                return (yield [entity.position[0], entity.position[1]])
 
             # Set the entity where items are droped as the node's child
             drop_tile_offsets = entity.get_drop_tile_offsets()
@@ -189,8 +235,7 @@ class NetworkCreator:
                 target_drop_x = x + offset[0]
                 target_drop_y = y + offset[1]
 
-                drop_child_node = self.create_node(
-                    target_drop_x, target_drop_y)
+                drop_child_node = (yield [target_drop_x, target_drop_y])
 
                 if drop_child_node is not None and entity.can_move_to(drop_child_node.entity):
                     node.childs.append(drop_child_node)
@@ -202,23 +247,81 @@ class NetworkCreator:
         return None
 
 
+class Requests:
+    # The tiles requested by the entities while their nodes are created
+    # An entity node only depends on the entities of those tiles
+    def __init__(self):
+        self.requested_tiles = {}  # {id(entity): [(x, y)]}
+        self.requesters = {}  # {(x, y): [entity]}
+
+    def add(self, requester, coord):
+        tile = (coord[0], coord[1])
+        self.requested_tiles.setdefault(id(requester), []).append(tile)
+        self.requesters.setdefault(tile, []).append(requester)
+
+    def get_requested_tiles(self, requester):
+        return self.requested_tiles.get(id(requester), [])
+
+    def get_requesters(self, tile):
+        return self.requesters.get(tile, [])
+
+    def remove(self, requester):
+        for tile in set(self.requested_tiles.pop(id(requester), [])):
+            requesters = self.requesters[tile]
+            requesters[:] = [e for e in requesters if e is not requester]
+            if len(requesters) == 0:
+                del self.requesters[tile]
+
+    def update(self, other):
+        for (tile, requesters) in other.requesters.items():
+            for requester in requesters:
+                self.add(requester, tile)
+
+
 class Network:
-    def __init__(self, blueprint, nodes_array):
+    def __init__(self, blueprint, node_map, requests=None):
         self.blueprint = blueprint
-        self.nodes_array = nodes_array
+        self.node_map = node_map
+
+        # The tiles requested by the entities, see NetworkCreator
+        self.requests = requests if requests is not None else Requests()
 
         self.nodes = []
 
-        for row in self.nodes_array:
-            for node in row:
-                if node is not None and not node.removed:
-                    # Check that the node is not already in the list
-                    # It's normal if the node takes multiple tiles
-                    # (They appear multiple times in the map)
-                    if node not in self.nodes:
-                        self.nodes.append(node)
+        # The nodes removed by the optimizer, see compaction.py
+        self.compaction = compaction.Compaction()
+
+        # Indexes, kept up to date with the network topology
+        self.nodes_by_entity = {}
+        self._root_nodes = None
+        self._leaf_nodes = None
+        self._condensation = None
+        self._materials_outputs = None
+        self._purposes_sent = None
+        self._csr = None
+
+        # Set by the bottleneck calculation
+        self.components_stats = []
 
-        self.optimize()
+        # Items per second entering each loop during the greedy
+        # flow calculation, by condensation component index
+        self.loop_flows = {}
+
+        added_nodes = set()
+
+        for (x, y) in self.node_map.coords():
+            node = self.node_map.get(x, y)
+            if not node.removed:
+                # Check that the node is not already in the list
+                # It's normal if the node takes multiple tiles
+                # (They appear multiple times in the map)
+                if id(node) not in added_nodes:
+                    added_nodes.add(id(node))
+                    self.nodes.append(node)
+                    node.network = self
+
+        with instrumentation.phase("optimization"):
+            self.optimize()
 
     def optimize(self):
         # We save the nodes original parents and childs
@@ -232,6 +335,8 @@ class Network:
         for node in self.nodes:
             node.optimize()
 
+        self.compact_segments()
+
         # Filter the removed nodes
         optimized_nodes = []
 
@@ -240,33 +345,336 @@ class Network:
                 optimized_nodes.append(node)
 
         self.nodes = optimized_nodes
+        self.update_indexes()
 
-    def get_node(self, entity_number) -> node_service.Node:
+    def compact_segments(self):
+        # Merge the linear chains of belts left by the optimization
+        # in belt segments, see Node.compact_segment
         for node in self.nodes:
-            if node.entity.number == entity_number:
-                return node
+            if not node.removed:
+                node.compact_segment()
 
-        return None
+    def update_indexes(self):
+        # Index the nodes by entity number,
+        # the first node of an entity is kept
+        self.nodes_by_entity = {}
+        for node in self.nodes:
+            if node.entity.number not in self.nodes_by_entity:
+                self.nodes_by_entity[node.entity.number] = node
+
+        self.invalidate_topology()
+
+    def invalidate_topology(self):
+        # Called when nodes are linked or removed,
+        # the roots and leafs will be found again when needed
+        self._root_nodes = None
+        self._leaf_nodes = None
+        self._condensation = None
+        self._materials_outputs = None
+        self._purposes_sent = None
+        self._csr = None
+
+    def invalidate_purposes(self, node=None):
+        # Called when the items transported by a node change
+        # The materials output of the nodes without purpose are calculated
+        # from their parents outputs: only the output of the node and
+        # of the nodes without purpose after it are removed
+        if self._csr is not None:
+            self._csr.unload_items()
+
+        if node is None or self._materials_outputs is None:
+            self._materials_outputs = None
+            return
+
+        outputs = self._materials_outputs
+
+        def follow(walked_node):
+            return walked_node is node or \
+                (id(walked_node) in outputs and node_service.is_transport_node(walked_node)
+                 and walked_node.transported_items is None)
+
+        removed_nodes = [walked_node for walked_node in graph.walk(node, "childs", follow)
+                         if follow(walked_node)]
+        for removed_node in removed_nodes:
+            outputs.pop(id(removed_node), None)
+
+    def invalidate_capacities(self):
+        # Called when the nodes speeds change, see sweep.py
+        self._csr = None
+
+    def reset_flows(self):
+        # Remove the flows of a previous bottleneck calculation
+        for node in self.nodes:
+            node.flow = item.Flow()
+        self.loop_flows = {}
+        self.invalidate_flows()
+
+    def invalidate_flows(self):
+        # Called when the nodes flows change
+        if self._csr is not None:
+            self._csr.unload_flows()
+
+    def set_flows(self, flows):
+        # Set the flows calculated on the index, see solver.py
+        graph = self.csr()
+        graph.set_flows(flows)
+
+        for (i, node) in enumerate(self.nodes):
+            for (item_id, amount) in graph.get_flow(i):
+                node.flow.add_item_id(item_id, amount)
+
+    def replace_region(self, tiles, region_network):
+        # Replace the nodes of the given tiles by the nodes of another
+        # network, created for those tiles only, see incremental.py
+        removed_ids = set()
+        for tile in tiles:
+            node = self.node_map.get(tile[0], tile[1])
+            if node is None:
+                continue
+
+            self.node_map.remove(tile[0], tile[1])
+            if id(node) in removed_ids:
+                continue
+            removed_ids.add(id(node))
+
+            self.requests.remove(node.entity)
+            if not node.removed:
+                self.compaction.discard(node)
+                if self.nodes_by_entity.get(node.entity.number) is node:
+                    del self.nodes_by_entity[node.entity.number]
+
+        self.nodes = [node for node in self.nodes if id(node) not in removed_ids]
+
+        # The new nodes are added in the order they would have
+        # in a network created for the whole blueprint
+        for (x, y) in region_network.node_map.coords():
+            node = region_network.node_map.get(x, y)
+            self.node_map.set(x, y, node)
+            node.network = self
+
+        for node in region_network.nodes:
+            bisect.insort(self.nodes, node, key=self.get_node_order)
+            if node.entity.number not in self.nodes_by_entity:
+                self.nodes_by_entity[node.entity.number] = node
+
+        self.compaction.update(region_network.compaction)
+        self.requests.update(region_network.requests)
+
+        # The groups of linked nodes are in the order of their first node
+        self.components_stats = [stats for stats in self.components_stats
+                                 if id(stats["node"]) not in removed_ids]
+        for stats in region_network.components_stats:
+            bisect.insort(self.components_stats, stats,
+                          key=lambda stats: self.get_node_order(stats["node"]))
+
+        self.invalidate_topology()
+        self.invalidate_purposes()
+
+    def get_node_order(self, node):
+        # The nodes are sorted by their first tile, line by line
+        return min((y, x) for (x, y) in self.blueprint.get_entity_tiles(node.entity)
+                   if self.node_map.get(x, y) is node)
+
+    def remove_node(self, node):
+        # Called by a node when it is removed from the network
+        if self.nodes_by_entity.get(node.entity.number) is node:
+            del self.nodes_by_entity[node.entity.number]
+
+        self.invalidate_topology()
+
+    def get_node(self, entity_number) -> node_service.Node:
+        return self.nodes_by_entity.get(entity_number)
+
+    def get_segment_node(self, entity_number) -> node_service.Node:
+        # The network node of the entity, or the node
+        # it was merged in if it was removed by the optimizer
+        node = self.get_node(entity_number)
+        if node is None:
+            node = self.compaction.find_entity(entity_number)
+
+        return node
 
     def root_nodes(self):
-        roots = []
-        for node in self.nodes:
-            if len(node.parents) == 0:
-                roots.append(node)
-        return roots
+        # The returned list is shared, it must not be modified
+        if self._root_nodes is None:
+            self._root_nodes = []
+            for node in self.nodes:
+                if len(node.parents) == 0:
+                    self._root_nodes.append(node)
+
+        return self._root_nodes
 
     def leaf_nodes(self):
-        leafs = []
-        for node in self.nodes:
-            if len(node.childs) == 0:
-                leafs.append(node)
-        return leafs
+        # The returned list is shared, it must not be modified
+        if self._leaf_nodes is None:
+            self._leaf_nodes = []
+            for node in self.nodes:
+                if len(node.childs) == 0:
+                    self._leaf_nodes.append(node)
+
+        return self._leaf_nodes
+
+    def condensation(self):
+        # The loops of the network condensed, see graph.py
+        if self._condensation is None:
+            self._condensation = graph.Condensation(self.nodes)
+
+        return self._condensation
+
+    def csr(self, items=False, flows=False):
+        # Index of the network, see csr.py
+        # With items or flows, the index has the items or the flows of the nodes
+        if self._csr is None:
+            self._csr = csr.CSRNetwork(self)
+
+        if items and not self._csr.has_items():
+            self._csr.load_items(self.nodes)
+
+        if flows and not self._csr.has_flows():
+            self._csr.load_flows(self.nodes)
+
+        return self._csr
+
+    def materials_outputs(self):
+        # The materials output of the nodes without purpose, see node.py
+        if self._materials_outputs is None:
+            self._materials_outputs = {}
+
+        return self._materials_outputs
+
+    def purposes_sent(self, direction):
+        # The names of the items sent through each node by the purpose
+        # estimation, in the direction, see Transport_node.walk_purpose
+        # {id(node): set(item names)}
+        if self._purposes_sent is None:
+            self._purposes_sent = {"parents": {}, "childs": {}}
+
+        return self._purposes_sent[direction]
 
     def calculate_bottleneck(self):
+        # The groups of linked nodes don't exchange any item,
+        # each group is solved on its own: the nodes it works on
+        # stay small and the large groups can be solved at the same time
+        # by a pool of processes, with the lp solver
+        with instrumentation.phase("purposes"):
+            components = self.calculate_purposes()
+
+        with instrumentation.phase("flows"):
+            self.calculate_flows(components)
+
+    def calculate_purposes(self):
+        # Step 1 of the bottleneck calculation, for each group of linked nodes
+        # Returns the groups, the purposes don't depend on the nodes speeds
+        components = self.csr().components()
+
+        # Sizes and calculation times of the groups,
+        # given in the analysis metadata, see blueprint.py
+        self.components_stats = []
+        for component in components:
+            first_node = self.nodes[component[0]]
+            self.components_stats.append({
+                "node": first_node,
+                "nodes": len(component),
+                "entities": sum(1 + self.compaction.nb_compacted_nodes(self.nodes[i])
+                                for i in component),
+                "time": 0,
+                "parallel": False
+            })
+
         # ==========================================
         # ====== Step 1: Purpose estimation ========
         # ==========================================
 
+        for (component, stats) in zip(components, self.components_stats):
+            start = time.perf_counter()
+            self.estimate_purposes([self.nodes[i] for i in component])
+            stats["time"] += time.perf_counter() - start
+
+        self.display_purposes()
+
+        return components
+
+    def calculate_flows(self, components):
+        # Step 2 of the bottleneck calculation, for the groups
+        # of linked nodes returned by calculate_purposes
+        cfg = config.get_config()
+
+        # ==============================================
+        # ====== Step 2: Bottleneck calculation ========
+        # ==============================================
+
+        # We will try to estimate the use rate of all nodes
+        # We start with the leaf nodes that have a purpose and
+        # we will ask for the maximum produced item per second
+
+        if cfg.bottleneck_solver == "lp":
+            # The flows of each group are calculated all at once, see solver.py
+            self.calculate_lp_flows(components)
+        else:
+            for (component, stats) in zip(components, self.components_stats):
+                start = time.perf_counter()
+                self.calculate_greedy_flows([self.nodes[i] for i in component])
+                stats["time"] += time.perf_counter() - start
+
+            self.invalidate_flows()
+
+        utils.verbose("")
+        utils.success("Bottleneck calculation complete!")
+        utils.verbose("Produced items:")
+        for node in self.leaf_nodes():
+            # TODO: fix that nothing is shown for the bp blueprints4/drillFac1
+            # None of the leaf nodes have a flow and none of them are processed by
+            # the bottleneck algorithm (no node with 0 childs processed).
+            # due to bp optimization ?
+            for (item_name, amount) in node.flow.get_items():
+                utils.verbose(f"   {item_name}: {amount} /s")
+
+    def calculate_lp_flows(self, components):
+        # The groups with at least parallelMinNodes nodes are solved
+        # by the processes of the analyser pool, while the others are solved here
+        # The programs are created from the network index, see solver.py
+        cfg = config.get_config()
+        graph = self.csr(items=True)
+        pool = None
+        solving = []
+        flows = {}
+
+        try:
+            for (component, stats) in zip(components, self.components_stats):
+                start = time.perf_counter()
+                component_program = solver.create_component_program(graph, component)
+
+                if cfg.solver_processes > 0 and len(component) >= cfg.parallel_min_nodes:
+                    if pool is None:
+                        pool = context.get_analyser().get_solver_pool()
+
+                    future = pool.submit(solver.solve_program, component_program.program)
+                    solving.append((component_program, stats, future))
+                    stats["parallel"] = True
+                else:
+                    flows.update(solver.get_flows(graph, component_program,
+                                                  component_program.program.solve()))
+
+                stats["time"] += time.perf_counter() - start
+
+            for (component_program, stats, future) in solving:
+                (values, solve_time) = future.result()
+
+                start = time.perf_counter()
+                flows.update(solver.get_flows(graph, component_program, values))
+                stats["time"] += solve_time + time.perf_counter() - start
+        finally:
+            # After an error, the programs still waiting are not solved
+            for (_, _, future) in solving:
+                future.cancel()
+
+        self.set_flows(flows)
+
+    def estimate_purposes(self, nodes=None):
+        # The purposes of the given nodes, all the network nodes by default
+        if nodes is None:
+            nodes = self.nodes
+
         # The first step is to calculate the purpose of each node
         # We will start from each assembling machine and go up and down
         # each parent and child node to tell them what we expect them to do
@@ -274,7 +682,7 @@ class Network:
         # The purpose calculation starts from the assembly machines
         # childs as only one item is produced per assembling machine
 
-        for node in self.nodes:
+        for node in nodes:
             if node.type == "assembling-machine":
                 node.calculate_childs_purpose()
 
@@ -282,19 +690,23 @@ class Network:
         # with recipes that have one ingredient first as they are easier to process
 
         # Recipes with one ingredient first
-        for node in self.nodes:
+        for node in nodes:
             if node.type == "assembling-machine" and\
                 node.entity.recipe is not None and\
                     len(node.entity.recipe.ingredients) == 1:
                 node.calculate_parents_purpose()
 
         # Recipes with multiple ingredients
-        for node in self.nodes:
+        for node in nodes:
             if node.type == "assembling-machine" and\
                 node.entity.recipe is not None and\
                     len(node.entity.recipe.ingredients) > 1:
                 node.calculate_parents_purpose()
 
+        if nodes is self.nodes:
+            self.display_purposes()
+
+    def display_purposes(self):
         # Display some debug info
         nb_transport_nodes_with_no_purpose = 0
         nb_transport_nodes = 0
@@ -311,15 +723,15 @@ class Network:
         utils.verbose(
             f"{nb_transport_nodes - nb_transport_nodes_with_no_purpose} / {nb_transport_nodes} nodes with purpose")
 
-        # ==============================================
-        # ====== Step 2: Bottleneck calculation ========
-        # ==============================================
+    def calculate_greedy_flows(self, nodes=None):
+        # The flows of the given nodes, all the network nodes by default
+        leaf_nodes = self.leaf_nodes() if nodes is None else \
+            [node for node in nodes if len(node.childs) == 0]
 
-        # We will try to estimate the use rate of all nodes
-        # We start with the leaf nodes that have a purpose and
-        # we will ask for the maximum produced item per second
+        # The loops of the given nodes have no flow yet
+        self.loop_flows = {}
 
-        for node in self.leaf_nodes():
+        for node in leaf_nodes:
             items_output = node.get_materials_output()
 
             if items_output is None or len(items_output) == 0:
@@ -329,27 +741,30 @@ class Network:
             # If there is some capacity left with the item n,
             # we will ask for the item n+1 at the remaining capacity
 
-            flow_capacity = node.entity.speed if node.entity.speed is not None else 10000
+            flow_capacity = node.speed if node.speed is not None else 10000
 
             for item_output in items_output:
                 # We pass the flow to the node, it will send it to his childs
                 acepted_amount = node.ask_flow(item_output.name, flow_capacity)
                 flow_capacity -= acepted_amount
 
-        utils.verbose("")
-        utils.success("Bottleneck calculation complete!")
-        utils.verbose("Produced items:")
-        for node in self.leaf_nodes():
-            # TODO: fix that nothing is shown for the bp blueprints4/drillFac1
-            # None of the leaf nodes have a flow and none of them are processed by
-            # the bottleneck algorithm (no node with 0 childs processed).
-            # due to bp optimization ?
-            for item in node.flow.items:
-                utils.verbose(f"   {item}: {node.flow.items[item]} /s")
+    def get_loop_capacity_left(self, loop_index):
+        # Items per second that can still enter a loop of the network
+        capacity = self.condensation().capacity(loop_index)
+        if capacity is None:
+            return float("inf")
+
+        return max(0, capacity - self.loop_flows.get(loop_index, 0))
+
+    def add_loop_flow(self, loop_index, amount):
+        self.loop_flows[loop_index] = self.loop_flows.get(loop_index, 0) + amount
 
     def display(self):
         # Display the network as a node graph using the
         # networkx library
+        # pyvis is only imported when the network is displayed
+        from pyvis.network import Network as NetworkDisplay
+
         net = NetworkDisplay(directed=True, height=1000, width=1900)
         net.repulsion(node_distance=80, spring_length=0)
 
@@ -383,6 +798,7 @@ class Network:
             net.add_node(node.entity.number,
                          value=node_size,
                          label=node_label,
+                         title=str(node),
                          shape="circularImage",
                          borderWidth=10,
                          color="lightgrey" if not bottleneck else "black",
@@ -462,9 +878,9 @@ class Network:
                     node_label = " "
                     if len(node.transported_items) > 1:
                         # We display the flow if there is one
-                        if item.name in node.flow.items:
-                            node_label = str(
-                                int(node.flow.items[item.name] * 100) / 100) + "/s"
+                        amount = node.flow.get_amount(item.name)
+                        if amount is not None:
+                            node_label = str(int(amount * 100) / 100) + "/s"
 
                     net.add_node(node_id,
                                  label=node_label,
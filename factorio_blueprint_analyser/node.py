@@ -1,9 +1,12 @@
-from factorio_blueprint_analyser import utils, item
+from factorio_blueprint_analyser import utils, item, graph, instrumentation
 
 # -----------------------------------------------------------
 # Network nodes properties
 # -----------------------------------------------------------
 
+# The nodes that can be compacted in belt segments
+belt_types = ["transport-belt", "underground-belt"]
+
 
 def create_node(entity):
     if entity.data["type"] == "assembling-machine":
@@ -23,12 +26,22 @@ class Node:
         self.type = entity.data["type"]
 
         # Network optimization data
+        self.network = None  # Set when the node is added to a network
         self.removed = False
-        self.compacted_nodes = []  # Contain the nodes deleted by the optimizer
+
+        # Items per second that can go through the node,
+        # the slowest belt speed for a belt segment
+        self.speed = entity.speed
 
         # Bottleneck calculation
         self.flow = item.Flow()
 
+        # True while the node asks its parents for flow, or takes it back.
+        # In a loop, the node can be asked again by its own parents,
+        # it can't give them the flow it is waiting for
+        self.asking_flow = False
+        self.taking_back_flow = False
+
     # Optimization
     def optimize(self):
         # Optimize the graph by removing the node if it's not needed.
@@ -50,26 +63,50 @@ class Node:
 
                 self.remove()
 
+    def compact_segment(self):
+        # Called once all the nodes are optimized.
+        # If the belt, or underground belt, has a single belt parent
+        # with the same speed, and is the only child of this parent,
+        # all the items of the parent go through the belt:
+        # the belt is merged in its parent.
+        # Each node is merged in its parent in the same way, so each
+        # linear chain of belts becomes a single segment node.
+        # A dead-end belt is not merged, the leafs of the network
+        # stay the same, and a tier change ends the segment,
+        # each belt keeps its own usage rate
+        if self.type in belt_types and \
+                len(self.childs) > 0 and \
+                len(self.parents) == 1 and \
+                self.parents[0] not in self.childs and \
+                len(self.parents[0].childs) == 1 and \
+                self.parents[0].type in belt_types and \
+                self.parents[0].speed == self.speed:
+
+            self.remove()
+
     def remove(self):
-        # Remove the node from the network
-        if len(self.childs) > 1 or len(self.parents) != 1:
+        # Remove the node from the network, its childs
+        # become the childs of its single parent
+        if len(self.parents) != 1:
             raise Exception("Can't remove this node " + str(self))
 
         self.removed = True
+        parent = self.parents[0]
 
-        # We need to replace our parent child with our child
-        self.parents[0].childs.remove(self)
-        if len(self.childs) > 0:
+        # We need to replace our parent child with our childs
+        parent.childs.remove(self)
+        for child in self.childs:
             # We need to replace our child parent with our parent
-            self.childs[0].parents.remove(self)
-            if self.childs[0] != self.parents[0]:
+            child.parents.remove(self)
+            if child != parent:
                 # This condition avoid belts loop to be removed
-                self.childs[0].parents.append(self.parents[0])
-                self.parents[0].childs.append(self.childs[0])
+                child.parents.append(parent)
+                parent.childs.append(child)
 
-        # We keep a trace of this node by adding it to the compacted list
-        self.compacted_nodes.append(self)
-        self.parents[0].compacted_nodes += self.compacted_nodes
+        if self.network is not None:
+            # We keep a trace of this node, see compaction.py
+            self.network.compaction.merge(self, parent)
+            self.network.remove_node(self)
 
     # Purpose estimation
     def get_materials_output(self):
@@ -89,14 +126,42 @@ class Node:
         if self.node_type == "assembling-machine":
             return False
 
-        if len(self.parents) == 0:
-            return True
+        # Calculated once for all the nodes, see graph.py
+        return self.get_condensation().is_connected_to_root(self)
 
-        for parent in self.parents:
-            if parent.connected_to_input():
-                return True
+    def get_compacted_nodes(self):
+        # The nodes deleted by the optimizer and merged in this node
+        if self.network is None:
+            return []
 
-        return False
+        return self.network.compaction.get_compacted_nodes(self)
+
+    def get_condensation(self):
+        # The loops of the network, see graph.py
+        if self.network is not None:
+            return self.network.condensation()
+
+        return graph.Condensation(list(graph.walk(self, "parents", lambda node: True)))
+
+    def get_materials_outputs_cache(self):
+        # The materials output of the nodes without purpose,
+        # kept by the network until a node purpose changes
+        if self.network is not None:
+            return self.network.materials_outputs()
+
+        return {}
+
+    def get_purposes_sent(self, direction):
+        # The items already sent through each node, kept by the network
+        if self.network is not None:
+            return self.network.purposes_sent(direction)
+
+        return {}
+
+    def invalidate_purposes(self):
+        # Called when the node purpose changes
+        if self.network is not None:
+            self.network.invalidate_purposes(self)
 
     # Bottleneck calculation
     def get_materials_input(self):
@@ -105,11 +170,24 @@ class Node:
         # Else, the input is the node outputs
         return None
 
+    def ask_flow(self, item_name, amount):
+        # A child asks the node for an item flow,
+        # returns the flow the node can give, see run_flow
+        return run_flow(self.ask_flow_steps(item_name, amount))
+
+    def take_back_flow(self, item_name, amount):
+        # A child gives back a flow it asked for,
+        # returns the flow taken back, see run_flow
+        return run_flow(self.take_back_flow_steps(item_name, amount))
+
     # Other
     def __str__(self):
         compacted_info = ""
-        if len(self.compacted_nodes) > 0:
-            compacted_info = "[⧈ " + str(len(self.compacted_nodes)) + "]"
+        nb_compacted_nodes = 0
+        if self.network is not None:
+            nb_compacted_nodes = self.network.compaction.nb_compacted_nodes(self)
+        if nb_compacted_nodes > 0:
+            compacted_info = "[⧈ " + str(nb_compacted_nodes) + "]"
 
         return f"{self.entity} [{len(self.parents)} ► {len(self.childs)}] {compacted_info}"
 
@@ -120,18 +198,18 @@ class Assembly_node (Node):
         self.node_type = "assembly_node"
 
         # Purpose calculation data
-        self.inputs = []
-        self.outputs = []
+        self.inputs = ()
+        self.outputs = ()
 
         if self.entity.recipe is not None:
-            # Set the self inputs as the recipe ingredients
-            for input_item in self.entity.recipe.ingredients:
-                self.inputs.append(input_item)
+            # Set the self inputs as the recipe ingredients,
+            # the recipe is immutable, see recipe.py
+            self.inputs = self.entity.recipe.ingredients
 
             # Set the self outputs as the recipe result
             # We only consider that the recipes makes one item at the moment
             # TODO: Add support for multiple items
-            self.outputs = [self.entity.recipe.result]
+            self.outputs = (self.entity.recipe.result,)
 
     def __str__(self):
         inputs = ""
@@ -174,7 +252,7 @@ class Assembly_node (Node):
 
             for parent in self.parents:
                 # Creating a copy of the recipe input to avoid modifying the recipe
-                recipe_ingredients = self.entity.recipe.ingredients[:]
+                recipe_ingredients = list(self.entity.recipe.ingredients)
                 parent.set_purpose_from_child(recipe_ingredients)
 
         else:
@@ -208,8 +286,9 @@ class Assembly_node (Node):
                             # We can ignore it and the ingredient it provides
                             provided_ingredients[ing_index].append(
                                 parent_item)
-                            utils.verbose(
-                                f"\t\t{self.parents[parent_ind]} provides {ingredient}")
+                            if utils.is_verbose():
+                                utils.verbose(
+                                    f"\t\t{self.parents[parent_ind]} provides {ingredient}")
 
             nb_treated_ingredients = 0
             needed_ingredients = []
@@ -234,8 +313,9 @@ class Assembly_node (Node):
             for parent in self.parents:
                 if parent.transported_items is None:
                     parent_without_purpose.append(parent)
-                    utils.verbose(
-                        f"\t\t{parent} has no purpose, it will provide the other ingredients")
+                    if utils.is_verbose():
+                        utils.verbose(
+                            f"\t\t{parent} has no purpose, it will provide the other ingredients")
 
             if len(parent_without_purpose) > 0:
                 # Assign the other ingredients to the parents
@@ -251,15 +331,17 @@ class Assembly_node (Node):
 
             for parent in self.parents:
                 if parent.connected_to_input():
-                    utils.verbose(
-                        f"\t\t{parent} is directly linked to an input, it will provide the other ingredients")
+                    if utils.is_verbose():
+                        utils.verbose(
+                            f"\t\t{parent} is directly linked to an input, it will provide the other ingredients")
 
                     parent.set_purpose_from_child(needed_ingredients)
                     return
 
             # No parent can provide the other ingredients
-            utils.verbose(
-                f"Waring No parent can provide the other ingredients for {self}", level=1)
+            if utils.is_verbose(level=1):
+                utils.verbose(
+                    f"Waring No parent can provide the other ingredients for {self}", level=1)
 
     def get_materials_output(self):
         # Get the materials output of the node
@@ -284,7 +366,7 @@ class Assembly_node (Node):
 
         return self.inputs
 
-    def ask_flow(self, item_name, amount):
+    def ask_flow_steps(self, item_name, amount):
         # We receive a flow request from a child
 
         if self.entity.recipe is None:
@@ -295,6 +377,10 @@ class Assembly_node (Node):
         if self.entity.recipe.result.name != item_name:
             return 0
 
+        if self.asking_flow:
+            # We are in a loop, the flow we are waiting for can't come from us
+            return 0
+
         # We check that we have enougth assembly time
         available_amount = self.entity.items_per_second - self.flow.total_amount
 
@@ -313,46 +399,50 @@ class Assembly_node (Node):
 
         # We check that we have the needed ingredients
         # so we ask for each of our items how much our parents can provide
+        self.asking_flow = True
         ingredients_input = {}
-        for item in self.entity.recipe.ingredients:
-            ingredients_input[item.name] = {"total": 0, "from": []}
-
-            # We need to get the amount of the item we need the parents to provide
-            # First we get the amount of the item that we would have needed in case of a 100% usage
-            required_item_per_second = self.entity.required_items_per_second[item.name]
-
-            # Then we reduce it to correspond to the amount of the item we expect to produce
-            required_item_per_second *= usage
-            required_item_per_second_target = required_item_per_second
+        try:
+            for item in self.entity.recipe.ingredients:
+                ingredients_input[item.name] = {"total": 0, "from": []}
+
+                # We need to get the amount of the item we need the parents to provide
+                # First we get the amount of the item that we would have needed in case of a 100% usage
+                required_item_per_second = self.entity.required_items_per_second[item.name]
+
+                # Then we reduce it to correspond to the amount of the item we expect to produce
+                required_item_per_second *= usage
+                required_item_per_second_target = required_item_per_second
+
+                # We then ask our parents for the item:
+                for parent in self.parents:
+                    amount_provided = yield parent.ask_flow_steps(
+                        item.name, required_item_per_second)
+                    ingredients_input[item.name]["from"].append({
+                        "amount": amount_provided, "from": parent})
+                    ingredients_input[item.name]["total"] += amount_provided
+                    required_item_per_second -= amount_provided
+
+                    if required_item_per_second <= 0:
+                        break
 
-            # We then ask our parents for the item:
-            for parent in self.parents:
-                amount_provided = parent.ask_flow(
-                    item.name, required_item_per_second)
-                ingredients_input[item.name]["from"].append({
-                    "amount": amount_provided, "from": parent})
-                ingredients_input[item.name]["total"] += amount_provided
-                required_item_per_second -= amount_provided
-
-                if required_item_per_second <= 0:
+                if ingredients_input[item.name]["total"] == 0:
+                    # We don't have the needed ingredient, we can't proceed
+                    usage = 0
                     break
 
-            if ingredients_input[item.name]["total"] == 0:
-                # We don't have the needed ingredient, we can't proceed
-                usage = 0
-                break
+                percent_recieved = ingredients_input[item.name]["total"] / \
+                    required_item_per_second_target
 
-            percent_recieved = ingredients_input[item.name]["total"] / \
-                required_item_per_second_target
+                # If the percent of the item we received is less than 100%,
+                # we have to adjust our next items requests because
+                # we don't need as much as expected
 
-            # If the percent of the item we received is less than 100%,
-            # we have to adjust our next items requests because
-            # we don't need as much as expected
+                usage *= percent_recieved
 
-            usage *= percent_recieved
-
-        produced_amount = usage * self.entity.items_per_second
-        self.flow.add_item(self.entity.recipe.result.name, produced_amount)
+            produced_amount = usage * self.entity.items_per_second
+            self.flow.add_item(self.entity.recipe.result.name, produced_amount)
+        finally:
+            self.asking_flow = False
 
         # Before sending how much item we can produce
         # we need to update our parents flow
@@ -367,7 +457,7 @@ class Assembly_node (Node):
 
                 for amount_from in ingredients_input[ingredient_name]["from"]:
                     parent = amount_from["from"]
-                    reduced_flow = parent.take_back_flow(
+                    reduced_flow = yield parent.take_back_flow_steps(
                         ingredient_name, exceeding_amount)
                     exceeding_amount -= reduced_flow
 
@@ -376,12 +466,21 @@ class Assembly_node (Node):
 
         return produced_amount
 
-    def take_back_flow(self, item_name, amount):
+    def take_back_flow_steps(self, item_name, amount):
         # We gived too much flow at some point, we take it back
 
-        if self.entity.recipe is None:
+        if self.entity.recipe is None or self.taking_back_flow:
             return 0
 
+        self.taking_back_flow = True
+        try:
+            taked_back_amount = yield from self.take_back_recipe_flow_steps(item_name, amount)
+        finally:
+            self.taking_back_flow = False
+
+        return taked_back_amount
+
+    def take_back_recipe_flow_steps(self, item_name, amount):
         # We check that we produce the requested item
         if self.entity.recipe.result.name != item_name:
             return 0
@@ -404,7 +503,7 @@ class Assembly_node (Node):
             item_amount_to_take_back = actual_required_amount * percentage_to_take_back
 
             for parent in self.parents:
-                amount_taked_back = parent.take_back_flow(
+                amount_taked_back = yield parent.take_back_flow_steps(
                     item.name, item_amount_to_take_back)
                 item_amount_to_take_back -= amount_taked_back
 
@@ -444,36 +543,57 @@ class Transport_node (Node):
         if self.transported_items is None:
             # We don't know what the node outputs are
             # so we ask our parents for their output
-            transported_items = []
-            for parent in self.parents:
-                transported_items += parent.get_materials_output()
-
-            if len(transported_items) > 0:
-                self.transported_items = transported_items
-
-            return transported_items
+            return get_materials_output_from_parents(
+                self, self.get_condensation(), self.get_materials_outputs_cache())
 
         return self.transported_items
 
     def set_purpose_from_child(self, items):
         # Our childrens are telling us the items that they need
-        self.add_transported_item(items)
-
-        # We send the message to our parents
-        for parent in self.parents:
-            parent.set_purpose_from_child(items)
+        # We send the message to our parents, the transport nodes
+        # send it to their own parents, and so on.
+        # Each node receives the message once, it would else go around the loops
+        for node in self.walk_purpose(items, "parents"):
+            if is_transport_node(node):
+                node.add_transported_item(items)
+            else:
+                node.set_purpose_from_child(items)
 
     def set_purpose_from_parent(self, items):
         # Our parents are telling us the items that they will give us
-        self.add_transported_item(items)
+        # We send the message to our childs, the same way
+        for node in self.walk_purpose(items, "childs"):
+            if is_transport_node(node):
+                node.add_transported_item(items)
+            else:
+                node.set_purpose_from_parent(items)
+
+    def walk_purpose(self, items, direction):
+        # The nodes receiving the items, in the direction
+        # Once items were sent through a transport node, all the transport
+        # nodes after it transport them: the items transported are never
+        # removed. The items sent again through the node stop there,
+        # else each assembling machine of a line would walk the whole belt.
+        sent = self.get_purposes_sent(direction)
+        item_names = set(item.name for item in items)
+
+        def follow(node):
+            if not is_transport_node(node):
+                return False
+
+            node_sent = sent.setdefault(id(node), set())
+            if item_names <= node_sent:
+                return False
+
+            node_sent |= item_names
+            return True
 
-        # We send the message to our childs
-        for child in self.childs:
-            child.set_purpose_from_parent(items)
+        return graph.walk(self, direction, follow)
 
     def add_transported_item(self, items):
         if self.transported_items is None:
             self.transported_items = items
+            self.invalidate_purposes()
         else:
             for item in items:
                 item_already_in_list = False
@@ -485,6 +605,7 @@ class Transport_node (Node):
 
                 if not item_already_in_list:
                     self.transported_items.append(item)
+                    self.invalidate_purposes()
 
     def is_item_transported(self, item_name):
         if self.transported_items is None:
@@ -504,59 +625,67 @@ class Transport_node (Node):
 
     @property
     def usage_ratio(self):
-        if self.entity.speed is None:
+        if self.speed is None:
             return None
 
-        return self.flow.total_amount / self.entity.speed
+        return self.flow.total_amount / self.speed
 
-    def ask_flow(self, item_name, amount):
+    def ask_flow_steps(self, item_name, amount):
         # An item flow is requiered from a parent node
         # We check that we tranport the requested item
         if not self.is_item_transported(item_name):
             return 0
 
-        if self.entity.speed is None:
-            # Node without speed or usage_ratio limits (chests)
-            provided_amount = self.get_parents_flow(item_name, amount)
-            self.flow.add_item(item_name, provided_amount)
-            return provided_amount
-
-        if self.usage_ratio >= 1:
-            # We are full, we can't give more flow
+        if self.asking_flow:
+            # We are in a loop, the flow we are waiting for can't come from us
             return 0
 
-        # We get only the flow we can accept
-        available_flow_amount = self.entity.speed - self.flow.total_amount
-
         processed_amount = amount
-        if available_flow_amount < processed_amount:
-            # We have an exceding flow,
-            # we can't accept all of the second flow
-            processed_amount = available_flow_amount
+        if self.speed is not None:
+            # Node with a speed limit (not a chest)
+            if self.usage_ratio >= 1:
+                # We are full, we can't give more flow
+                return 0
+
+            # We get only the flow we can accept
+            available_flow_amount = self.speed - self.flow.total_amount
+
+            if available_flow_amount < processed_amount:
+                # We have an exceding flow,
+                # we can't accept all of the second flow
+                processed_amount = available_flow_amount
 
         # How much of this new flow can our children accept
-        provided_amount = self.get_parents_flow(item_name, processed_amount)
+        self.asking_flow = True
+        try:
+            provided_amount = yield from self.get_parents_flow_steps(item_name, processed_amount)
+        finally:
+            self.asking_flow = False
+
         self.flow.add_item(item_name, provided_amount)
         return provided_amount
 
-    def get_parents_flow(self, item_name, amount):
+    def get_parents_flow_steps(self, item_name, amount):
         # If we don't have parents, we are an input node
         if len(self.parents) == 0:
             # so we provide all the requested flow
             return amount
 
-        # If we have one parent, we request from him the flow
-        elif len(self.parents) == 1:
-            return self.parents[0].ask_flow(item_name, amount)
-
-        # If we have multiple parents,
-        # We ask them each the flow, they are sorted by priority
+        # We ask each parent the flow, they are sorted by priority
         # TODO: sort by priority (arms and arms with higer speed first, ...)
 
         requested_amount = amount
         sendedable_amount = 0
         for parent in self.parents:
-            provided_amount = parent.ask_flow(item_name, requested_amount)
+            loop_index = self.get_entered_loop(parent)
+            if loop_index is None:
+                provided_amount = yield parent.ask_flow_steps(item_name, requested_amount)
+            else:
+                # The items entering the loop are limited by its slowest node
+                provided_amount = yield parent.ask_flow_steps(
+                    item_name, min(requested_amount, self.network.get_loop_capacity_left(loop_index)))
+                self.network.add_loop_flow(loop_index, provided_amount)
+
             sendedable_amount += provided_amount
             # If there is some usage_ratio left afetr the previous parent,
             # we ask the next parent
@@ -566,55 +695,192 @@ class Transport_node (Node):
 
         return sendedable_amount
 
-    def take_back_flow(self, item_name, amount):
+    def take_back_flow_steps(self, item_name, amount):
         # We gived too much flow at some point, we take it back
         if amount <= 0:
             return 0
 
         # We check that we tranport the requested item
-        if not self.is_item_transported(item_name):
+        if not self.is_item_transported(item_name) or self.taking_back_flow:
             return 0
 
-        if self.entity.speed is None:
-            # Node without speed or usage_ratio limits (chests)
-            taked_back_amount = self.take_back_parents_flow(item_name, amount)
-            self.flow.reduce(item_name, taked_back_amount)
-            return taked_back_amount
-
-        if self.usage_ratio <= 0:
-            # We don't have flow to take back
-            return 0
-
-        # We get only take back the flow we can take back
         amount_to_take_back = amount
-        if amount > self.flow.total_amount:
-            amount_to_take_back = self.flow.total_amount
+        if self.speed is not None:
+            # Node with a speed limit (not a chest)
+            if self.usage_ratio <= 0:
+                # We don't have flow to take back
+                return 0
+
+            # We get only take back the flow we can take back
+            if amount > self.flow.total_amount:
+                amount_to_take_back = self.flow.total_amount
 
         # How much of this new flow can our children accept
-        taked_back_amount = self.take_back_parents_flow(
-            item_name, amount_to_take_back)
+        self.taking_back_flow = True
+        try:
+            taked_back_amount = yield from self.take_back_parents_flow_steps(
+                item_name, amount_to_take_back)
+        finally:
+            self.taking_back_flow = False
+
         self.flow.reduce(item_name, taked_back_amount)
         return taked_back_amount
 
-    def take_back_parents_flow(self, item_name, amount):
-        # Same as get_parents_flow but to take it back
+    def take_back_parents_flow_steps(self, item_name, amount):
+        # Same as get_parents_flow_steps but to take it back
 
         if len(self.parents) == 0:
             # Input node
             return amount
 
-        elif len(self.parents) == 1:
-            return self.parents[0].take_back_flow(item_name, amount)
-
         amount_to_take_back = amount
         taked_back_amount_total = 0
         for parent in self.parents:
-
-            taked_back_amount = parent.take_back_flow(
+            taked_back_amount = yield parent.take_back_flow_steps(
                 item_name, amount_to_take_back)
+
+            loop_index = self.get_entered_loop(parent)
+            if loop_index is not None:
+                self.network.add_loop_flow(loop_index, -taked_back_amount)
+
             taked_back_amount_total += taked_back_amount
             amount_to_take_back -= taked_back_amount
             if amount_to_take_back <= 0:
                 break
 
         return taked_back_amount_total
+
+    def get_entered_loop(self, parent):
+        # The index of the loop the parent items enter through the node,
+        # None if the node is not in a loop or if the parent is in the same loop
+        if self.network is None:
+            return None
+
+        condensation = self.network.condensation()
+        if not condensation.is_cyclic(self):
+            return None
+
+        loop_index = condensation.get_component_index(self)
+        if condensation.get_component_index(parent) == loop_index:
+            return None
+
+        return loop_index
+
+
+def run_flow(steps):
+    # Run the steps of a flow request, see Node.ask_flow
+    # A node asks its parents for flow, they ask their own parents, and so on.
+    # Instead of recursive calls, that would reach the Python recursion
+    # limit on long belts, each request is a generator that yields the
+    # requests it sends to the parents. The generators are stacked and
+    # each one receives the flow returned by the request it yielded.
+    # The requests are counted with the instrumentation, see instrumentation.py
+    report = instrumentation.get_report()
+    if report is not None:
+        report.count_flow_request(steps, 1)
+
+    stack = [steps]
+    result = None
+
+    try:
+        while len(stack) > 0:
+            try:
+                parent_steps = stack[-1].send(result)
+            except StopIteration as steps_end:
+                # The request is over, its flow is given to the previous request
+                stack.pop()
+                result = steps_end.value
+                continue
+
+            stack.append(parent_steps)
+            result = None
+            if report is not None:
+                report.count_flow_request(parent_steps, len(stack))
+    finally:
+        # After an error, the requests are closed
+        # so the nodes asking flow are released
+        for remaining_steps in reversed(stack):
+            remaining_steps.close()
+
+    return result
+
+
+def is_transport_node(node):
+    return node.node_type == "transport_node"
+
+
+def get_materials_output_from_parents(start_node, condensation, outputs):
+    # Get the materials output of a transport node without purpose
+    # from the output of its parents, of their own parents, and so on.
+    # The parents are processed before their childs, in the topological
+    # order of the condensation, so the loops are processed once:
+    # all the nodes of a loop output the items entering the loop.
+    # The nodes without purpose get the items they output as purpose
+    #
+    # outputs: {id(node): items}, the outputs already calculated,
+    # the new outputs are added to it. The nodes without output are kept
+    # too, they are not calculated again until a purpose changes
+
+    def is_known(node):
+        return not is_transport_node(node) or node.transported_items is not None
+
+    def is_calculated(node):
+        return id(node) in outputs or is_known(node)
+
+    def get_parents_items(node, component_index):
+        items = []
+        for parent in node.parents:
+            if condensation.get_component_index(parent) != component_index:
+                items += outputs.get(id(parent), [])
+        return items
+
+    for i in condensation.upstream_components([start_node], is_calculated):
+        component = condensation.components[i]
+        if all(id(node) in outputs for node in component):
+            continue
+
+        if not condensation.cyclic[i]:
+            node = component[0]
+            if is_known(node):
+                outputs[id(node)] = node.get_materials_output()
+                continue
+
+            items = get_parents_items(node, i)
+            if len(items) > 0:
+                node.transported_items = items
+
+            outputs[id(node)] = items
+            continue
+
+        # Loop of nodes, the items go around the loop
+        items = []
+        if not all(is_known(node) for node in component):
+            for node in component:
+                if is_known(node):
+                    items += node.get_materials_output()
+                items += get_parents_items(node, i)
+
+            items = get_unique_items(items)
+
+        for node in component:
+            if is_known(node):
+                outputs[id(node)] = node.get_materials_output()
+                continue
+
+            if len(items) > 0:
+                node.transported_items = list(items)
+            outputs[id(node)] = node.transported_items or []
+
+    return outputs.get(id(start_node)) or []
+
+
+def get_unique_items(items):
+    # The items without the duplicated names, in the same order
+    unique_items = []
+    names = set()
+    for item in items:
+        if item.name not in names:
+            names.add(item.name)
+            unique_items.append(item)
+
+    return unique_items
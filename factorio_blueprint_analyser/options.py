@@ -3,6 +3,10 @@ import argparse
 import sys
 import os
 
+import glob
+
+from factorio_blueprint_analyser import export
+
 # -----------------------------------------------------------
 # Read the user input and check the options
 # The options are stored in the global variables
@@ -12,10 +16,18 @@ input = ""
 output = ""
 force = False
 config_path = ""
+output_format = "json"
+book = False
+batch = False
+jobs = None
+serve = None
+connect = None
+sweep = None
+report = None
 
 
 def read_options():
-    global input, output, force, config_path
+    global input, output, force, config_path, output_format, book, batch, jobs, serve, connect, sweep, report
 
     # ==== Options read ====
 
@@ -35,6 +47,44 @@ def read_options():
     parser.add_argument("-f", "--force", action="store_true", dest="force",
                         help="Force overwrite of existing result file", default=False)
 
+    parser.add_argument("--format", dest="format", choices=export.output_formats,
+                        help="Output format: indented JSON, compact JSON or JSON Lines with one entity per line",
+                        default="json")
+
+    parser.add_argument("--book", action="store_true", dest="book",
+                        help="Analyse every blueprint of the input blueprint book, the results are written as JSON Lines",
+                        default=False)
+
+    parser.add_argument("--batch", action="store_true", dest="batch",
+                        help="Analyse a corpus of blueprints, the input is a directory, a glob pattern \
+                        or a file with one blueprint string per line. The results are written as JSON Lines, \
+                        an existing output file is resumed unless --force is used",
+                        default=False)
+
+    parser.add_argument("-j", "--jobs", type=int, dest="jobs",
+                        help="Number of processes used to analyse a blueprint book or a batch, or by the daemon, \
+                        the CPU count by default",
+                        default=None)
+
+    parser.add_argument("--serve", dest="serve", metavar="SOCKET",
+                        help="Start an analysis daemon listening on this Unix socket path",
+                        default=None)
+
+    parser.add_argument("--connect", dest="connect", metavar="SOCKET",
+                        help="Send the input blueprint to the analysis daemon listening on this Unix socket path",
+                        default=None)
+
+    parser.add_argument("--sweep", nargs="+", dest="sweep", metavar="SCENARIO",
+                        help="Analyse the input blueprint for each capacity scenario, a scenario is a list of \
+                        key=value separated by commas, with the keys inserterCapacityBonus, beltTier and \
+                        assemblerTier, or baseline for the config capacities. The results are written as JSON Lines",
+                        default=None)
+
+    parser.add_argument("--report", dest="report", metavar="PATH",
+                        help="Write the time of each analysis phase and the flow calculation counters \
+                        in this JSON file",
+                        default=None)
+
     parser.add_argument("-c", "--config", nargs="?", dest="config",
                         help="Analyser yaml config file path", default="config/config_default.yaml")
 
@@ -44,18 +94,48 @@ def read_options():
     output = opt.output
     force = opt.force
     config_path = opt.config
+    output_format = opt.format
+    book = opt.book
+    batch = opt.batch
+    jobs = opt.jobs
+    serve = opt.serve
+    connect = opt.connect
+    sweep = opt.sweep
+    report = opt.report
 
     # ==== Options validation ====
 
+    if sum([opt.book, opt.batch, opt.serve is not None, opt.connect is not None,
+            opt.sweep is not None]) > 1:
+        raise Exception(
+            "Only one of the --book, --batch, --serve, --connect and --sweep options can be used")
+
+    if opt.report is not None and (opt.book or opt.batch or opt.serve is not None or
+                                   opt.connect is not None or opt.sweep is not None):
+        raise Exception("The --report option can only be used to analyse a single blueprint")
+
+    if opt.jobs is not None and opt.jobs < 1:
+        raise Exception(f"Invalid number of jobs: {opt.jobs}")
+
+    # Check if the config file exists
+    if not os.path.exists(opt.config):
+        raise Exception(f"Config file '{opt.config}' does not exist")
+
+    if opt.serve is not None:
+        # The daemon has no input and output files
+        return
+
     # Check if the input file exists
-    if not os.path.exists(opt.input):
+    # A batch input can also be a glob pattern
+    if not os.path.exists(opt.input) and not (opt.batch and glob.has_magic(opt.input)):
         raise Exception(f"Input file '{opt.input}' does not exist")
 
     # Check if the output file exists
-    if os.path.exists(opt.output) and not force:
+    # An existing batch output is resumed
+    if os.path.exists(opt.output) and not force and not opt.batch:
         raise Exception(
             f"Output file '{opt.output}' already exists\nUse --force or -f to overwrite it")
 
-    # Check if the config file exists
-    if not os.path.exists(opt.config):
-        raise Exception(f"Config file '{opt.config}' does not exist")
+    if opt.report is not None and os.path.exists(opt.report) and not force:
+        raise Exception(
+            f"Report file '{opt.report}' already exists\nUse --force or -f to overwrite it")
@@ -0,0 +1,136 @@
+from types import MappingProxyType
+
+from factorio_blueprint_analyser import utils
+
+# -----------------------------------------------------------
+# Entity prototypes
+# One immutable prototype is created for each Factorio entity
+# when the data is loaded. It holds the entity numbers used by
+# the analysis, so the entities don't have to read and check
+# the Factorio data each time they are created
+# -----------------------------------------------------------
+
+belt_types = ["transport-belt", "underground-belt", "splitter"]
+
+# Default values, used when the Factorio data doesn't provide them
+default_belt_speed = 0.03125  # the speed of the lvl1 transport belt
+default_rotation_speed = 0.014  # the rotation_speed of the lvl1 inserter
+default_crafting_speed = 0.5  # the speed of the assembling-machine-1
+default_max_distance = 5  # the distance of the lvl1 underground-belt
+
+# Tiles occupied by a 3x3 entity, from its center
+large_entity_offsets = (
+    (0, 0),
+    (0, 1),
+    (0, -1),
+    (1, 1),
+    (1, 0),
+    (1, -1),
+    (-1, 1),
+    (-1, 0),
+    (-1, -1),
+)
+
+
+class EntityPrototype:
+    __slots__ = (
+        "name",
+        "type",
+        "data",
+        "belt_speed",
+        "items_per_second",
+        "rotation_speed",
+        "inserter_rate",
+        "crafting_speed",
+        "max_distance",
+        "offsets",
+    )
+
+    def __init__(self, entity_data):
+        set_attr = super().__setattr__
+
+        # The Factorio data is shared, we only give a read only view of it
+        set_attr("data", MappingProxyType(entity_data))
+        set_attr("name", entity_data["name"])
+        set_attr("type", entity_data["type"])
+
+        # Belts, underground belts and splitters
+        belt_speed = None
+        items_per_second = None
+        if self.type in belt_types:
+            if "speed" not in entity_data:
+                utils.warning(f"{self.name} has no speed")
+                belt_speed = default_belt_speed
+            else:
+                belt_speed = entity_data["speed"]
+
+            # Calculation of the belt item per second
+            # 60 ticks / second
+            # A tile is 4 items
+            # There is two line on the belt
+            # this will result, for the first belt, with an output of 15 item per second
+            # This can be veryfied here: https://wiki.factorio.com/Belt_transport_system
+            items_per_second = belt_speed * 60 * 4 * 2
+
+        set_attr("belt_speed", belt_speed)
+        set_attr("items_per_second", items_per_second)
+
+        # Inserters
+        rotation_speed = None
+        inserter_rate = None
+        if self.type == "inserter":
+            if "rotation_speed" not in entity_data:
+                utils.warning(f"{self.name} has no rotation speed")
+                rotation_speed = default_rotation_speed
+            else:
+                rotation_speed = entity_data["rotation_speed"]
+
+            # The rotation speed is the turn per tick
+            # There is 60 ticks per second
+            # This is the speed without the inserter capacity bonus
+            inserter_rate = rotation_speed * 60  # turn or items per second
+
+        set_attr("rotation_speed", rotation_speed)
+        set_attr("inserter_rate", inserter_rate)
+
+        # Assembling machines
+        crafting_speed = None
+        if self.type == "assembling-machine":
+            if "crafting_speed" not in entity_data:
+                utils.warning(f"{self.name} has no crafting speed", level=1)
+                crafting_speed = default_crafting_speed
+            else:
+                crafting_speed = entity_data["crafting_speed"]
+
+        set_attr("crafting_speed", crafting_speed)
+
+        # Underground belts
+        max_distance = None
+        if self.type == "underground-belt":
+            max_distance = entity_data["max_distance"] \
+                if "max_distance" in entity_data \
+                else default_max_distance
+
+        set_attr("max_distance", max_distance)
+
+        # Tiles occupied by the entity
+        # The splitter tiles depend on its direction, they are set by the entity
+        offsets = ((0, 0),)
+        if self.type == "assembling-machine":
+            offsets = large_entity_offsets
+
+        set_attr("offsets", offsets)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Entity prototype {self.name} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Entity prototype {self.name} is immutable")
+
+    def __str__(self):
+        return f"{self.name} ({self.type})"
+
+
+def create_prototypes(entities):
+    # Returns a dictionary of prototypes by entity name
+    return {name: EntityPrototype(entities[name]) for name in entities}
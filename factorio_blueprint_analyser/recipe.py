@@ -1,39 +1,62 @@
 
-from factorio_blueprint_analyser import factorio, item, utils
+from types import MappingProxyType
+
+from factorio_blueprint_analyser import item, utils, context
 
 # -----------------------------------------------------------
 # Assembly machines recipe class
+# The recipes are created once, when the Factorio data is loaded,
+# and are shared by all the assembling machines
 # -----------------------------------------------------------
 DIFFICULTY = "normal"
 
 
 def get_recipe(name):
-    # Check that the recipe exists
-    if name not in factorio.recipies:
+    # Check that the recipe exists in the current analyser data
+    recipe = context.get_analyser().data.catalogue.get(name)
+    if recipe is None:
         utils.warning(f"No recipe found for {name}")
         return None
 
-    return Recipe(name)
+    return recipe
+
+
+class RecipeCatalogue:
+    def __init__(self, factorio_recipies, difficulty=DIFFICULTY):
+        self.recipes = {name: Recipe(name, factorio_recipies[name], difficulty)
+                        for name in factorio_recipies}
+
+    def get(self, name):
+        return self.recipes.get(name)
+
+    def __contains__(self, name):
+        return name in self.recipes
+
+    def __len__(self):
+        return len(self.recipes)
 
 
 class Recipe:
-    def __init__(self, name) -> None:
-        self.name = name
+    # The recipes are immutable, like their items
+    __slots__ = ("name", "result", "ingredients", "ingredients_by_name", "time")
 
-        factorio_recipe = factorio.recipies[name]
+    def __init__(self, name, factorio_recipe, difficulty=DIFFICULTY) -> None:
+        set_attr = super().__setattr__
+        set_attr("name", name)
 
         # Get result item
         nb_item_output = factorio_recipe["result_count"] \
             if "result_count" in factorio_recipe else 1
 
-        self.result = item.Item(name, nb_item_output)
+        set_attr("result", item.Item(name, nb_item_output))
         # TODO: deal with multiple results
 
         # Get ingredients
-        self.ingredients = []
+        # The recipe is shared, so the ingredients are stored in a tuple
+        ingredients_list = []
 
-        ingredients = factorio_recipe[DIFFICULTY]["ingredients"] \
-            if DIFFICULTY in factorio_recipe \
+        ingredients = factorio_recipe[difficulty]["ingredients"] \
+            if difficulty in factorio_recipe \
             else factorio_recipe["ingredients"]
 
         for ingredient in ingredients:
@@ -43,7 +66,7 @@ class Recipe:
 
             try:
                 if isinstance(ingredient, list):
-                    self.ingredients.append(
+                    ingredients_list.append(
                         item.Item(ingredient[0],
                                   ingredient[1]))
 
@@ -52,33 +75,41 @@ class Recipe:
                         # Fluid ingredient, we ignore it
                         continue
 
-                    self.ingredients.append(
+                    ingredients_list.append(
                         item.Item(ingredient["name"],
                                   ingredient["amount"],
                                   type=ingredient["type"]))
             except KeyError:
                 utils.warning(f"Something went wrong with the recipe {name}")
-                self.exists = False
-                return
+                break
+
+        ingredients_by_name = {}
+        for ingredient in ingredients_list:
+            if ingredient.name not in ingredients_by_name:
+                ingredients_by_name[ingredient.name] = ingredient
+
+        set_attr("ingredients", tuple(ingredients_list))
+        set_attr("ingredients_by_name", MappingProxyType(ingredients_by_name))
 
         # Get production time
-        self.time = factorio_recipe["energy_required"] \
-            if "energy_required" in factorio_recipe \
-            else 0.5
+        set_attr("time", factorio_recipe["energy_required"]
+                 if "energy_required" in factorio_recipe
+                 else 0.5)
 
-    def ingredient_required(self, ingredient_name):
-        for ingredient in self.ingredients:
-            if ingredient.name == ingredient_name:
-                return True
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Recipe {self.name} is immutable")
 
-        return False
+    def __delattr__(self, name):
+        raise AttributeError(f"Recipe {self.name} is immutable")
+
+    def ingredient_required(self, ingredient_name):
+        return ingredient_name in self.ingredients_by_name
 
     def get_ingredient_nb(self, ingredient_name):
-        for ingredient in self.ingredients:
-            if ingredient.name == ingredient_name:
-                return ingredient.amount
+        if ingredient_name not in self.ingredients_by_name:
+            return None
 
-        return None
+        return self.ingredients_by_name[ingredient_name].amount
 
     def all_ingredients_required(self, given_ingredients):
         for ingredient in self.ingredients:
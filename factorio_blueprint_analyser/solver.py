@@ -0,0 +1,233 @@
+import time
+
+from factorio_blueprint_analyser import lp
+
+# -----------------------------------------------------------
+# Linear programming bottleneck solver
+# Alternative to the ask_flow / take_back_flow requests of the nodes,
+# selected with the bottleneckSolver config. The steady state of the
+# network is written as a linear program and solved for each
+# group of connected nodes:
+#
+#   - A flow variable for each link between two nodes and each item
+#     the parent can give and the child can take
+#   - Transport nodes: for each item, the received flow is equal to
+#     the given flow, and the total flow is limited by the node speed
+#   - Assembly nodes: a production variable, limited by the assembling
+#     machine speed, the received ingredients follow the recipe ratios
+#     and the production is given to the childs
+#   - The root nodes receive all the items they need and the leaf nodes
+#     give their items out of the network, limited by their speed as
+#     with the other solver
+#
+# The solver maximises the items given by the leaf nodes.
+# The node flows are then set from the solution.
+#
+# The programs are created from the network index only, see csr.py:
+# the nodes are walked by their number and the items by their id
+#
+# The linear programs only contain numbers, the programs of the
+# large groups of nodes can be solved by other processes,
+# see Network.calculate_bottleneck
+# -----------------------------------------------------------
+
+# Leaf capacity of the nodes without speed, same as the other solver
+default_leaf_capacity = 10000
+
+# Small cost given to each link flow, so the solution doesn't
+# contain useless flows turning in loops
+link_flow_cost = 1e-6
+
+# Flows smaller than this are ignored
+min_flow = 1e-9
+
+
+def solve_program(program):
+    # Returns the optimal values of the program variables
+    # and the time taken to find them, run by the processes pools
+    start = time.perf_counter()
+    values = program.solve()
+    return (values, time.perf_counter() - start)
+
+
+class ComponentProgram:
+    # The linear program of a group of linked nodes
+    def __init__(self, component):
+        self.component = component  # The nodes indexes
+        self.program = lp.LinearProgram()
+
+        # Flow variables of each node, by item id:
+        # {node index: {item_id: [variables]}}
+        self.received = {i: {} for i in component}
+        self.given = {i: {} for i in component}
+
+        # Production variables of the assembly nodes
+        self.productions = {}
+
+
+def get_given_items(graph, i):
+    # Ids of the items the node can give to its childs
+    if graph.is_assembly(i):
+        recipe_id = graph.get_recipe_id(i)
+        if recipe_id is None:
+            return []
+        return [graph.recipe_result_ids[recipe_id]]
+
+    return graph.get_transported_items(i)
+
+
+def get_taken_items(graph, i):
+    # Ids of the items the node can receive from its parents
+    if graph.is_assembly(i):
+        recipe_id = graph.get_recipe_id(i)
+        if recipe_id is None:
+            return []
+        return [item_id for (item_id, _) in graph.get_ingredients(recipe_id)]
+
+    return graph.get_transported_items(i)
+
+
+def unique_items(item_ids):
+    return list(dict.fromkeys(item_ids))
+
+
+def create_component_program(graph, component):
+    # graph: the network index with its items, component: the indexes of the linked nodes
+    component_program = ComponentProgram(component)
+    program = component_program.program
+    received = component_program.received
+    given = component_program.given
+    in_component = set(component)
+
+    # Links between the nodes
+    for i in component:
+        linked_childs = set()
+        given_items = get_given_items(graph, i)
+
+        for j in graph.childs(i):
+            if j not in in_component or j in linked_childs:
+                continue
+            linked_childs.add(j)
+
+            taken_items = get_taken_items(graph, j)
+            for item_id in given_items:
+                if item_id in taken_items:
+                    variable = program.add_variable(-link_flow_cost)
+                    given[i].setdefault(item_id, []).append(variable)
+                    received[j].setdefault(item_id, []).append(variable)
+
+    # Items entering and leaving the network
+    for i in component:
+        if graph.nb_parents(i) == 0 and not graph.is_assembly(i):
+            for item_id in get_taken_items(graph, i):
+                variable = program.add_variable()
+                received[i].setdefault(item_id, []).append(variable)
+
+        if graph.nb_childs(i) == 0:
+            # As with the other solver, the leaf nodes without purpose
+            # give the items of their parents, see CSRNetwork.load_items
+            items_output = graph.get_output_items(i)
+            if len(items_output) == 0:
+                continue
+
+            leaf_items = []
+            given_items = get_given_items(graph, i)
+            for item_id in items_output:
+                if item_id not in given_items:
+                    continue
+                variable = program.add_variable(1)
+                given[i].setdefault(item_id, []).append(variable)
+                leaf_items.append(variable)
+
+            leaf_capacity = graph.get_capacity(i)
+            if leaf_capacity is None:
+                leaf_capacity = default_leaf_capacity
+            program.add_constraint(
+                {variable: 1 for variable in leaf_items}, "<=", leaf_capacity)
+
+    # Nodes constraints
+    for i in component:
+        if graph.is_assembly(i):
+            component_program.productions[i] = add_assembly_constraints(
+                program, graph, i, received[i], given[i])
+        else:
+            add_transport_constraints(
+                program, graph, i, received[i], given[i])
+
+    return component_program
+
+
+def get_flows(graph, component_program, values):
+    # Returns the flows of the nodes from the program solution:
+    # {node index: [(item_id, amount)]}
+    received = component_program.received
+    productions = component_program.productions
+    flows = {}
+
+    for i in component_program.component:
+        flow = []
+        flows[i] = flow
+
+        if graph.is_assembly(i):
+            if productions[i] is not None:
+                produced_amount = values[productions[i]]
+                if produced_amount > min_flow:
+                    flow.append((graph.recipe_result_ids[graph.get_recipe_id(i)], produced_amount))
+            continue
+
+        for item_id in get_taken_items(graph, i):
+            amount = sum(values[variable] for variable in received[i].get(item_id, []))
+            if amount > min_flow:
+                flow.append((item_id, amount))
+
+    return flows
+
+
+def add_transport_constraints(program, graph, i, received, given):
+    # The node gives all the items it receives
+    # The items are in a list and not a set, so the program is always the same
+    for item_id in unique_items(list(received) + list(given)):
+        coefficients = {}
+        for variable in received.get(item_id, []):
+            coefficients[variable] = coefficients.get(variable, 0) + 1
+        for variable in given.get(item_id, []):
+            coefficients[variable] = coefficients.get(variable, 0) - 1
+
+        program.add_constraint(coefficients, "=", 0)
+
+    # The node speed limits its total flow
+    speed = graph.get_capacity(i)
+    if speed is not None:
+        coefficients = {variable: 1 for variables in received.values()
+                        for variable in variables}
+        if len(coefficients) > 0:
+            program.add_constraint(coefficients, "<=", speed)
+
+
+def add_assembly_constraints(program, graph, i, received, given):
+    # Returns the production variable
+    recipe_id = graph.get_recipe_id(i)
+    if recipe_id is None:
+        # No recipe, the node is not linked to the others
+        return None
+
+    production = program.add_variable()
+    result_id = graph.recipe_result_ids[recipe_id]
+
+    # The assembling machine speed
+    program.add_constraint({production: 1}, "<=", graph.recipe_rates[recipe_id])
+
+    # The ingredients follow the recipe ratios
+    # Without parents, the node is an input and has all its ingredients
+    if graph.nb_parents(i) > 0:
+        for (ingredient_id, ratio) in graph.get_ingredients(recipe_id):
+            coefficients = {variable: 1 for variable in received.get(ingredient_id, [])}
+            coefficients[production] = -ratio
+            program.add_constraint(coefficients, "=", 0)
+
+    # The production is given to the childs
+    coefficients = {variable: 1 for variable in given.get(result_id, [])}
+    coefficients[production] = -1
+    program.add_constraint(coefficients, "=", 0)
+
+    return production
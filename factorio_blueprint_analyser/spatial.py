@@ -0,0 +1,72 @@
+# -----------------------------------------------------------
+# Sparse 2D index of the blueprint tiles
+# Only the occupied tiles are stored, in a dictionary keyed by the
+# tile coordinates, so the memory and the time needed to go through
+# the tiles depend on the number of entities and not on the
+# blueprint size
+# -----------------------------------------------------------
+
+# Offsets of the 4 tiles around a tile: right, down, left, up
+neighbour_offsets = [[1, 0], [0, 1], [-1, 0], [0, -1]]
+
+
+class SpatialIndex:
+    def __init__(self):
+        self.tiles = {}
+
+    def get(self, x, y):
+        # Returns the value stored on the tile or None
+        return self.tiles.get((x, y))
+
+    def set(self, x, y, value):
+        self.tiles[(x, y)] = value
+
+    def remove(self, x, y):
+        self.tiles.pop((x, y), None)
+
+    def neighbours(self, x, y):
+        # Returns the [x, y, value] of the occupied tiles around the tile
+        neighbours = []
+        for offset in neighbour_offsets:
+            value = self.tiles.get((x + offset[0], y + offset[1]))
+            if value is not None:
+                neighbours.append([x + offset[0], y + offset[1], value])
+
+        return neighbours
+
+    def query_rect(self, min_x, min_y, max_x, max_y):
+        # Returns the [x, y, value] of the occupied tiles in the rectangle,
+        # bounds included, sorted line by line
+        width = max_x - min_x + 1
+        heigth = max_y - min_y + 1
+        if width <= 0 or heigth <= 0:
+            return []
+
+        found = []
+        if width * heigth <= len(self.tiles):
+            # Small rectangle, we check each of its tiles
+            for y in range(min_y, max_y + 1):
+                for x in range(min_x, max_x + 1):
+                    value = self.tiles.get((x, y))
+                    if value is not None:
+                        found.append([x, y, value])
+            return found
+
+        # Large rectangle, we filter the occupied tiles
+        for (x, y) in self.tiles:
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                found.append([x, y, self.tiles[(x, y)]])
+
+        found.sort(key=lambda tile: (tile[1], tile[0]))
+        return found
+
+    def coords(self):
+        # Returns the occupied tiles coordinates, sorted line by line
+        # the same way a 2D array would be read
+        return sorted(self.tiles, key=lambda coord: (coord[1], coord[0]))
+
+    def __contains__(self, coord):
+        return (coord[0], coord[1]) in self.tiles
+
+    def __len__(self):
+        return len(self.tiles)
@@ -0,0 +1,176 @@
+import marshal
+
+from factorio_blueprint_analyser import blueprint, network, config, factorio, prototype
+from factorio_blueprint_analyser import entity as entity_service
+
+# -----------------------------------------------------------
+# What-if sweep
+# Analyses a blueprint for a list of scenarios changing the
+# entities capacities: inserter capacity bonus, belts upgraded
+# to a tier, assembling machines replaced by another tier.
+#
+# The blueprint and the network are created once, and the purposes
+# don't depend on the nodes speeds, see Network.calculate_purposes.
+# For each scenario, only the speeds of the nodes are set again
+# and the flows are calculated again.
+#
+# Scenario format, each key is optional:
+#   {
+#       "name": "bonus 7, express belts",  # The scenario keys by default
+#       "inserterCapacityBonus": 7,  # The config value by default
+#       "beltTier": "express-transport-belt",
+#       "assemblerTier": "assembling-machine-3"
+#   }
+#
+# The belt tier only changes the speeds: the underground belts
+# stay connected to the same underground belts.
+#
+# Each scenario result is a dictionary:
+#   {
+#       "scenario": "bonus 7, express belts",
+#       "items_output": {"electronic-circuit": 2.5},
+#       "throughput": 2.5,  # Total items output per second
+#       "entities_bottleneck": [18, 23]
+#   }
+# -----------------------------------------------------------
+
+scenario_keys = ["name", "inserterCapacityBonus", "beltTier", "assemblerTier"]
+
+
+def parse_scenario(scenario_string):
+    # Read a command line scenario: "inserterCapacityBonus=7,beltTier=fast-transport-belt"
+    # The scenario is named after the string, "baseline" or an empty
+    # string is the scenario without changes
+    if scenario_string in ["", "baseline"]:
+        return {"name": "baseline"}
+
+    scenario = {"name": scenario_string}
+
+    for option in scenario_string.split(","):
+
+        if "=" not in option:
+            raise Exception(f"Invalid scenario option '{option}', the format is key=value")
+
+        (key, value) = option.split("=", 1)
+        if key == "inserterCapacityBonus":
+            if not value.isdigit():
+                raise Exception(f"Invalid inserterCapacityBonus value: {value}")
+            value = int(value)
+
+        scenario[key] = value
+
+    return scenario
+
+
+def get_scenario_name(scenario):
+    if "name" in scenario:
+        return scenario["name"]
+
+    return ",".join(f"{key}={scenario[key]}" for key in scenario_keys if key in scenario)
+
+
+def get_tier_prototypes(scenario):
+    # The prototypes replacing the entities prototypes speeds,
+    # by entity type, for the given scenario
+    prototypes = factorio.get_data().prototypes
+    tier_prototypes = {}
+
+    for key in scenario:
+        if key not in scenario_keys:
+            raise Exception(
+                f"Unknown scenario key '{key}', available keys: {', '.join(scenario_keys)}")
+
+    bonus = scenario.get("inserterCapacityBonus")
+    if bonus is not None and (type(bonus) is not int or not 0 <= bonus <= 7):
+        raise Exception(
+            f"Invalid inserterCapacityBonus value: {bonus}. The value must be an integer between 0 and 7")
+
+    if "beltTier" in scenario:
+        # The underground belts and splitters of the same tier
+        # are named after the transport belt
+        belt_name = scenario["beltTier"]
+        if belt_name not in prototypes or prototypes[belt_name].type != "transport-belt":
+            raise Exception(f"Unknown belt tier '{belt_name}'")
+
+        for belt_type in prototype.belt_types:
+            name = belt_name.replace("transport-belt", belt_type)
+            if name not in prototypes or prototypes[name].type != belt_type:
+                raise Exception(f"No {belt_type} found for the belt tier '{belt_name}'")
+            tier_prototypes[belt_type] = prototypes[name]
+
+    if "assemblerTier" in scenario:
+        assembler_name = scenario["assemblerTier"]
+        if assembler_name not in prototypes or \
+                prototypes[assembler_name].type != "assembling-machine":
+            raise Exception(f"Unknown assembling machine tier '{assembler_name}'")
+        tier_prototypes["assembling-machine"] = prototypes[assembler_name]
+
+    return tier_prototypes
+
+
+class Sweep:
+    def __init__(self, analyser, blueprint_json):
+        self.analyser = analyser
+
+        # The analysis modifies the blueprint JSON, so it is copied
+        blueprint_json = marshal.loads(marshal.dumps(blueprint_json))
+
+        with self.analyser.activate():
+            self.blueprint = blueprint.Blueprint(blueprint_json)
+            self.network = network.create_network(self.blueprint)
+            self.components = self.network.calculate_purposes()
+
+    def run(self, scenarios):
+        # Returns the result of each scenario, in the scenarios order
+        with self.analyser.activate():
+            return [self.run_scenario(scenario) for scenario in scenarios]
+
+    def run_scenario(self, scenario):
+        self.set_capacities(scenario)
+
+        self.network.reset_flows()
+        self.network.calculate_flows(self.components)
+
+        # The analysis is written in a copy of the blueprint JSON
+        analysis = self.blueprint.get_analysis(
+            marshal.loads(marshal.dumps(self.blueprint.blueprint)))["blueprint"]
+
+        return {
+            "scenario": get_scenario_name(scenario),
+            "items_output": analysis["items_output"],
+            "throughput": sum(analysis["items_output"].values()),
+            "entities_bottleneck": analysis["entities_bottleneck"]
+        }
+
+    def set_capacities(self, scenario):
+        # Set the speeds of the entities, then of their nodes,
+        # from the entities own prototypes and the scenario
+        tier_prototypes = get_tier_prototypes(scenario)
+        bonus = scenario.get("inserterCapacityBonus",
+                             config.get_config().inserter_capacity_bonus)
+
+        for node in self.network.nodes:
+            # A belt segment is as fast as its slowest belt, see node.py
+            speeds = []
+            for segment_node in [node] + node.get_compacted_nodes():
+                set_entity_capacity(segment_node.entity, tier_prototypes, bonus)
+                if segment_node.entity.speed is not None:
+                    speeds.append(segment_node.entity.speed)
+
+            node.speed = min(speeds) if len(speeds) > 0 else None
+
+        self.network.invalidate_capacities()
+
+
+def set_entity_capacity(entity, tier_prototypes, inserter_capacity_bonus):
+    entity_type = entity.prototype.type
+
+    if isinstance(entity, entity_service.Inserter):
+        entity.set_capacity_bonus(inserter_capacity_bonus)
+
+    elif entity_type in prototype.belt_types:
+        entity.set_belt_speed(tier_prototypes.get(entity_type, entity.prototype))
+
+    elif isinstance(entity, entity_service.AssemblingMachine):
+        entity.set_crafting_speed(
+            tier_prototypes.get(entity_type, entity.prototype).crafting_speed)
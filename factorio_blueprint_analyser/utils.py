@@ -2,27 +2,39 @@ import zlib
 import json
 import sys
 import base64
-from termcolor import colored
 
 from factorio_blueprint_analyser import config
 
 
-def verbose(content, end="\n", level=3):
+def verbose(content, end="\n", level=3, color=None):
     # Verbose level
     # 0: no output
     # 1: only errors
     # 2: errors and warnings
     # 3: errors, warnings and info
-    if config.config.verbose_level >= level:
+    if is_verbose(level):
+        if color is not None:
+            content = colored(content, color)
         print(content, end=end, file=sys.stderr, flush=True)
 
 
-def warning(content):
-    verbose(colored(f"WARNING: {content}", "yellow"), level=2)
+def is_verbose(level=3):
+    # To avoid building the verbose messages that won't be displayed
+    return config.get_config().verbose_level >= level
+
+
+def warning(content, level=2):
+    verbose(f"WARNING: {content}", level=level, color="yellow")
 
 
 def success(content):
-    verbose(colored(f"SUCCESS: {content}", "green"), level=3)
+    verbose(f"SUCCESS: {content}", level=3, color="green")
+
+
+def colored(text, color=None):
+    # termcolor is only imported when a text is displayed
+    from termcolor import colored as termcolor_colored
+    return termcolor_colored(text, color)
 
 
 def decode(string):
@@ -1,8 +1,15 @@
+import os
+import re
+
 from setuptools import setup
 
+# The version is written in the package only, see factorio_blueprint_analyser/__init__.py
+with open(os.path.join(os.path.dirname(__file__), "factorio_blueprint_analyser", "__init__.py")) as f:
+    version = re.search(r'^__version__ = "(.*)"$', f.read(), re.M).group(1)
+
 setup(
     name='factorioBlueprintAnalyser',
-    version='1.3.5',
+    version=version,
     description="A python library analyse Factorio Blueprints and find bottlenecks.",
     url="https://github.com/tomansion/factorio_blueprint_analyser_app/",
     author="Tom Mansion",
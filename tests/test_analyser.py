@@ -0,0 +1,44 @@
+import json
+from os import listdir
+from concurrent.futures import ThreadPoolExecutor
+
+from factorio_blueprint_analyser import analyser, blueprint_analyser
+
+# -----------------------------------------------------------
+# Check that several analysers can be used at the same time
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+
+def test_concurrent_analysers():
+    analysers = [
+        analyser.Analyser({"verboseLevel": 0, "displayNetwork": False}),
+        analyser.Analyser({"verboseLevel": 0, "displayNetwork": False,
+                           "inserterCapacityBonus": 7}),
+    ]
+
+    # The analysers share the same immutable data
+    assert analysers[0].data is analysers[1].data
+
+    def analyse(analyser_index, blueprint_name):
+        return json.dumps(analysers[analyser_index].analyse_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}"))
+
+    tasks = [(i, blueprint_name) for blueprint_name in blueprints for i in range(2)]
+    expected = [analyse(i, blueprint_name) for (i, blueprint_name) in tasks]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda task: analyse(*task), tasks))
+
+    assert results == expected
+
+    # The inserter capacity bonus changes the results
+    assert expected[0::2] != expected[1::2]
+
+    # The default analyser is not changed by the other analysers
+    blueprint_analyser.init({"verboseLevel": 0, "displayNetwork": False})
+    for (i, blueprint_name) in enumerate(blueprints):
+        assert json.dumps(blueprint_analyser.analyse_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}")) == expected[2 * i]
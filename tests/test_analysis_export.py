@@ -0,0 +1,151 @@
+import json
+from os import listdir
+
+from factorio_blueprint_analyser import blueprint_analyser, blueprint, network
+
+# -----------------------------------------------------------
+# Check that the analysis export gives exactly the same result
+# as the first exporter, kept below as a reference
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = listdir(blueprints_path)
+
+blueprint_analyser.init(
+    config_dict={"verboseLevel": 0, "displayNetwork": False})
+
+
+def reference_get_analysis(bp):
+    # Linear search exporter, from Blueprint.get_analysis
+    analysed_bp = bp.blueprint.copy()
+
+    # Pre load network input and output
+    root_entities_number = [
+        node.entity.number for node in bp.network.root_nodes()]
+    leaf_entities_number = [
+        node.entity.number for node in bp.network.leaf_nodes()]
+
+    entities_bottleneck = []
+
+    # Entities related information
+    for entity in analysed_bp["blueprint"]["entities"]:
+        node = bp.network.get_node(entity["entity_number"])
+
+        if node is None:
+            continue
+
+        # Adding usage_rate
+        usage_rate = node.usage_ratio
+        if usage_rate is not None:
+            entity["usage_rate"] = usage_rate
+
+            # If the node as been "compacted" with other entities
+            # due to optimization, we need to update the oser entites
+            for compacted_node in node.get_compacted_nodes():
+                compacted_entity = get_entity(
+                    compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
+                compacted_entity["usage_rate"] = usage_rate
+
+                # Adding bottleneck entities number
+                if usage_rate >= 1:
+                    entities_bottleneck.append(
+                        compacted_entity["entity_number"])
+
+            # Adding bottleneck entities number
+            if usage_rate >= 1:
+                entities_bottleneck.append(entity["entity_number"])
+
+        # Adding input/output
+        if node.entity.number in root_entities_number:
+            entity["input"] = True
+
+            for compacted_node in node.get_compacted_nodes():
+                compacted_entity = get_entity(
+                    compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
+                compacted_entity["input"] = True
+
+        if node.entity.number in leaf_entities_number:
+            entity["output"] = True
+
+            for compacted_node in node.get_compacted_nodes():
+                compacted_entity = get_entity(
+                    compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
+                compacted_entity["output"] = True
+
+        # Adding transpoted_items
+        entity["transpoted_items"] = node.flow.items
+        for compacted_node in node.get_compacted_nodes():
+            compacted_entity = get_entity(
+                compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
+            compacted_entity["transpoted_items"] = node.flow.items
+
+        # Adding parents and childrens
+        entity["parents"] = node.original_parents
+        entity["children"] = node.original_childs
+
+        for compacted_node in node.get_compacted_nodes():
+            compacted_entity = get_entity(
+                compacted_node.entity.number, analysed_bp["blueprint"]["entities"])
+
+            compacted_entity["parents"] = compacted_node.original_parents
+            compacted_entity["children"] = compacted_node.original_childs
+
+    # Blueprint related information
+    # Adding the total in and out flow
+    items_input = {}
+    for root_node in bp.network.root_nodes():
+        items = root_node.flow.items
+        for item in items:
+            if item in items_input:
+                items_input[item] += items[item]
+            else:
+                items_input[item] = items[item]
+
+    items_output = {}
+    for leaf_node in bp.network.leaf_nodes():
+        items = leaf_node.flow.items
+        for item in items:
+            if item in items_output:
+                items_output[item] += items[item]
+            else:
+                items_output[item] = items[item]
+
+    analysed_bp["blueprint"]["items_input"] = items_input
+    analysed_bp["blueprint"]["items_output"] = items_output
+
+    # Adding the entities input and output
+    analysed_bp["blueprint"]["entities_input"] = root_entities_number
+    analysed_bp["blueprint"]["entities_output"] = leaf_entities_number
+
+    # Adding the entities bottleneck
+    analysed_bp["blueprint"]["entities_bottleneck"] = entities_bottleneck
+
+    return analysed_bp
+
+
+def get_entity(entity_number, entites):
+    for entity in entites:
+        if entity["entity_number"] == entity_number:
+            return entity
+
+    return {}
+
+
+def analyse(blueprint_path, exporter):
+    # The export modifies the blueprint entities,
+    # so each exporter works on its own blueprint
+    bp = blueprint.load_blueprint_from_path(blueprint_path)
+    nw = network.create_network(bp)
+    nw.calculate_bottleneck()
+
+    return json.dumps(exporter(bp), indent=4)
+
+
+def test_export_identical_to_reference():
+    for blueprint_name in blueprints:
+        blueprint_path = f"{blueprints_path}/{blueprint_name}"
+
+        exported = analyse(blueprint_path, lambda bp: bp.get_analysis())
+        reference = analyse(blueprint_path, reference_get_analysis)
+
+        assert exported == reference, f"Different export for {blueprint_name}"
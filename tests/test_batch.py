@@ -0,0 +1,66 @@
+import json
+
+from factorio_blueprint_analyser import blueprint_analyser, batch, utils
+
+# -----------------------------------------------------------
+# Check the batch analysis and its resume
+# -----------------------------------------------------------
+
+blueprints_glob = "tests/blueprints/belt*"
+
+blueprint_analyser.init(
+    config_dict={"verboseLevel": 0, "displayNetwork": False})
+
+
+def read_results(output_path):
+    with open(output_path, "r") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_batch_resume(tmp_path):
+    output_path = str(tmp_path / "results.jsonl")
+    ids = [item_id for (item_id, _, _) in batch.iter_inputs(blueprints_glob)]
+
+    summary = batch.analyse_batch(blueprints_glob, output_path, processes=2)
+    assert summary["analysed"] == len(ids)
+    results = read_results(output_path)
+    assert sorted(result["id"] for result in results) == sorted(ids)
+
+    # Interrupt the batch in the middle of a line
+    with open(output_path, "r") as f:
+        lines = f.readlines()
+    with open(output_path, "w") as f:
+        f.writelines(lines[:3])
+        f.write(lines[3][:20])
+
+    summary = batch.analyse_batch(blueprints_glob, output_path, processes=1)
+    assert summary["total"] == len(ids)
+    assert summary["skipped"] == 3
+    assert summary["analysed"] == len(ids) - 3
+
+    resumed_results = read_results(output_path)
+    assert sorted(result["id"] for result in resumed_results) == sorted(ids)
+
+    for result in resumed_results:
+        expected = blueprint_analyser.analyse_blueprint_from_path(result["id"])
+        assert result["analysis"] == json.loads(json.dumps(expected))
+
+
+def test_batch_strings_file(tmp_path):
+    corpus_path = str(tmp_path / "corpus.txt")
+    output_path = str(tmp_path / "results.jsonl")
+
+    blueprint_string = utils.encode(
+        json.load(open("tests/blueprints/belt.json")))
+    with open(corpus_path, "w") as f:
+        f.write(f"{blueprint_string}\n\nnot a blueprint\n{blueprint_string}\n")
+
+    summary = batch.analyse_batch(corpus_path, output_path, processes=1)
+    assert summary["analysed"] == 3
+    assert summary["failed"] == 1
+
+    results = {result["id"]: result for result in read_results(output_path)}
+    assert results[f"{corpus_path}:1"]["error"] is None
+    assert results[f"{corpus_path}:3"]["analysis"] is None
+    assert results[f"{corpus_path}:4"]["analysis"] == \
+        results[f"{corpus_path}:1"]["analysis"]
@@ -0,0 +1,58 @@
+import json
+
+from factorio_blueprint_analyser import blueprint_analyser, blueprint, book
+
+# -----------------------------------------------------------
+# Check the blueprint book analysis
+# -----------------------------------------------------------
+
+book_path = "tests/blueprints/combatRobotBook"
+
+blueprint_analyser.init(
+    config_dict={"verboseLevel": 0, "displayNetwork": False})
+
+
+def get_nested_book():
+    # The book, with a copy of itself as a nested book
+    # and an invalid blueprint
+    book_json = blueprint.read_blueprint_from_path(book_path)
+    nested_book = blueprint.read_blueprint_from_path(book_path)
+    nested_book["index"] = 7
+
+    book_json["blueprint_book"]["blueprints"].append(nested_book)
+    book_json["blueprint_book"]["blueprints"].append(
+        {"index": 8, "blueprint": {"entities": [{"name": "unknown"}]}})
+
+    return book_json
+
+
+def test_list_blueprints():
+    paths = [path for (path, _) in book.list_blueprints(get_nested_book())]
+
+    # The upgrade planners are ignored
+    assert paths == [[0], [1], [7, 0], [7, 1], [8]]
+
+
+def test_analyse_book():
+    book_json = get_nested_book()
+    expected = {}
+    for (path, bp_json) in book.list_blueprints(get_nested_book()):
+        if path != [8]:
+            expected[tuple(path)] = json.dumps(
+                blueprint_analyser.analyse_blueprint_json(bp_json))
+
+    for processes in [1, 2]:
+        results = list(book.analyse_book(book_json, processes=processes))
+        assert len(results) == 5
+
+        for result in results:
+            assert result["time"] >= 0
+
+            if result["path"] == [8]:
+                # The error doesn't stop the other blueprints
+                assert result["analysis"] is None
+                assert result["error"] is not None
+            else:
+                assert result["error"] is None
+                assert json.dumps(result["analysis"]) == \
+                    expected[tuple(result["path"])]
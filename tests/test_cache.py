@@ -0,0 +1,73 @@
+import os
+import json
+
+from factorio_blueprint_analyser import analyser, blueprint_analyser, cache
+
+# -----------------------------------------------------------
+# Check the analysis results cache
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = ["belt.json", "arms.json", "beltFac3.txt"]
+
+
+def init(cache_dir, bonus=0, max_entries=100):
+    blueprint_analyser.init(config_dict={
+        "verboseLevel": 0,
+        "displayNetwork": False,
+        "inserterCapacityBonus": bonus,
+        "cacheDir": cache_dir,
+        "cacheMaxEntries": max_entries
+    })
+
+
+def analyse_all():
+    return [json.dumps(blueprint_analyser.analyse_blueprint_from_path(
+        f"{blueprints_path}/{blueprint_name}")) for blueprint_name in blueprints]
+
+
+def test_cache(tmp_path):
+    init("")
+    expected = analyse_all()
+    assert blueprint_analyser.get_cache_stats() is None
+
+    init(str(tmp_path))
+    assert analyse_all() == expected
+    assert analyse_all() == expected
+    assert blueprint_analyser.get_cache_stats() == \
+        {"hits": 3, "misses": 3, "evictions": 0}
+
+    # Another config doesn't use the same results
+    init(str(tmp_path), bonus=3)
+    analyse_all()
+    assert blueprint_analyser.get_cache_stats()["misses"] == 3
+    assert len(os.listdir(tmp_path)) == 6
+
+    # Back to the config used by the other tests
+    init("")
+
+
+def test_metadata_not_cached(tmp_path):
+    # The calculation times of the metadata change at each analysis
+    metadata_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False,
+                                           "cacheDir": str(tmp_path), "analysisMetadata": True})
+    for _ in range(2):
+        analysis = metadata_analyser.analyse_blueprint_from_path(f"{blueprints_path}/beltFac3.txt")
+        assert "components" in analysis["blueprint"]["metadata"]
+
+    assert metadata_analyser.get_cache_stats()["hits"] == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_eviction(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path), 10 ** 6, 2)
+
+    for i in range(3):
+        result_cache.set(f"key{i}", {"i": i})
+        # Use the first result, the second one is the least recently used
+        os.utime(result_cache.get_path(f"key{i}"), (i, i))
+        assert result_cache.get("key0") is not None
+
+    assert result_cache.get("key1") is None
+    assert result_cache.get("key2") == {"i": 2}
+    assert result_cache.evictions == 1
@@ -0,0 +1,115 @@
+from os import listdir
+
+import pytest
+
+from factorio_blueprint_analyser import analyser, blueprint, network
+
+# -----------------------------------------------------------
+# Check the compaction of the belt segments
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+
+test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+
+def create_segment_blueprint(tiers):
+    # Belts going to the right, an underground belt and a few more belts
+    # The belts tier changes in the middle of the first belts
+    entities = []
+
+    def add(name, x, **properties):
+        entities.append(dict({
+            "entity_number": len(entities) + 1,
+            "name": name,
+            "position": {"x": x + 0.5, "y": 0.5},
+            "direction": 2
+        }, **properties))
+
+    for x in range(10):
+        add(tiers[x // 5] + "transport-belt", x)
+
+    add(tiers[1] + "underground-belt", 10, type="input")
+    add(tiers[1] + "underground-belt", 13, type="output")
+
+    for x in range(14, 17):
+        add(tiers[1] + "transport-belt", x)
+
+    return {"blueprint": {"entities": entities, "item": "blueprint", "label": "segment"}}
+
+
+def test_segment_compaction():
+    with test_analyser.activate():
+        bp_json = create_segment_blueprint(["", ""])
+        bp = blueprint.Blueprint(bp_json)
+        nw = network.create_network(bp)
+
+        # The chain is a single node, but its last belts
+        # stay the leaf of the network
+        assert len(nw.nodes) == 2
+        segment = nw.get_node(1)
+        leaf = nw.get_node(13)
+        assert nw.leaf_nodes() == [leaf]
+        assert len(segment.get_compacted_nodes()) == 11
+        assert len(leaf.get_compacted_nodes()) == 2
+
+        # Each belt entity is found in its segment
+        for entity in bp_json["blueprint"]["entities"]:
+            expected = segment if entity["entity_number"] < 13 else leaf
+            assert nw.get_segment_node(entity["entity_number"]) is expected
+        assert all(nw.compaction.is_compacted(node)
+                   for node in segment.get_compacted_nodes())
+        assert "[⧈ 11]" in str(segment)
+
+
+def test_tier_change():
+    with test_analyser.activate():
+        bp = blueprint.Blueprint(create_segment_blueprint(["", "fast-"]))
+        nw = network.create_network(bp)
+
+        # The tier change ends the segment,
+        # each segment is as fast as its belts
+        assert len(nw.nodes) == 3
+        for segment in nw.nodes:
+            assert all(node.entity.speed == segment.speed
+                       for node in segment.get_compacted_nodes())
+
+
+def analyse(blueprint_path, network_class):
+    bp = blueprint.load_blueprint_from_path(blueprint_path)
+    creator = network.NetworkCreator(bp)
+    bp.network = network_class(bp, creator.create_nodes(), creator.requests)
+    bp.network.calculate_bottleneck()
+
+    return (bp.network, bp.get_analysis()["blueprint"])
+
+
+class UncompactedNetwork(network.Network):
+    # Network optimized without the belt segments compaction
+    def compact_segments(self):
+        pass
+
+
+def test_compaction_keeps_analysis():
+    # The segments don't change the analysis of the test blueprints
+    nb_removed_nodes = 0
+
+    with test_analyser.activate():
+        for blueprint_name in listdir(blueprints_path):
+            blueprint_path = f"{blueprints_path}/{blueprint_name}"
+            (nw, analysis) = analyse(blueprint_path, network.Network)
+            (_, reference) = analyse(blueprint_path, UncompactedNetwork)
+            nb_removed_nodes += nw.compaction.nb_removed_nodes()
+
+            assert analysis["entities_output"] == reference["entities_output"], blueprint_name
+            assert analysis["items_output"] == pytest.approx(reference["items_output"]), \
+                blueprint_name
+            assert sorted(analysis["entities_bottleneck"], key=str) == \
+                sorted(reference["entities_bottleneck"], key=str), blueprint_name
+
+            for (entity, reference_entity) in zip(analysis["entities"], reference["entities"]):
+                assert entity.get("usage_rate") == pytest.approx(reference_entity.get("usage_rate")), \
+                    f"{blueprint_name}, entity {entity['entity_number']}"
+
+    # The belt segments are compacted
+    assert nb_removed_nodes > 0
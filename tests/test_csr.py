@@ -0,0 +1,75 @@
+import json
+from os import listdir
+
+from factorio_blueprint_analyser import analyser, blueprint, network, csr, solver
+
+# -----------------------------------------------------------
+# Check the index of the networks
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+
+def test_csr_network():
+    test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+    with test_analyser.activate():
+        for blueprint_name in blueprints:
+            bp = blueprint.Blueprint(blueprint.read_blueprint_from_path(
+                f"{blueprints_path}/{blueprint_name}"))
+            nw = network.create_network(bp)
+            graph = nw.csr()
+
+            assert graph.nb_nodes == len(nw.nodes)
+            node_indexes = {id(node): i for (i, node) in enumerate(nw.nodes)}
+
+            for (i, node) in enumerate(nw.nodes):
+                assert list(graph.childs(i)) == [node_indexes[id(child)] for child in node.childs]
+                assert list(graph.parents(i)) == [node_indexes[id(parent)] for parent in node.parents]
+                assert graph.get_type(i) == node.type
+                assert graph.get_entity_number(i) == node.entity.number
+                assert graph.get_capacity(i) == node.speed
+
+                recipe = getattr(node.entity, "recipe", None)
+                assert graph.get_recipe_name(i) == (recipe.name if recipe is not None else None)
+
+            assert [nw.nodes[i] for i in graph.root_indexes()] == nw.root_nodes()
+            assert [nw.nodes[i] for i in graph.leaf_indexes()] == nw.leaf_nodes()
+
+            # Each node is in one group of linked nodes
+            assert sorted(i for component in graph.components() for i in component) == \
+                list(range(graph.nb_nodes))
+
+
+def test_index_analysis():
+    # The linear programming solver and the export only need the index,
+    # the analysis is the same without the network nodes
+    lp_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "lp"})
+
+    with lp_analyser.activate():
+        for blueprint_name in blueprints:
+            blueprint_path = f"{blueprints_path}/{blueprint_name}"
+
+            bp = blueprint.load_blueprint_from_path(blueprint_path)
+            network.create_network(bp).calculate_bottleneck()
+            expected = json.dumps(bp.get_analysis())
+
+            bp = blueprint.load_blueprint_from_path(blueprint_path)
+            nw = network.create_network(bp)
+            nw.calculate_purposes()
+            graph = csr.CSRNetwork(nw)
+            graph.load_items(nw.nodes)
+            blueprint_json = bp.blueprint
+            del bp, nw
+
+            flows = {}
+            for component in graph.components():
+                component_program = solver.create_component_program(graph, component)
+                flows.update(solver.get_flows(graph, component_program,
+                                              component_program.program.solve()))
+            graph.set_flows(flows)
+
+            assert json.dumps(blueprint.get_index_analysis(graph, blueprint_json)) == expected, \
+                blueprint_name
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import threading
+
+from factorio_blueprint_analyser import blueprint_analyser, daemon
+
+# -----------------------------------------------------------
+# Check the analysis daemon and its client
+# -----------------------------------------------------------
+
+blueprint_path = "tests/blueprints/beltFac3.txt"
+
+blueprint_analyser.init(
+    config_dict={"verboseLevel": 0, "displayNetwork": False})
+
+
+def start_server(socket_path, pool, max_pending, request_timeout=30):
+    server = daemon.AnalysisServer(socket_path, pool, max_pending, request_timeout)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_daemon(tmp_path):
+    socket_path = str(tmp_path / "analyser.sock")
+    busy_socket_path = str(tmp_path / "busy.sock")
+
+    with open(blueprint_path, "r") as f:
+        blueprint_string = f.read()
+    expected = json.dumps(blueprint_analyser.analyse_blueprint(blueprint_string))
+
+    with blueprint_analyser.create_pool(1) as pool:
+        server = start_server(socket_path, pool, 2)
+        busy_server = start_server(busy_socket_path, pool, 0)
+
+        try:
+            for _ in range(2):
+                analysis = daemon.analyse_remote(socket_path, blueprint_string, timeout=30)
+                assert json.dumps(analysis) == expected
+
+            response = daemon.request_remote(socket_path, "not a blueprint", timeout=30)
+            assert response["analysis"] is None
+            assert response["error"] is not None
+
+            # No request can be analysed, the request is refused
+            response = daemon.request_remote(busy_socket_path, blueprint_string, timeout=30)
+            assert "busy" in response["error"]
+        finally:
+            for s in [server, busy_server]:
+                s.shutdown()
+                s.server_close()
+
+    # The daemon can be started again on the same socket
+    daemon._remove_stale_socket(socket_path)
+    assert not os.path.exists(socket_path)
+
+
+def test_timeout(tmp_path):
+    socket_path = str(tmp_path / "analyser.sock")
+
+    with open(blueprint_path, "r") as f:
+        blueprint_string = f.read()
+
+    with blueprint_analyser.create_pool(1) as pool:
+        server = start_server(socket_path, pool, 1, request_timeout=0.2)
+
+        try:
+            # The worker is busy, the analysis is answered with a timeout error
+            pool.submit(time.sleep, 2)
+            response = daemon.request_remote(socket_path, blueprint_string, timeout=30)
+            assert "took more than" in response["error"]
+
+            # The analysis still runs in the worker, it is still pending
+            response = daemon.request_remote(socket_path, blueprint_string, timeout=30)
+            assert "busy" in response["error"]
+
+            # Once the analysis is over, the requests are accepted again
+            deadline = time.time() + 30
+            while "busy" in (response["error"] or "") and time.time() < deadline:
+                time.sleep(0.1)
+                response = daemon.request_remote(socket_path, blueprint_string, timeout=30)
+            assert response["error"] is None
+        finally:
+            server.shutdown()
+            server.server_close()
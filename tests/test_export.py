@@ -0,0 +1,40 @@
+import io
+import json
+from os import listdir
+
+from factorio_blueprint_analyser import blueprint_analyser, export
+
+# -----------------------------------------------------------
+# Check the streamed outputs against the json module
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = listdir(blueprints_path)
+
+blueprint_analyser.init(
+    config_dict={"verboseLevel": 0, "displayNetwork": False})
+
+
+def write(analysis, output_format):
+    output = io.StringIO()
+    export.write_analysis(analysis, output, output_format)
+    return output.getvalue()
+
+
+def test_streamed_outputs():
+    for blueprint_name in blueprints:
+        analysis = blueprint_analyser.analyse_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}")
+
+        assert write(analysis, "json") == json.dumps(analysis, indent=4)
+
+        assert write(analysis, "compact") == \
+            json.dumps(analysis, separators=(",", ":"))
+
+        # One line for the blueprint, then one line per entity
+        lines = write(analysis, "jsonl").splitlines()
+        entities = analysis["blueprint"]["entities"]
+        assert len(lines) == len(entities) + 1
+        assert "entities" not in json.loads(lines[0])["blueprint"]
+        assert [json.loads(line) for line in lines[1:]] == \
+            json.loads(json.dumps(entities))
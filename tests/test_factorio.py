@@ -0,0 +1,93 @@
+import os
+import json
+import hashlib
+
+from factorio_blueprint_analyser import analyser, config, factorio
+
+# -----------------------------------------------------------
+# Check the Factorio data snapshots
+# -----------------------------------------------------------
+
+
+def write_data(path, item_name):
+    # A copy of the Factorio data with one more item,
+    # so each test data file has its own digest
+    with open(config.Config.data_file_path) as f:
+        data = json.load(f)
+    data[factorio.items_key][item_name] = {"name": item_name, "type": "item"}
+
+    data_path = os.path.join(path, f"{item_name}.json")
+    with open(data_path, "w") as f:
+        json.dump(data, f)
+    return data_path
+
+
+def load(data_path, snapshot_dir):
+    return analyser.Analyser({"verboseLevel": 0, "displayNetwork": False,
+                              "dataFilePath": data_path, "snapshotDir": snapshot_dir}).data
+
+
+def snapshots(snapshot_dir):
+    return sorted(name for name in os.listdir(snapshot_dir) if name.endswith(".marshal"))
+
+
+def test_snapshot_rebuilt(tmp_path):
+    snapshot_dir = str(tmp_path / "snapshots")
+    data_path = write_data(str(tmp_path), "snapshot-test-item")
+
+    data = load(data_path, snapshot_dir)
+    assert "snapshot-test-item" in data.items
+    assert len(snapshots(snapshot_dir)) == 1
+    assert factorio.load_snapshot(data.digest, snapshot_dir)[factorio.items_key] == data.items
+
+    # A new snapshot is saved for the changed data file
+    with open(data_path) as f:
+        changed_data = json.load(f)
+    changed_data[factorio.items_key]["snapshot-changed-item"] = {"name": "snapshot-changed-item"}
+    with open(data_path, "w") as f:
+        json.dump(changed_data, f)
+
+    data = load(data_path, snapshot_dir)
+    assert "snapshot-changed-item" in data.items
+    assert len(snapshots(snapshot_dir)) == 2
+    assert "snapshot-changed-item" in factorio.load_snapshot(data.digest, snapshot_dir)[factorio.items_key]
+
+
+def test_invalid_snapshot(tmp_path):
+    snapshot_dir = str(tmp_path)
+    data_path = write_data(str(tmp_path), "snapshot-invalid-item")
+    with open(data_path, "rb") as f:
+        raw_data = f.read()
+    digest = hashlib.sha256(raw_data).hexdigest()
+    snapshot_path = factorio.get_snapshot_path(digest, snapshot_dir)
+
+    factorio.save_snapshot(digest, snapshot_dir, factorio.parse_data(raw_data))
+    assert factorio.load_snapshot(digest, snapshot_dir) is not None
+
+    # A truncated snapshot, then a corrupted one, are ignored
+    with open(snapshot_path, "rb") as f:
+        snapshot = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(snapshot[:len(snapshot) // 2])
+    assert factorio.load_snapshot(digest, snapshot_dir) is None
+
+    with open(snapshot_path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert factorio.load_snapshot(digest, snapshot_dir) is None
+
+    # The data is read from the JSON file, and the snapshot saved again
+    data = load(data_path, snapshot_dir)
+    assert "snapshot-invalid-item" in data.items
+    assert factorio.load_snapshot(digest, snapshot_dir)[factorio.items_key] == data.items
+
+
+def test_snapshot_disabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_path = write_data(str(tmp_path), "snapshot-disabled-item")
+
+    assert config.Config({"snapshotDir": ""}).snapshot_dir == ""
+    assert factorio.get_snapshot_path("digest", "") is None
+
+    data = load(data_path, "")
+    assert "snapshot-disabled-item" in data.items
+    assert os.listdir(tmp_path) == ["snapshot-disabled-item.json"]
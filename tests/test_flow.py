@@ -0,0 +1,40 @@
+from factorio_blueprint_analyser import item
+
+# -----------------------------------------------------------
+# Check the items flow accounting
+# -----------------------------------------------------------
+
+
+def test_flow():
+    flow = item.Flow()
+    assert flow.total_amount == 0
+    assert flow.items == {}
+
+    flow.add_item("iron-plate", 1.5)
+    flow.add_item("copper-plate", 0.5)
+    flow.add_item("iron-plate", 1)
+    assert flow.items == {"iron-plate": 2.5, "copper-plate": 0.5}
+    assert flow.total_amount == 3
+
+    # An item without flow is removed, it is added again at the end
+    flow.reduce("iron-plate", 2.5)
+    assert flow.items == {"copper-plate": 0.5}
+    flow.add_item("iron-plate", 0.25)
+    assert list(flow.items) == ["copper-plate", "iron-plate"]
+    assert flow.total_amount == 0.75
+    assert flow.get_amount("iron-plate") == 0.25
+    assert flow.get_amount("iron-gear-wheel") is None
+    assert flow.get_items() == [("copper-plate", 0.5), ("iron-plate", 0.25)]
+
+    # The ids are shared by all the flows
+    total = item.Flow()
+    total.add_flow(flow)
+    total.add_flow(flow)
+    assert total.items == {"copper-plate": 1, "iron-plate": 0.5}
+    assert item.item_names[item.item_ids["iron-plate"]] == "iron-plate"
+
+    # Taking back more than an item amount only removes that amount from the total
+    flow.reduce("iron-plate", 1)
+    assert flow.total_amount == 0.5
+    flow.reduce("copper-plate", 0.5)
+    assert flow.total_amount == 0
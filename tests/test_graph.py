@@ -0,0 +1,174 @@
+from os import listdir
+
+import pytest
+
+from factorio_blueprint_analyser import analyser, blueprint, network, graph
+
+# -----------------------------------------------------------
+# Check the condensation of the network loops
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+
+def create_network(blueprint_name):
+    bp = blueprint.Blueprint(blueprint.read_blueprint_from_path(
+        f"{blueprints_path}/{blueprint_name}"))
+    return network.create_network(bp)
+
+
+def test_topological_order():
+    with test_analyser.activate():
+        for blueprint_name in blueprints:
+            nw = create_network(blueprint_name)
+            condensation = nw.condensation()
+
+            # Each node is in one component
+            assert sorted(id(node) for component in condensation.components
+                          for node in component) == sorted(id(node) for node in nw.nodes)
+
+            # The childs are never before their parents
+            for node in nw.nodes:
+                i = condensation.get_component_index(node)
+                for child in node.childs:
+                    j = condensation.get_component_index(child)
+                    assert j > i or (j == i and condensation.cyclic[i]), blueprint_name
+
+
+def test_belt_loop():
+    # A belt loop with an input chest and an assembling machine
+    # taking its ingredients from the loop
+    with test_analyser.activate():
+        nw = create_network("belt_loop.json")
+        nw.calculate_bottleneck()
+
+        loops = [component for (i, component) in enumerate(nw.condensation().components)
+                 if nw.condensation().cyclic[i]]
+        assert len(loops) == 1
+
+        # All the loop nodes transport the items entering the loop
+        for node in loops[0]:
+            assert [item.name for item in node.transported_items] == ["iron-plate"]
+            assert nw.condensation().capacity(
+                nw.condensation().get_component_index(node)) == node.speed
+
+        output = sum(node.flow.total_amount for node in nw.leaf_nodes())
+        assert output > 0
+
+        # The items entering the loop are limited by the loop capacity
+        assert len(nw.loop_flows) == 1
+        for (loop_index, loop_flow) in nw.loop_flows.items():
+            assert 0 < loop_flow <= nw.condensation().capacity(loop_index)
+
+        # No node is left waiting for flow
+        assert not any(node.asking_flow or node.taking_back_flow for node in nw.nodes)
+
+
+def test_loop_capacity():
+    # A loop with a belt slower than the inserter feeding it:
+    # the items entering the loop are limited by the slow belt
+    with test_analyser.activate():
+        nw = create_network("belt_loop.json")
+        nw.calculate_purposes()
+
+        condensation = nw.condensation()
+        loop_nodes = [node for node in nw.nodes if condensation.is_cyclic(node)]
+        entry_node = next(node for node in loop_nodes
+                          if any(node.get_entered_loop(parent) is not None for parent in node.parents))
+        loop_index = condensation.get_component_index(entry_node)
+
+        slow_node = next(node for node in loop_nodes if node is not entry_node)
+        slow_node.speed = 0.5
+        assert condensation.capacity(loop_index) == 0.5
+        assert nw.get_loop_capacity_left(loop_index) == 0.5
+
+        # The inserter could give more, only the loop capacity enters the loop
+        assert entry_node.ask_flow("iron-plate", 10) == 0.5
+        assert nw.loop_flows[loop_index] == 0.5
+        assert nw.get_loop_capacity_left(loop_index) == 0
+        assert entry_node.ask_flow("iron-plate", 10) == 0
+
+        # The flow taken back leaves the loop, its capacity can be used again
+        assert entry_node.take_back_flow("iron-plate", 0.2) == 0.2
+        assert nw.get_loop_capacity_left(loop_index) == pytest.approx(0.2)
+        assert entry_node.take_back_flow("iron-plate", 10) == pytest.approx(0.3)
+        assert nw.get_loop_capacity_left(loop_index) == pytest.approx(0.5)
+        assert entry_node.ask_flow("iron-plate", 10) == pytest.approx(0.5)
+
+
+def test_long_assembly_line():
+    # The flow requests go through the whole belts, one node
+    # per belt, without reaching the Python recursion limit
+    #   belt         ========
+    #   inserters     ^  ^  ^
+    #   assemblers   [ ][ ][ ]
+    #   inserters     ^  ^  ^
+    #   belt         ========
+    entities = []
+    for x in range(1800):
+        entities.append({"name": "transport-belt", "position": {"x": x + 0.5, "y": 0.5}, "direction": 2})
+        entities.append({"name": "transport-belt", "position": {"x": x + 0.5, "y": 6.5}, "direction": 2})
+    for i in range(600):
+        entities.append({"name": "inserter", "position": {"x": i * 3 + 1.5, "y": 1.5}})
+        entities.append({"name": "assembling-machine-2", "position": {"x": i * 3 + 1.5, "y": 3.5},
+                         "recipe": "electronic-circuit"})
+        entities.append({"name": "inserter", "position": {"x": i * 3 + 1.5, "y": 5.5}})
+    for (i, entity) in enumerate(entities):
+        entity["entity_number"] = i + 1
+
+    analysis = test_analyser.analyse_blueprint_json({"blueprint": {"entities": entities}})
+    assert list(analysis["blueprint"]["items_output"]) == ["electronic-circuit"]
+
+
+def test_walk():
+    with test_analyser.activate():
+        nw = create_network("belt_loop.json")
+
+    # The loop is walked once
+    for node in nw.nodes:
+        walked = list(graph.walk(node, "childs", lambda node: True))
+        assert len(walked) == len(set(id(node) for node in walked))
+
+
+def test_materials_output_invalidation():
+    with test_analyser.activate():
+        nw = create_network("belt_loop.json")
+        loop = [component for (i, component) in enumerate(nw.condensation().components)
+                if nw.condensation().cyclic[i]][0]
+
+        # Without purpose, nothing enters the loop
+        assert loop[0].get_materials_output() == []
+        assert loop[0].connected_to_input()
+
+        # The purposes changed, the loop output is calculated again
+        nw.estimate_purposes()
+        assert [item.name for item in loop[0].get_materials_output()] == ["iron-plate"]
+
+
+def test_materials_output_local_invalidation():
+    # A purpose change only removes the outputs calculated from the node output
+    with test_analyser.activate():
+        nw = create_network("belt_loop.json")
+        condensation = nw.condensation()
+        loop_index = [i for i in range(len(condensation.components)) if condensation.cyclic[i]][0]
+        assembler = [node for node in nw.nodes if node.node_type == "assembly_node"][0]
+
+        for node in nw.nodes:
+            node.get_materials_output()
+        # The nodes after the assembling machine output its recipe result
+        kept = [node for node in nw.nodes if condensation.get_component_index(node) >
+                condensation.get_component_index(assembler) and id(node) in nw.materials_outputs()]
+        assert len(kept) > 0
+
+        # The loop nodes output the items of the input
+        nw.root_nodes()[0].add_transported_item(list(assembler.entity.recipe.ingredients))
+        for node in condensation.components[loop_index]:
+            assert id(node) not in nw.materials_outputs()
+        for node in kept:
+            assert id(node) in nw.materials_outputs()
+
+        assert [item.name for item in condensation.components[loop_index][0].get_materials_output()] \
+            == ["iron-plate"]
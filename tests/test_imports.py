@@ -0,0 +1,24 @@
+import sys
+import subprocess
+
+# -----------------------------------------------------------
+# Check that the optional dependencies are only imported when needed
+# -----------------------------------------------------------
+
+optional_modules = ["pyvis", "termcolor", "yaml"]
+
+
+def test_lazy_imports():
+    code = "\n".join([
+        "import sys",
+        "from factorio_blueprint_analyser import blueprint_analyser",
+        "blueprint_analyser.init({'verboseLevel': 0, 'displayNetwork': False})",
+        "blueprint_analyser.analyse_blueprint_from_path('tests/blueprints/beltFac3.txt')",
+        "print(' '.join(sorted(set(name.split('.')[0] for name in sys.modules))))",
+    ])
+    result = subprocess.run([sys.executable, "-c", code],
+                            check=True, capture_output=True, text=True)
+
+    imported = result.stdout.split()
+    for module in optional_modules:
+        assert module not in imported
@@ -0,0 +1,80 @@
+import random
+from os import listdir
+
+from factorio_blueprint_analyser import analyser, blueprint
+
+# -----------------------------------------------------------
+# Check that the incremental analysis gives the same result
+# as a full analysis after random edits of the test blueprints
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+added_entities = ["transport-belt", "fast-transport-belt", "inserter",
+                  "long-handed-inserter", "iron-chest", "splitter"]
+recipes = ["iron-gear-wheel", "copper-cable", "electronic-circuit", None]
+directions = [0, 2, 4, 6]
+
+
+def random_edit(incremental_analysis, rng):
+    entities = incremental_analysis.get_entities()
+    edit = rng.choice(["add", "remove", "rotate", "recipe"])
+
+    if edit == "add" or len(entities) == 0:
+        position = {"x": 0.5, "y": 0.5}
+        if len(entities) > 0:
+            position = rng.choice(entities)["position"]
+
+        incremental_analysis.add_entity({
+            "name": rng.choice(added_entities),
+            "position": {"x": position["x"] + rng.randint(-2, 2),
+                         "y": position["y"] + rng.randint(-2, 2)},
+            "direction": rng.choice(directions)
+        })
+        return
+
+    entity_number = rng.choice(entities)["entity_number"]
+    if edit == "remove":
+        incremental_analysis.remove_entity(entity_number)
+    elif edit == "rotate":
+        incremental_analysis.rotate_entity(entity_number, rng.choice(directions))
+    else:
+        incremental_analysis.set_recipe(entity_number, rng.choice(recipes))
+
+
+def test_random_edits():
+    for seed in [11, 42, 1234]:
+        rng = random.Random(seed)
+
+        for blueprint_name in blueprints:
+            incremental_analysis = test_analyser.create_incremental_analysis(
+                blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}"))
+
+            for step in range(25):
+                random_edit(incremental_analysis, rng)
+
+                expected = test_analyser.analyse_blueprint_json(
+                    incremental_analysis.get_blueprint_json())
+                assert incremental_analysis.get_analysis() == expected, \
+                    (seed, blueprint_name, step)
+
+
+def test_edit_is_local():
+    # Two separate belts, only the edited one is created again
+    entities = []
+    for y in [0, 10]:
+        for x in range(20):
+            entities.append({"entity_number": len(entities) + 1, "name": "transport-belt",
+                             "position": {"x": x + 0.5, "y": y + 0.5}, "direction": 2})
+
+    incremental_analysis = test_analyser.create_incremental_analysis(
+        {"blueprint": {"entities": entities, "item": "blueprint", "label": "belts"}})
+
+    incremental_analysis.rotate_entity(5, 4)
+    assert incremental_analysis.nb_updated_tiles == 20
+
+    expected = test_analyser.analyse_blueprint_json(incremental_analysis.get_blueprint_json())
+    assert incremental_analysis.get_analysis() == expected
@@ -0,0 +1,73 @@
+from os import listdir
+
+from factorio_blueprint_analyser import analyser, instrumentation
+
+# -----------------------------------------------------------
+# Check the instrumentation report and that the instrumented
+# analysis gives the same result as the analysis without it
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+test_config = {"verboseLevel": 0, "displayNetwork": False}
+test_analyser = analyser.Analyser(test_config)
+instrumented_analyser = analyser.Analyser(dict(test_config, instrumentation=True))
+
+
+def test_same_analysis():
+    for blueprint_name in blueprints:
+        expected = test_analyser.analyse_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+        assert "metadata" not in expected["blueprint"]
+
+        analysis = instrumented_analyser.analyse_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}")
+        metadata = analysis["blueprint"].pop("metadata")
+        assert analysis == expected, blueprint_name
+        assert list(metadata) == ["instrumentation"]
+
+
+def test_report():
+    analysis = instrumented_analyser.analyse_blueprint_from_path(
+        f"{blueprints_path}/beltFac3.txt")
+    report = analysis["blueprint"]["metadata"]["instrumentation"]
+
+    assert list(report["phases"]) == instrumentation.phases
+    assert report["total"] == sum(report["phases"].values())
+    assert list(report["counters"]) == instrumentation.counters
+
+    counters = report["counters"]
+    assert counters["ask_flow"] > 0
+    assert 0 < counters["max_flow_depth"] <= counters["ask_flow"] + counters["take_back_flow"]
+    assert counters["compacted_nodes"] > 0
+
+
+def test_long_flow_requests():
+    # Counting the flow requests doesn't add frames
+    # to the long flow request chains
+    entities = []
+    for x in range(1200):
+        entities.append({"name": "transport-belt", "position": {"x": x + 0.5, "y": 0.5}, "direction": 2})
+        entities.append({"name": "transport-belt", "position": {"x": x + 0.5, "y": 6.5}, "direction": 2})
+    for i in range(400):
+        entities.append({"name": "inserter", "position": {"x": i * 3 + 1.5, "y": 1.5}})
+        entities.append({"name": "assembling-machine-2", "position": {"x": i * 3 + 1.5, "y": 3.5},
+                         "recipe": "electronic-circuit"})
+        entities.append({"name": "inserter", "position": {"x": i * 3 + 1.5, "y": 5.5}})
+    for (i, entity) in enumerate(entities):
+        entity["entity_number"] = i + 1
+
+    analysis = instrumented_analyser.analyse_blueprint_json({"blueprint": {"entities": entities}})
+    counters = analysis["blueprint"]["metadata"]["instrumentation"]["counters"]
+    assert counters["max_flow_depth"] > 400
+    assert instrumentation.get_report() is None
+
+
+def test_disabled():
+    with instrumentation.record(False) as report:
+        assert report is None
+        with instrumentation.phase("decode"):
+            pass
+        instrumentation.set_counter("ask_flow", 1)
+
+    assert instrumentation.get_report() is None
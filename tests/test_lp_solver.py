@@ -0,0 +1,89 @@
+from os import listdir
+
+from factorio_blueprint_analyser import analyser, blueprint, network, lp
+
+# -----------------------------------------------------------
+# Check the linear programming bottleneck solver
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+
+def test_linear_program():
+    # Maximize x + y with x + 2y <= 4, 3x + y <= 6 and x - y = 0
+    program = lp.LinearProgram()
+    x = program.add_variable(1)
+    y = program.add_variable(1)
+    program.add_constraint({x: 1, y: 2}, "<=", 4)
+    program.add_constraint({x: 3, y: 1}, "<=", 6)
+    program.add_constraint({x: 1, y: -1}, "=", 0)
+
+    values = program.solve()
+    assert abs(values[x] - 4 / 3) < 1e-6
+    assert abs(values[y] - 4 / 3) < 1e-6
+
+
+def get_output(analyser_, blueprint_name):
+    # Returns the network and its leaf nodes output
+    with analyser_.activate():
+        bp = blueprint.Blueprint(blueprint.read_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}"))
+        nw = network.create_network(bp)
+        nw.calculate_bottleneck()
+
+    return (nw, sum(node.flow.total_amount for node in nw.leaf_nodes()))
+
+
+def test_lp_solver():
+    greedy_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "greedy"})
+    lp_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "lp"})
+
+    for blueprint_name in blueprints:
+        (_, greedy_output) = get_output(greedy_analyser, blueprint_name)
+        (nw, lp_output) = get_output(lp_analyser, blueprint_name)
+
+        # The optimal flow is at least as good as the greedy one
+        assert lp_output >= greedy_output - 1e-6, blueprint_name
+
+        # And respects the transport nodes speed
+        for node in nw.nodes:
+            if node.node_type == "transport_node" and node.speed is not None:
+                assert node.flow.total_amount <= node.speed + 1e-6, blueprint_name
+
+
+def test_parallel_lp_solver():
+    # Solving the groups of linked nodes in a pool gives the same analysis
+    lp_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "lp",
+         "analysisMetadata": True})
+    parallel_analyser = analyser.Analyser(
+        {"verboseLevel": 0, "displayNetwork": False, "bottleneckSolver": "lp",
+         "analysisMetadata": True, "solverProcesses": 2, "parallelMinNodes": 5})
+
+    pools = []
+    for blueprint_name in ["fur4", "starter_base", "underground_belts.json"]:
+        analysis = lp_analyser.analyse_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+        parallel_analysis = parallel_analyser.analyse_blueprint_from_path(
+            f"{blueprints_path}/{blueprint_name}")
+
+        components = analysis["blueprint"].pop("metadata")["components"]
+        parallel_components = parallel_analysis["blueprint"].pop("metadata")["components"]
+        assert parallel_analysis == analysis, blueprint_name
+
+        # Each group of linked nodes is solved once
+        assert [c["first_entity"] for c in parallel_components] == \
+            [c["first_entity"] for c in components]
+        assert [c["parallel"] for c in parallel_components] == \
+            [c["nodes"] >= 5 for c in components]
+
+        # The analyses share the analyser pool
+        pool = parallel_analyser.solver_pool
+        assert pool is not None
+        pools.append(pool)
+
+    assert all(pool is pools[0] for pool in pools)
+    parallel_analyser.close()
+    assert parallel_analyser.solver_pool is None
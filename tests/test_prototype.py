@@ -0,0 +1,94 @@
+import pytest
+
+from factorio_blueprint_analyser import analyser, blueprint, factorio
+
+# -----------------------------------------------------------
+# Check that the entity prototypes are shared and never modified
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprint_name = "beltFac1.json"
+
+test_config = {"verboseLevel": 0, "displayNetwork": False}
+test_analyser = analyser.Analyser(test_config)
+
+
+def create_blueprint():
+    return blueprint.Blueprint(blueprint.read_blueprint_from_path(
+        f"{blueprints_path}/{blueprint_name}"))
+
+
+def get_entities(bp, entity_type):
+    return [entity for entity in bp.entities if entity.prototype.type == entity_type]
+
+
+def test_shared_prototypes():
+    with test_analyser.activate():
+        bp = create_blueprint()
+        prototypes = factorio.get_data().prototypes
+
+        # The entities with the same name have the same prototype
+        for entity in bp.entities:
+            assert entity.prototype is prototypes[entity.name]
+
+    # The analysers using the same data share the prototypes
+    other_analyser = analyser.Analyser(dict(test_config, inserterCapacityBonus=3))
+    assert other_analyser.data.prototypes is test_analyser.data.prototypes
+
+
+def test_immutable_prototypes():
+    belt_prototype = test_analyser.data.prototypes["transport-belt"]
+
+    with pytest.raises(AttributeError):
+        belt_prototype.items_per_second = 30
+    with pytest.raises(AttributeError):
+        del belt_prototype.belt_speed
+    with pytest.raises(TypeError):
+        belt_prototype.data["speed"] = 1
+
+    assert belt_prototype.items_per_second == 15
+
+
+def test_entity_speeds_not_shared():
+    prototypes = test_analyser.data.prototypes
+
+    with test_analyser.activate():
+        bp = create_blueprint()
+        belts = get_entities(bp, "transport-belt")
+        assemblers = get_entities(bp, "assembling-machine")
+        assert len(belts) > 1 and len(assemblers) > 1
+
+        # Only the changed entity gets the new speed
+        belt_speed = belts[1].speed
+        belts[0].set_belt_speed(prototypes["express-transport-belt"])
+        assert belts[0].speed == prototypes["express-transport-belt"].items_per_second
+        assert belts[1].speed == belt_speed
+        assert belts[0].prototype.items_per_second == belt_speed
+
+        crafting_speed = assemblers[1].speed
+        assemblers[0].set_crafting_speed(prototypes["assembling-machine-3"].crafting_speed)
+        assert assemblers[0].speed == prototypes["assembling-machine-3"].crafting_speed
+        assert assemblers[1].speed == crafting_speed
+        assert assemblers[0].prototype.crafting_speed == crafting_speed
+
+        # The next blueprint entities have the prototypes speeds
+        other_bp = create_blueprint()
+        assert [entity.speed for entity in get_entities(other_bp, "transport-belt")] == \
+            [belt_speed] * len(belts)
+        assert [entity.speed for entity in get_entities(other_bp, "assembling-machine")] == \
+            [crafting_speed] * len(assemblers)
+
+
+def test_sweep_not_shared():
+    # A sweep changing the entities speeds doesn't change the next analyses
+    blueprint_json = blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+    expected = test_analyser.analyse_blueprint_json(blueprint_json)
+
+    test_analyser.sweep_blueprint_json(
+        blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}"),
+        [{"beltTier": "express-transport-belt", "assemblerTier": "assembling-machine-3"}])
+
+    blueprint_json = blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+    assert test_analyser.analyse_blueprint_json(blueprint_json) == expected
+    assert test_analyser.data.prototypes["transport-belt"].items_per_second == 15
+    assert test_analyser.data.prototypes["assembling-machine-2"].crafting_speed == 0.75
@@ -0,0 +1,52 @@
+import pytest
+
+from factorio_blueprint_analyser import analyser, blueprint, network
+
+# -----------------------------------------------------------
+# Check that the recipes are shared and never modified
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+
+test_analyser = analyser.Analyser({"verboseLevel": 0, "displayNetwork": False})
+
+
+def test_immutable_recipe():
+    recipe = test_analyser.data.catalogue.get("electronic-circuit")
+    assert [(ingredient.name, ingredient.amount) for ingredient in recipe.ingredients] == \
+        [("iron-plate", 1), ("copper-cable", 3)]
+
+    with pytest.raises(AttributeError):
+        recipe.time = 1
+    with pytest.raises(AttributeError):
+        recipe.ingredients.append(recipe.result)
+    with pytest.raises(TypeError):
+        recipe.ingredients_by_name["iron-plate"] = recipe.result
+    with pytest.raises(AttributeError):
+        recipe.result.amount = 2
+    with pytest.raises(AttributeError):
+        del recipe.ingredients[0].name
+
+
+def test_shared_recipe():
+    # The assembling machines with the same recipe share its ingredients,
+    # the purposes and the flows calculation don't change them
+    with test_analyser.activate():
+        recipes = test_analyser.data.catalogue
+        expected = {name: (recipes.get(name).ingredients, str(recipes.get(name)))
+                    for name in ["electronic-circuit", "copper-cable", "iron-gear-wheel"]}
+
+        bp = blueprint.Blueprint(blueprint.read_blueprint_from_path(
+            f"{blueprints_path}/redCircuitFactory"))
+        nw = network.create_network(bp)
+        nw.calculate_bottleneck()
+
+        assembly_nodes = [node for node in nw.nodes if node.node_type == "assembly_node"]
+        assert len(assembly_nodes) > 1
+        for node in assembly_nodes:
+            assert node.entity.recipe is recipes.get(node.entity.recipe.name)
+            assert node.inputs is node.entity.recipe.ingredients
+
+        for (name, (ingredients, recipe_str)) in expected.items():
+            assert recipes.get(name).ingredients is ingredients
+            assert str(recipes.get(name)) == recipe_str
@@ -0,0 +1,73 @@
+from factorio_blueprint_analyser import spatial, prototype
+
+# -----------------------------------------------------------
+# Check the sparse index of the blueprint tiles
+# -----------------------------------------------------------
+
+
+def place(index, x, y, value, offsets=((0, 0),)):
+    # Store the value on each tile of the entity, as the blueprint does
+    for (offset_x, offset_y) in offsets:
+        index.set(x + offset_x, y + offset_y, value)
+
+
+def test_negative_coordinates():
+    index = spatial.SpatialIndex()
+    place(index, -3, -2, "belt")
+    place(index, -2, -2, "inserter")
+    place(index, 0, 0, "chest")
+
+    assert index.get(-3, -2) == "belt"
+    assert index.get(3, 2) is None
+    assert (-2, -2) in index and (2, 2) not in index
+    assert index.neighbours(-3, -2) == [[-2, -2, "inserter"]]
+    assert index.query_rect(-3, -2, -1, -1) == [[-3, -2, "belt"], [-2, -2, "inserter"]]
+    assert index.coords() == [(-3, -2), (-2, -2), (0, 0)]
+
+    index.remove(-3, -2)
+    index.remove(-10, -10)
+    assert index.get(-3, -2) is None
+    assert len(index) == 2
+
+
+def test_multi_tile_entity():
+    # An assembling machine centered on (-1, 1) covers the tiles from (-2, 0) to (0, 2)
+    index = spatial.SpatialIndex()
+    place(index, -1, 1, "assembler", prototype.large_entity_offsets)
+    place(index, 1, 1, "inserter")
+
+    assert len(index) == 10
+    assert all(index.get(x, y) == "assembler" for x in range(-2, 1) for y in range(0, 3))
+    assert index.get(-3, 1) is None and index.get(-1, 3) is None
+
+    # Each tile of the machine is found, the inserter sees its side
+    assert index.neighbours(1, 1) == [[0, 1, "assembler"]]
+    assert [value for (_, _, value) in index.query_rect(-1, 1, 1, 1)] == \
+        ["assembler", "assembler", "inserter"]
+    assert len(index.query_rect(-2, 0, 0, 2)) == 9
+
+
+def test_overlapping_lookups():
+    index = spatial.SpatialIndex()
+    place(index, 0, 0, "assembler", prototype.large_entity_offsets)
+
+    # The last entity placed on a tile is kept
+    place(index, 1, 1, "belt")
+    assert index.get(1, 1) == "belt"
+    assert index.get(0, 0) == "assembler"
+    assert len(index) == 9
+
+    # The small rectangles check each tile, the large ones filter the stored tiles:
+    # the overlapping rectangles find the same tiles both ways
+    assert index.query_rect(0, 0, 1, 1) == [[0, 0, "assembler"], [1, 0, "assembler"],
+                                            [0, 1, "assembler"], [1, 1, "belt"]]
+    assert len(index.query_rect(-1, -1, 1, 1)) == 9
+    assert index.query_rect(-5, -5, 1, 1) == index.query_rect(-1, -1, 1, 1)
+    assert index.query_rect(0, 0, 10, 10) == index.query_rect(0, 0, 1, 1)
+    assert index.query_rect(1, 1, 0, 0) == []
+
+    # The removed tile is no longer found by the lookups
+    index.remove(1, 1)
+    assert index.get(1, 1) is None
+    assert [1, 1, "belt"] not in index.query_rect(-10, -10, 10, 10)
+    assert [0, 1, "assembler"] in index.neighbours(1, 1)
@@ -0,0 +1,78 @@
+from os import listdir
+
+from factorio_blueprint_analyser import analyser, blueprint, sweep
+
+# -----------------------------------------------------------
+# Check that each sweep scenario gives the same result as
+# a full analysis of the blueprint with the same capacities
+# -----------------------------------------------------------
+
+blueprints_path = "tests/blueprints"
+blueprints = sorted(listdir(blueprints_path))
+
+# Blueprints with a single underground belt tier, upgrading
+# their belts doesn't connect other underground belts
+upgraded_blueprints = ["beltFac1.json", "beltFac3.txt", "circuitFac1.json",
+                       "underground_belts.json", "splitters.json", "fur4"]
+
+test_config = {"verboseLevel": 0, "displayNetwork": False}
+test_analyser = analyser.Analyser(test_config)
+
+
+def get_result(analysis):
+    return (analysis["blueprint"]["items_output"], analysis["blueprint"]["entities_bottleneck"])
+
+
+def upgrade(blueprint_json, belt_tier=None, assembler_tier=None):
+    # The blueprint with its entities replaced by the given tiers
+    for entity in blueprint_json["blueprint"]["entities"]:
+        for belt_type in ["transport-belt", "underground-belt", "splitter"]:
+            if belt_tier is not None and \
+                    entity["name"] in [belt_type, "fast-" + belt_type, "express-" + belt_type]:
+                entity["name"] = belt_tier.replace("transport-belt", belt_type)
+
+        if assembler_tier is not None and entity["name"].startswith("assembling-machine"):
+            entity["name"] = assembler_tier
+
+    return blueprint_json
+
+
+def test_inserter_capacity_bonus():
+    scenarios = [{"inserterCapacityBonus": bonus} for bonus in [0, 2, 5, 7]]
+    bonus_analysers = [analyser.Analyser(dict(test_config, **scenario)) for scenario in scenarios]
+
+    for blueprint_name in blueprints:
+        blueprint_json = blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+        results = test_analyser.sweep_blueprint_json(blueprint_json, scenarios)
+
+        for (result, bonus_analyser) in zip(results, bonus_analysers):
+            expected = get_result(bonus_analyser.analyse_blueprint_json(blueprint_json))
+            assert (result["items_output"], result["entities_bottleneck"]) == expected, blueprint_name
+
+
+def test_belt_and_assembler_tiers():
+    scenarios = [{},
+                 {"beltTier": "express-transport-belt"},
+                 {"beltTier": "transport-belt", "assemblerTier": "assembling-machine-3"}]
+
+    for blueprint_name in upgraded_blueprints:
+        blueprint_json = blueprint.read_blueprint_from_path(f"{blueprints_path}/{blueprint_name}")
+        results = test_analyser.sweep_blueprint_json(blueprint_json, scenarios)
+
+        for (result, scenario) in zip(results, scenarios):
+            upgraded_json = upgrade(blueprint.read_blueprint_from_path(
+                f"{blueprints_path}/{blueprint_name}"),
+                scenario.get("beltTier"), scenario.get("assemblerTier"))
+
+            expected = get_result(test_analyser.analyse_blueprint_json(upgraded_json))
+            assert (result["items_output"], result["entities_bottleneck"]) == expected, blueprint_name
+            assert result["throughput"] == sum(result["items_output"].values())
+
+
+def test_parse_scenario():
+    assert sweep.parse_scenario("inserterCapacityBonus=7,beltTier=fast-transport-belt") == {
+        "name": "inserterCapacityBonus=7,beltTier=fast-transport-belt",
+        "inserterCapacityBonus": 7,
+        "beltTier": "fast-transport-belt"
+    }
+    assert sweep.parse_scenario("baseline") == {"name": "baseline"}